@@ -9,28 +9,62 @@ Provides endpoints for:
 - File management
 
 All endpoints include comprehensive tooltips and documentation.
+
+Endpoints that use the database are plain `def` functions, so FastAPI runs
+them in its worker threadpool and blocking queries never stall the event
+loop. Upload endpoints stay async to stream the request body and hand their
+blocking work to the same pool, and status streams and GET
+/generations/{id} (long polling) are async so waiting clients hold neither
+a thread nor a database session.
 """
+import asyncio
+import json
+import zlib
 import requests
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Request, WebSocket
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Any
+from datetime import datetime
 
 from ..schemas.avatarforge_schema import (
     AvatarRequest,
     AvatarResponse,
     GenerationListResponse,
-    OutputFile
+    GenerationStatsResponse,
+    GenerationSearchResponse,
+    GenerationSearchResult,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    OutputFile,
+    WebhookDeliveryResponse
 )
 from ..schemas.file_schema import (
     FileUploadResponse,
     FileInfo,
     FileHashCheckResponse,
-    CleanupResponse
+    CleanupResponse,
+    SimilarFileMatch,
+    SimilarFilesResponse,
+    StorageUsageResponse,
+    StorageBudgetResponse
 )
 from ..services.file_service import FileService
 from ..services.generation_service import GenerationService
-from ..database.session import get_db
+from ..services.generation_export import GenerationExporter
+from ..services.output_archive import OutputArchiver
+from ..services.event_bus import event_bus, generation_event, DELETED_STATUS
+from ..services.comfyui_relay import get_relay
+from ..services.webhook_service import WebhookService
+from ..services.image_hash import hash_to_hex
+from ..core.config import settings
+from ..core.responses import FastJSONResponse
+from ..database.session import (
+    get_db, get_read_db, is_replica_session, open_read_session, SessionLocal, engine, replicas
+)
+from ..database.engine import pool_status
 from ..models.generation import Generation
 
 router = APIRouter()
@@ -69,16 +103,31 @@ router = APIRouter()
     **Deduplication:**
     If you upload the same image twice, you'll get the same file_id back
     (is_duplicate will be true). This saves storage space and upload time!
+
+    **Near-Duplicate Reuse:**
+    With reuse_similar=true, an image that only differs by re-encoding or
+    resizing (perceptual hash within PERCEPTUAL_HASH_MAX_DISTANCE bits)
+    returns the closest existing file instead of storing another copy.
+
+    **Storage Quotas:**
+    Pass user_id to count the file against that user's quota. A user is
+    charged once per file, including deduplicated uploads. Uploads that
+    would exceed USER_STORAGE_QUOTA_BYTES or USER_STORAGE_QUOTA_FILES are
+    rejected with 413.
     """,
     tags=["File Management"]
 )
 async def upload_pose_image(
     file: UploadFile = File(..., description="Image file to upload for pose reference"),
+    reuse_similar: bool = Query(False, description="Reuse the closest perceptually similar stored image if one exists"),
+    user_id: Optional[str] = Query(None, description="User uploading the file (counted against their storage quota)"),
     db: Session = Depends(get_db)
 ) -> FileUploadResponse:
     """Upload a pose reference image with automatic deduplication"""
     file_service = FileService(db)
-    uploaded_file = await file_service.upload_file(file, file_type="pose_image")
+    uploaded_file = await file_service.upload_file(
+        file, file_type="pose_image", user_id=user_id, reuse_similar=reuse_similar
+    )
 
     # Check if this was a duplicate
     is_duplicate = uploaded_file.reference_count > 0
@@ -109,6 +158,7 @@ async def upload_pose_image(
 
     **Same deduplication benefits as pose images:**
     - Duplicate detection via SHA256 hash
+    - Optional near-duplicate reuse via perceptual hash (reuse_similar=true)
     - Instant response if file already exists
     - Storage optimization
 
@@ -118,11 +168,15 @@ async def upload_pose_image(
 )
 async def upload_reference_image(
     file: UploadFile = File(..., description="Image file to upload for style reference"),
+    reuse_similar: bool = Query(False, description="Reuse the closest perceptually similar stored image if one exists"),
+    user_id: Optional[str] = Query(None, description="User uploading the file (counted against their storage quota)"),
     db: Session = Depends(get_db)
 ) -> FileUploadResponse:
     """Upload a reference image for style matching"""
     file_service = FileService(db)
-    uploaded_file = await file_service.upload_file(file, file_type="reference_image")
+    uploaded_file = await file_service.upload_file(
+        file, file_type="reference_image", user_id=user_id, reuse_similar=reuse_similar
+    )
 
     is_duplicate = uploaded_file.reference_count > 0
 
@@ -150,12 +204,13 @@ async def upload_reference_image(
     - Get file_id from upload response
     - Use this endpoint to download or display the file
     - Files are served with appropriate MIME types
+    - Files moved to cold storage are transparently restored on access
 
     **Returns:** The actual file content (image)
     """,
     tags=["File Management"]
 )
-async def get_file(
+def get_file(
     file_id: str,
     db: Session = Depends(get_db)
 ):
@@ -166,7 +221,8 @@ async def get_file(
     if not uploaded_file:
         raise HTTPException(status_code=404, detail="File not found")
 
-    file_path = file_service.get_file_path(uploaded_file)
+    # Cold files are promoted back to hot storage on access
+    file_path = file_service.get_readable_path(uploaded_file)
 
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found on disk")
@@ -202,12 +258,16 @@ async def get_file(
     with open('image.png', 'rb') as f:
         hash = hashlib.sha256(f.read()).hexdigest()
     ```
+
+    **Note:** The hash is of the stored content. With STRIP_IMAGE_METADATA
+    enabled, files carrying metadata are stored (and hashed) without it,
+    so their local hash will not match.
     """,
     tags=["File Management"]
 )
-async def check_file_hash(
+def check_file_hash(
     content_hash: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> FileHashCheckResponse:
     """Check if a file with the given hash exists"""
     file_service = FileService(db)
@@ -227,6 +287,66 @@ async def check_file_hash(
         )
 
 
+@router.get(
+    "/files/{file_id}/similar",
+    response_model=SimilarFilesResponse,
+    summary="Find Near-Duplicate Files",
+    description="""
+    Find stored images that look like the given file.
+
+    **How it works:**
+    Every uploaded image gets a 64-bit perceptual hash (dHash). Images that
+    were re-exported, re-compressed or resized keep nearly the same hash,
+    so near-duplicates are found by Hamming distance between hashes using
+    an in-memory BK-tree index.
+
+    **Distance Guide:**
+    - 0: visually identical
+    - 1-6: same image after re-encoding or resizing
+    - 10+: likely a different image
+
+    **Query Parameters:**
+    - `max_distance` (optional): Override PERCEPTUAL_HASH_MAX_DISTANCE
+    - `limit` (optional): Maximum number of matches (default: 10)
+    """,
+    tags=["File Management"]
+)
+def find_similar_files(
+    file_id: str,
+    max_distance: Optional[int] = Query(None, ge=0, le=64, description="Maximum Hamming distance (overrides config)"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of matches to return"),
+    db: Session = Depends(get_read_db)
+) -> SimilarFilesResponse:
+    """Find files perceptually similar to an uploaded file"""
+    file_service = FileService(db)
+    uploaded_file = file_service.get_file_by_id(file_id)
+
+    if not uploaded_file:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    perceptual_hash = file_service.get_perceptual_hash(uploaded_file)
+    search_distance = max_distance if max_distance is not None else settings.PERCEPTUAL_HASH_MAX_DISTANCE
+
+    # Ask for one extra match since the file itself is always found
+    matches = file_service.find_similar_files(perceptual_hash, max_distance=search_distance, limit=limit + 1)
+
+    return SimilarFilesResponse(
+        file_id=uploaded_file.file_id,
+        perceptual_hash=hash_to_hex(perceptual_hash),
+        max_distance=search_distance,
+        matches=[
+            SimilarFileMatch(
+                file_id=match.file_id,
+                filename=match.filename,
+                distance=distance,
+                url=f"/files/{match.file_id}"
+            )
+            for distance, match in matches
+            if match.file_id != uploaded_file.file_id
+        ][:limit]
+    )
+
+
 @router.delete(
     "/files/{file_id}",
     summary="Delete File",
@@ -243,7 +363,7 @@ async def check_file_hash(
     """,
     tags=["File Management"]
 )
-async def delete_file(
+def delete_file(
     file_id: str,
     force: bool = Query(False, description="Force delete even if referenced"),
     db: Session = Depends(get_db)
@@ -263,10 +383,74 @@ async def delete_file(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get(
+    "/users/{user_id}/storage",
+    response_model=StorageUsageResponse,
+    summary="Get User Storage Usage",
+    description="""
+    Get how much storage a user holds and their configured quotas.
+
+    Usage is maintained incrementally on every upload, deduplicated upload
+    and deletion, so this is a single primary-key lookup.
+
+    **Returns:**
+    - bytes_used / file_count: Current totals for the user
+    - quota_bytes / quota_files: Configured limits (null = unlimited)
+    """,
+    tags=["File Management"]
+)
+def get_user_storage(
+    user_id: str,
+    db: Session = Depends(get_read_db)
+) -> StorageUsageResponse:
+    """Get a user's storage usage"""
+    file_service = FileService(db)
+    usage = file_service.get_user_usage(user_id)
+
+    return StorageUsageResponse(
+        user_id=user_id,
+        bytes_used=usage.bytes_used,
+        file_count=usage.file_count,
+        quota_bytes=settings.USER_STORAGE_QUOTA_BYTES or None,
+        quota_files=settings.USER_STORAGE_QUOTA_FILES or None
+    )
+
+
 # ============================================================================
 # GENERATION ENDPOINTS
 # ============================================================================
 
+def _resolve_image_file_ids(request: AvatarRequest, db: Session) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve pose/reference file IDs for a generation request
+
+    Legacy base64/data-URL images are ingested into the deduplicated file
+    store so they are linked by file_id like uploaded files. Explicit file
+    IDs take priority over legacy images.
+
+    Returns:
+        Tuple of (pose_file_id, reference_file_id)
+    """
+    file_service = FileService(db)
+    pose_file_id = request.pose_file_id
+    reference_file_id = request.reference_file_id
+
+    if not pose_file_id and request.pose_image:
+        pose_file = file_service.ingest_base64_image(
+            request.pose_image, file_type="pose_image", user_id=request.user_id
+        )
+        if pose_file:
+            pose_file_id = pose_file.file_id
+
+    if not reference_file_id and request.reference_image:
+        ref_file = file_service.ingest_base64_image(
+            request.reference_image, file_type="reference_image", user_id=request.user_id
+        )
+        if ref_file:
+            reference_file_id = ref_file.file_id
+
+    return pose_file_id, reference_file_id
+
 @router.post(
     "/generate/avatar",
     response_model=AvatarResponse,
@@ -295,7 +479,9 @@ async def delete_file(
            "realism": false
        }
        ```
-       Still supported for backward compatibility
+       Still supported for backward compatibility. Inline images are decoded,
+       deduplicated and stored like uploads, so repeated images are only
+       stored once. URLs and file paths are ignored.
 
     **Workflow:**
     1. (Optional) Upload pose/reference images first
@@ -314,11 +500,12 @@ async def delete_file(
     """,
     tags=["Avatar Generation"]
 )
-async def generate_avatar(
+def generate_avatar(
     request: AvatarRequest,
     db: Session = Depends(get_db)
 ) -> AvatarResponse:
     """Generate an avatar with full customization options"""
+    pose_file_id, reference_file_id = _resolve_image_file_ids(request, db)
     gen_service = GenerationService(db)
 
     # Create generation record
@@ -327,10 +514,12 @@ async def generate_avatar(
         clothing=request.clothing,
         style=request.style,
         realism=request.realism,
-        pose_file_id=request.pose_file_id,
-        reference_file_id=request.reference_file_id,
+        pose_file_id=pose_file_id,
+        reference_file_id=reference_file_id,
         pose_image=request.pose_image,
-        reference_image=request.reference_image
+        reference_image=request.reference_image,
+        user_id=request.user_id,
+        callback_url=request.callback_url
     )
 
     # Execute generation
@@ -380,7 +569,7 @@ async def generate_avatar(
     """,
     tags=["Avatar Generation"]
 )
-async def generate_pose(
+def generate_pose(
     pose: str = Query(..., description="Pose type: front, back, side, or quarter"),
     request: AvatarRequest = None,
     db: Session = Depends(get_db)
@@ -392,6 +581,7 @@ async def generate_pose(
             detail=f"Invalid pose: {pose}. Must be one of: front, back, side, quarter"
         )
 
+    pose_file_id, reference_file_id = _resolve_image_file_ids(request, db)
     gen_service = GenerationService(db)
 
     generation = gen_service.create_generation(
@@ -400,10 +590,12 @@ async def generate_pose(
         style=request.style,
         realism=request.realism,
         pose_type=pose,
-        pose_file_id=request.pose_file_id,
-        reference_file_id=request.reference_file_id,
+        pose_file_id=pose_file_id,
+        reference_file_id=reference_file_id,
         pose_image=request.pose_image,
-        reference_image=request.reference_image
+        reference_image=request.reference_image,
+        user_id=request.user_id,
+        callback_url=request.callback_url
     )
 
     try:
@@ -444,11 +636,12 @@ async def generate_pose(
     """,
     tags=["Avatar Generation"]
 )
-async def generate_all_poses(
+def generate_all_poses(
     request: AvatarRequest,
     db: Session = Depends(get_db)
 ) -> AvatarResponse:
     """Generate an avatar with all pose views"""
+    pose_file_id, reference_file_id = _resolve_image_file_ids(request, db)
     gen_service = GenerationService(db)
 
     generation = gen_service.create_generation(
@@ -457,10 +650,12 @@ async def generate_all_poses(
         style=request.style,
         realism=request.realism,
         pose_type="all",
-        pose_file_id=request.pose_file_id,
-        reference_file_id=request.reference_file_id,
+        pose_file_id=pose_file_id,
+        reference_file_id=reference_file_id,
         pose_image=request.pose_image,
-        reference_image=request.reference_image
+        reference_image=request.reference_image,
+        user_id=request.user_id,
+        callback_url=request.callback_url
     )
 
     try:
@@ -484,6 +679,605 @@ async def generate_all_poses(
 # GENERATION MANAGEMENT ENDPOINTS
 # ============================================================================
 
+# Keys of each output_files entry in responses
+OUTPUT_FILE_FIELDS = tuple(OutputFile.model_fields)
+
+# Response field -> Generation attribute it is built from (for ?fields=)
+GENERATION_RESPONSE_FIELDS = {
+    "generation_id": "generation_id",
+    "status": "status",
+    "message": "status",
+    "workflow": "workflow",
+    "output_files": "output_files",
+    "created_at": "created_at",
+    "started_at": "started_at",
+    "completed_at": "completed_at",
+    "error": "error_message",
+    "comfyui_prompt_id": "comfyui_prompt_id",
+}
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated sparse fieldset
+
+    Returns:
+        Requested response fields (always including generation_id), or None
+        for the full response
+
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in GENERATION_RESPONSE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(GENERATION_RESPONSE_FIELDS)}"
+        )
+    return list(dict.fromkeys(["generation_id", *requested]))
+
+
+def _field_columns(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Generation columns needed to build the requested fields"""
+    if not fields:
+        return None
+    columns = [GENERATION_RESPONSE_FIELDS[field] for field in fields]
+    if "workflow" in fields:
+        columns.append("workflow_hash")
+    return list(dict.fromkeys(columns))
+
+
+def _generation_response(
+    generation: Generation,
+    workflow: Optional[Dict[str, Any]] = None
+) -> AvatarResponse:
+    """Build the full response model for a generation"""
+    output_files = None
+    if generation.output_files:
+        output_files = [OutputFile(**f) for f in generation.output_files]
+
+    return AvatarResponse(
+        generation_id=generation.generation_id,
+        status=generation.status,
+        message=f"Generation {generation.status}",
+        workflow=workflow or None,
+        output_files=output_files,
+        created_at=generation.created_at,
+        started_at=generation.started_at,
+        completed_at=generation.completed_at,
+        error=generation.error_message,
+        comfyui_prompt_id=generation.comfyui_prompt_id
+    )
+
+
+def _generation_dict(
+    generation: Generation,
+    workflow: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build the full response for a generation as a plain dict
+
+    Same fields and order as AvatarResponse, without constructing and
+    re-validating the models; used with FAST_JSON_RESPONSES.
+    """
+    output_files = None
+    if generation.output_files:
+        output_files = [{field: f.get(field) for field in OUTPUT_FILE_FIELDS} for f in generation.output_files]
+
+    return {
+        "generation_id": generation.generation_id,
+        "status": generation.status,
+        "message": f"Generation {generation.status}",
+        "workflow": workflow or None,
+        "output_files": output_files,
+        "created_at": generation.created_at,
+        "started_at": generation.started_at,
+        "completed_at": generation.completed_at,
+        "error": generation.error_message,
+        "comfyui_prompt_id": generation.comfyui_prompt_id,
+    }
+
+
+def _json_response(content: Dict[str, Any]) -> JSONResponse:
+    """Encode a response built from plain values, with the fast encoder if enabled"""
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse(content)
+    return JSONResponse(jsonable_encoder(content))
+
+
+def _generation_fields(
+    generation: Generation,
+    fields: List[str],
+    workflow: Optional[Dict[str, Any]] = None
+) -> dict:
+    """Build a sparse response containing only the requested fields"""
+    values = {}
+    for field in fields:
+        if field == "message":
+            values[field] = f"Generation {generation.status}"
+        elif field == "workflow":
+            values[field] = workflow
+        else:
+            values[field] = getattr(generation, GENERATION_RESPONSE_FIELDS[field])
+    return values
+
+
+@router.get(
+    "/generations/stats",
+    response_model=GenerationStatsResponse,
+    summary="Generation Statistics",
+    description="""
+    Get generation counts by status.
+
+    Counts are maintained as generations are created, change status and are
+    deleted, so this endpoint is cheap enough for dashboards to poll.
+
+    **Query Parameters:**
+    - `user_id` (optional): Counts for a single user instead of all users
+
+    **Example Response:**
+    ```json
+    {
+        "user_id": null,
+        "total": 1250,
+        "by_status": {"completed": 1200, "failed": 30, "processing": 5, "queued": 15}
+    }
+    ```
+    """,
+    tags=["Generation Management"]
+)
+def get_generation_stats(
+    user_id: Optional[str] = Query(None, description="Only count this user's generations"),
+    db: Session = Depends(get_read_db)
+) -> GenerationStatsResponse:
+    """Get generation counts by status"""
+    gen_service = GenerationService(db)
+    by_status = gen_service.get_generation_stats(user_id)
+
+    return GenerationStatsResponse(
+        user_id=user_id,
+        total=sum(by_status.values()),
+        by_status=by_status
+    )
+
+
+@router.get(
+    "/generations/search",
+    response_model=GenerationSearchResponse,
+    summary="Search Generations",
+    description="""
+    Full-text search over generation prompts, clothing and style.
+
+    Words are matched after stemming, so `archer` also finds "archers".
+    Every word in `q` must match; results are ranked by relevance, with
+    prompt matches weighted above clothing and style.
+
+    **Query Parameters:**
+    - **q**: Search words (required)
+    - **status**: Only generations with this status
+    - **user_id**: Only this user's generations
+    - **created_after** / **created_before**: Creation time range (ISO 8601)
+    - **limit**: Max results (default: 20, max: 100)
+
+    **Example:**
+    ```
+    GET /generations/search?q=elf archer&status=completed&user_id=user123
+    ```
+
+    **Example Response:**
+    ```json
+    {
+        "query": "elf archer",
+        "results": [
+            {
+                "generation_id": "550e8400-e29b-41d4-a716-446655440000",
+                "prompt": "elf archer with silver hair",
+                "clothing": "green cloak",
+                "style": "anime",
+                "status": "completed",
+                "user_id": "user123",
+                "created_at": "2025-01-01T12:00:00Z",
+                "score": 4.21
+            }
+        ]
+    }
+    ```
+
+    Archived generations (see GENERATION_ARCHIVE_DAYS) are not searched.
+    """,
+    tags=["Generation Management"]
+)
+def search_generations(
+    q: str = Query(..., min_length=1, description="Search words"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    created_after: Optional[datetime] = Query(None, description="Only generations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only generations created before this time"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results to return"),
+    db: Session = Depends(get_read_db)
+) -> GenerationSearchResponse:
+    """Search generations by prompt, clothing and style"""
+    gen_service = GenerationService(db)
+    matches = gen_service.search_generations(
+        q,
+        status=status,
+        user_id=user_id,
+        created_after=created_after,
+        created_before=created_before,
+        limit=limit
+    )
+
+    return GenerationSearchResponse(
+        query=q,
+        results=[
+            GenerationSearchResult(
+                generation_id=gen.generation_id,
+                prompt=gen.prompt,
+                clothing=gen.clothing,
+                style=gen.style,
+                status=gen.status,
+                user_id=gen.user_id,
+                created_at=gen.created_at,
+                score=score
+            )
+            for gen, score in matches
+        ]
+    )
+
+
+@router.get(
+    "/generations/export",
+    summary="Export Generation History",
+    description="""
+    Stream generation history as NDJSON or CSV for analytics.
+
+    Rows are read from the database and written to the response in batches,
+    so exports of any size use constant memory on the server. Archived
+    generations are included; rows are ordered oldest first, archived
+    generations before current ones. Workflows are not included.
+
+    **Query Parameters:**
+    - **format**: `ndjson` (one JSON object per line, default) or `csv`
+    - **gzip**: Compress the download (default: false)
+    - **status**: Only generations with this status
+    - **user_id**: Only this user's generations
+    - **created_after** / **created_before**: Creation time range (ISO 8601)
+
+    **Example:**
+    ```bash
+    curl -o generations.csv.gz \\
+        "http://localhost:8000/avatarforge-controller/generations/export?format=csv&gzip=true&status=completed"
+    ```
+
+    For very large exports the `scripts/export_generations.py` CLI writes
+    the same output directly from the database.
+    """,
+    response_class=StreamingResponse,
+    tags=["Generation Management"]
+)
+def export_generations(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Output format: ndjson or csv"),
+    gzip: bool = Query(False, description="gzip-compress the output"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    created_after: Optional[datetime] = Query(None, description="Only generations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only generations created before this time")
+) -> StreamingResponse:
+    """Stream generation history"""
+    # The export opens its own session: request-scoped sessions are closed
+    # before a streamed body is sent
+    exporter = GenerationExporter(
+        lambda: open_read_session(request),
+        format=format,
+        compress=gzip,
+        batch_size=settings.GENERATION_EXPORT_BATCH_SIZE
+    )
+
+    return StreamingResponse(
+        exporter.stream(
+            status=status,
+            user_id=user_id,
+            created_after=created_after,
+            created_before=created_before
+        ),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{exporter.filename}"'}
+    )
+
+
+@router.get(
+    "/generations/outputs.zip",
+    summary="Download Generation Outputs as ZIP",
+    description="""
+    Download the output images of many generations in one ZIP archive.
+
+    The archive is built while it downloads (no temp files), and PNG, JPEG
+    and WebP images are stored without recompression. Each generation's
+    files are in a folder named after its ID, and `manifest.json` lists
+    every generation with its files and any outputs that could not be found.
+    Archived generations are included.
+
+    **Select generations by ID:**
+    ```
+    GET /generations/outputs.zip?generation_id=abc&generation_id=def
+    ```
+
+    **Or by filter (newest first):**
+    ```
+    # A user's last 500 completed generations
+    GET /generations/outputs.zip?user_id=user123&status=completed&limit=500
+    ```
+
+    **Query Parameters:**
+    - **generation_id**: Generation to include (repeatable)
+    - **status**: Only generations with this status
+    - **user_id**: Only this user's generations
+    - **created_after** / **created_before**: Creation time range (ISO 8601)
+    - **limit**: Max generations (default: 100, max: 500)
+    """,
+    response_class=StreamingResponse,
+    tags=["Generation Management"]
+)
+def download_generation_outputs(
+    request: Request,
+    generation_id: Optional[List[str]] = Query(None, description="Generation IDs to include (repeatable)"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    created_after: Optional[datetime] = Query(None, description="Only generations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only generations created before this time"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of generations")
+) -> StreamingResponse:
+    """Stream a ZIP of generation outputs"""
+    # Like exports, the archive resolves files in its own session since the
+    # body is streamed after request-scoped sessions close
+    archiver = OutputArchiver(lambda: open_read_session(request))
+
+    return StreamingResponse(
+        archiver.stream(
+            generation_ids=generation_id,
+            status=status,
+            user_id=user_id,
+            created_after=created_after,
+            created_before=created_before,
+            limit=limit
+        ),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="generation-outputs.zip"'}
+    )
+
+
+# Statuses after which a generation's stream ends
+FINAL_EVENT_STATUSES = {"completed", "failed", DELETED_STATUS}
+MAX_EVENT_GENERATIONS = 100
+MAX_WAIT_SECONDS = 60
+
+
+def _generation_snapshots(generation_ids: List[str]) -> List[Dict[str, Any]]:
+    """Current state of each existing generation as a status event (reads the primary)"""
+    db = SessionLocal()
+    try:
+        gen_service = GenerationService(db)
+        snapshots = []
+        for generation_id in generation_ids:
+            generation = gen_service.get_generation(generation_id, include_archived=True)
+            if generation:
+                snapshots.append(generation_event(generation))
+        return snapshots
+    finally:
+        db.close()
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Encode a status event as a Server-Sent Events message"""
+    lines = []
+    if "sequence" in event:
+        lines.append(f"id: {event['sequence']}")
+    lines.append("event: status")
+    lines.append(f"data: {json.dumps(event)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _status_event_stream(generation_ids: Optional[List[str]], user_id: Optional[str]) -> StreamingResponse:
+    """Subscribe, send current states, then stream changes until every watched generation finishes"""
+    # Subscribe before reading current state so no change slips in between
+    subscription = event_bus.subscribe(generation_ids=generation_ids, user_id=user_id)
+    try:
+        snapshots = await run_in_threadpool(_generation_snapshots, generation_ids) if generation_ids else []
+    except Exception:
+        subscription.close()
+        raise
+
+    if generation_ids and not snapshots:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Generation not found")
+
+    pending = {event["generation_id"] for event in snapshots if event["status"] not in FINAL_EVENT_STATUSES}
+
+    async def stream():
+        with subscription:
+            for event in snapshots:
+                yield _format_sse(event)
+            if generation_ids and not pending:
+                return
+
+            while True:
+                event = await subscription.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield _format_sse(event)
+                if generation_ids and event["status"] in FINAL_EVENT_STATUSES:
+                    pending.discard(event["generation_id"])
+                    if not pending:
+                        return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get(
+    "/generations/events",
+    summary="Stream Generation Status Events",
+    description="""
+    Stream status changes for a set of generations or for all of a user's
+    generations as Server-Sent Events, instead of polling.
+
+    **Query Parameters:**
+    - **generation_id**: Generation to watch (repeatable, up to 100)
+    - **user_id**: Watch every generation of this user, including new ones
+
+    At least one of them is required.
+
+    **Events:** each message has `event: status` and a JSON `data` payload:
+    ```
+    event: status
+    data: {"generation_id": "550e...", "status": "completed", "output_files": [...], ...}
+    ```
+
+    When watching generation IDs, the current state of each is sent first
+    and the stream ends once all of them are completed, failed or deleted.
+    User streams stay open. Idle streams receive a `: keep-alive` comment
+    every SSE_HEARTBEAT_SECONDS.
+
+    **JavaScript Example:**
+    ```javascript
+    const source = new EventSource(`/generations/events?user_id=${userId}`);
+    source.addEventListener("status", (e) => {
+        const update = JSON.parse(e.data);
+        console.log(update.generation_id, update.status);
+    });
+    ```
+
+    Events are delivered by the API process that made the change; with
+    several workers, pair streams with an occasional GET as a fallback.
+    """,
+    response_class=StreamingResponse,
+    tags=["Generation Management"]
+)
+async def stream_generation_events(
+    generation_id: Optional[List[str]] = Query(None, description="Generation IDs to watch (repeatable)"),
+    user_id: Optional[str] = Query(None, description="Watch all generations of this user")
+) -> StreamingResponse:
+    """Stream status events for generations or a user"""
+    if not generation_id and not user_id:
+        raise HTTPException(status_code=400, detail="Provide generation_id or user_id")
+    if generation_id and len(generation_id) > MAX_EVENT_GENERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_EVENT_GENERATIONS} generations can be watched per stream"
+        )
+
+    return await _status_event_stream(list(dict.fromkeys(generation_id or [])) or None, user_id)
+
+
+@router.get(
+    "/generations/{generation_id}/events",
+    summary="Stream Generation Status",
+    description="""
+    Stream one generation's status changes as Server-Sent Events.
+
+    Sends the current state immediately, then each change (queued →
+    processing → completed/failed) as it happens, and closes once the
+    generation is completed, failed or deleted.
+
+    **Python Example:**
+    ```python
+    import json, requests
+
+    with requests.get(f"{base}/generations/{generation_id}/events", stream=True) as r:
+        for line in r.iter_lines(decode_unicode=True):
+            if line.startswith("data: "):
+                update = json.loads(line[6:])
+                print(update["status"], update["output_files"])
+    ```
+    """,
+    response_class=StreamingResponse,
+    tags=["Generation Management"]
+)
+async def stream_generation_status(generation_id: str) -> StreamingResponse:
+    """Stream status events for one generation"""
+    return await _status_event_stream([generation_id], None)
+
+
+@router.websocket("/generations/{generation_id}/progress")
+async def generation_progress(websocket: WebSocket, generation_id: str, previews: bool = False):
+    """
+    Stream live progress for one generation over a WebSocket
+
+    Messages are JSON objects with a `type`:
+    - `status`: the generation's state (sent first, then on every change)
+    - `progress`: sampler steps, e.g. `{"value": 12, "max": 30, "percent": 40.0, "eta_seconds": 6.3}`
+    - `executing`: the ComfyUI node now running
+    - `preview`: a downscaled latent preview as base64 JPEG (only with `?previews=true`)
+    - `error`: ComfyUI's error message
+
+    The server closes the socket once the generation is completed, failed or
+    deleted (close code 4404 if it does not exist). Progress comes from one
+    shared upstream ComfyUI connection however many clients are watching.
+    """
+    await websocket.accept()
+    relay = get_relay(settings.COMFYUI_URL)
+    outbox: asyncio.Queue = asyncio.Queue()
+    progress = None
+    pumps = []
+
+    async def pump(source, wrap=lambda message: message):
+        while True:
+            await outbox.put(wrap(await source.get()))
+
+    def follow(event: Dict[str, Any]):
+        """Start relaying ComfyUI progress once the generation is running there"""
+        nonlocal progress
+        if progress is None and event.get("comfyui_prompt_id") and event["status"] == "processing":
+            progress = relay.subscribe(event["comfyui_prompt_id"], previews=previews)
+            pumps.append(asyncio.create_task(pump(progress)))
+
+    async def relay_messages():
+        for event in snapshots:
+            await outbox.put({"type": "status", **event})
+        while True:
+            message = await outbox.get()
+            if message["type"] == "status":
+                follow(message)
+            await websocket.send_json({"generation_id": generation_id, **message})
+            if message["type"] == "status" and message["status"] in FINAL_EVENT_STATUSES:
+                return
+
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    with event_bus.subscribe(generation_ids=[generation_id]) as status_events:
+        snapshots = await run_in_threadpool(_generation_snapshots, [generation_id])
+        if not snapshots:
+            await websocket.close(code=4404, reason="Generation not found")
+            return
+
+        pumps.append(asyncio.create_task(pump(status_events, lambda event: {"type": "status", **event})))
+        sender = asyncio.create_task(relay_messages())
+        receiver = asyncio.create_task(wait_for_disconnect())
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, receiver, *pumps):
+                task.cancel()
+            if progress is not None:
+                relay.unsubscribe(progress)
+
+        if sender.done() and not sender.cancelled() and sender.exception() is None:
+            await websocket.close()
+
+
 @router.get(
     "/generations/{generation_id}",
     response_model=AvatarResponse,
@@ -497,6 +1291,21 @@ async def generate_all_poses(
     - **completed**: Done! Results available in output_files
     - **failed**: Error occurred, see error field
 
+    **Instead of polling:** subscribe to `GET /generations/{generation_id}/events`
+    (Server-Sent Events) to be pushed each status change as it happens, or
+    connect a WebSocket to `/generations/{generation_id}/progress` for
+    sampler step progress, ETA and live previews as well.
+
+    **Long Polling:** with `wait=N` (up to 60 seconds) the request returns as
+    soon as the status changes, or with the current state after N seconds.
+    Finished generations return immediately.
+    ```python
+    while True:
+        response = requests.get(f"/generations/{generation_id}", params={"wait": 30})
+        if response.json()["status"] in ["completed", "failed"]:
+            break
+    ```
+
     **Polling Pattern:**
     ```python
     while True:
@@ -508,37 +1317,187 @@ async def generate_all_poses(
 
     **When Completed:**
     The response will include output_files with download URLs.
+
+    **Archived Generations:**
+    Completed and failed generations are moved to an archive after
+    GENERATION_ARCHIVE_DAYS. They are still returned here, but no longer
+    appear in GET /generations or its counts.
+
+    **Read Replicas:**
+    When read replicas are configured, polls are served from a replica. A
+    client that just wrote (e.g. created a generation) reads from the primary
+    for a few seconds, and a generation missing on a lagging replica is
+    looked up on the primary before returning 404.
+
+    **Conditional Requests:**
+    Responses carry an `ETag` that changes whenever the generation does.
+    Send it back in `If-None-Match` and an unchanged generation is answered
+    with an empty `304 Not Modified`, checked against the stored version
+    without loading the generation. Combined with `wait`, the request
+    returns as soon as the client's copy is out of date, or 304 on timeout.
+    ```python
+    headers = {}
+    while True:
+        response = requests.get(f"/generations/{generation_id}", headers=headers)
+        if response.status_code == 200:  # 304: nothing new, keep the last body
+            headers["If-None-Match"] = response.headers["ETag"]
+            if response.json()["status"] in ["completed", "failed"]:
+                break
+        time.sleep(2)
+    ```
+
+    **Smaller Responses:**
+    - The ComfyUI workflow is omitted unless `include_workflow=true`
+    - `fields=status,completed_at` returns only those fields (generation_id is
+      always included), loading only the matching columns from the database
+    ```
+    GET /generations/{id}?fields=status,error
+    ```
     """,
     tags=["Generation Management"]
 )
 async def get_generation(
+    request: Request,
     generation_id: str,
-    db: Session = Depends(get_db)
+    include_workflow: bool = Query(False, description="Include the full ComfyUI workflow JSON"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. status,completed_at)"),
+    wait: int = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait for the next status change (long poll)")
 ) -> AvatarResponse:
     """Get generation status and results"""
-    gen_service = GenerationService(db)
-    generation = gen_service.get_generation(generation_id)
+    requested_fields = _parse_fields(fields)
+    if_none_match = request.headers.get("if-none-match")
+
+    if not wait:
+        if if_none_match:
+            # Unchanged polls are answered from the version column alone
+            version = await run_in_threadpool(_read_generation_version, request, generation_id)
+            if version is not None:
+                etag = _generation_etag(version, include_workflow, requested_fields)
+                if _etag_matches(if_none_match, etag):
+                    return _not_modified(etag)
+
+        status, response = await run_in_threadpool(
+            _read_generation, request, generation_id, include_workflow, requested_fields
+        )
+        return _conditional_response(if_none_match, response)
 
-    if not generation:
+    # Long poll: subscribe before reading so a change in between still wakes
+    # us; no thread or session is held while parked
+    with event_bus.subscribe(generation_ids=[generation_id]) as subscription:
+        status, response = await run_in_threadpool(
+            _read_generation, request, generation_id, include_workflow, requested_fields
+        )
+        etag = response.headers.get("etag")
+        if status in FINAL_EVENT_STATUSES or (if_none_match and etag and not _etag_matches(if_none_match, etag)):
+            # Finished, or the client's copy is already out of date
+            return _conditional_response(if_none_match, response)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        event = await subscription.get(timeout=wait)
+        while event is not None and event["status"] == status:
+            # Same status (e.g. prompt accepted by ComfyUI) - keep waiting
+            # for whatever is left of the wait
+            event = await subscription.get(timeout=max(0.0, deadline - loop.time()))
+
+    if event is None:
+        return _conditional_response(if_none_match, response)
+    if event["status"] == DELETED_STATUS:
         raise HTTPException(status_code=404, detail="Generation not found")
 
-    # Parse output files if available
-    output_files = None
-    if generation.output_files:
-        output_files = [OutputFile(**f) for f in generation.output_files]
-
-    return AvatarResponse(
-        generation_id=generation.generation_id,
-        status=generation.status,
-        message=f"Generation {generation.status}",
-        workflow=generation.workflow if generation.workflow else None,
-        output_files=output_files,
-        created_at=generation.created_at,
-        started_at=generation.started_at,
-        completed_at=generation.completed_at,
-        error=generation.error_message,
-        comfyui_prompt_id=generation.comfyui_prompt_id
+    # Read the change from the primary; a replica may not have it yet
+    status, response = await run_in_threadpool(
+        _read_generation, request, generation_id, include_workflow, requested_fields, True
     )
+    return _conditional_response(if_none_match, response)
+
+
+def _generation_etag(version: Optional[int], include_workflow: bool, requested_fields: Optional[List[str]]) -> str:
+    """Weak ETag for one representation (workflow/fields) of a generation version"""
+    variant = f"{int(include_workflow)}:{','.join(requested_fields or [])}"
+    return f'W/"{version or 0}-{zlib.crc32(variant.encode()):08x}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header with an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def _conditional_response(if_none_match: Optional[str], response: Response) -> Response:
+    """Replace a response with 304 Not Modified if the client's copy is current"""
+    etag = response.headers.get("etag")
+    if etag and _etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    return response
+
+
+def _read_generation_version(request: Request, generation_id: str) -> Optional[int]:
+    """Look up only a generation's version in a short-lived session"""
+    db = open_read_session(request)
+    try:
+        return GenerationService(db).get_generation_version(generation_id)
+    finally:
+        db.close()
+
+
+def _read_generation(
+    request: Request,
+    generation_id: str,
+    include_workflow: bool,
+    requested_fields: Optional[List[str]],
+    primary: bool = False
+) -> Tuple[str, Any]:
+    """
+    Load a generation and build its response in short-lived sessions
+
+    Returns:
+        Tuple of (status, response with ETag)
+    """
+    columns = _field_columns(requested_fields)
+    if columns:
+        # Long polls compare statuses and ETags carry the version, even when
+        # the response omits them
+        columns = list(dict.fromkeys([*columns, "status", "version"]))
+
+    db = SessionLocal() if primary else open_read_session(request)
+    try:
+        gen_service = GenerationService(db)
+        generation = gen_service.get_generation(generation_id, include_workflow=include_workflow, columns=columns)
+
+        if not generation and is_replica_session(db):
+            # The replica may not have caught up with a just-created generation
+            db.close()
+            db = SessionLocal()
+            gen_service = GenerationService(db)
+            generation = gen_service.get_generation(generation_id, include_workflow=include_workflow, columns=columns)
+
+        if not generation:
+            raise HTTPException(status_code=404, detail="Generation not found")
+
+        workflow = None
+        if include_workflow or (requested_fields and "workflow" in requested_fields):
+            workflow = gen_service.get_workflow(generation)
+
+        if requested_fields:
+            response = _json_response(_generation_fields(generation, requested_fields, workflow))
+        elif settings.FAST_JSON_RESPONSES:
+            response = FastJSONResponse(_generation_dict(generation, workflow))
+        else:
+            response = JSONResponse(jsonable_encoder(_generation_response(generation, workflow)))
+        response.headers["ETag"] = _generation_etag(generation.version, include_workflow, requested_fields)
+        response.headers["Cache-Control"] = "no-cache"
+        return generation.status, response
+    finally:
+        db.close()
 
 
 @router.get(
@@ -550,71 +1509,141 @@ async def get_generation(
 
     **Query Parameters:**
     - **limit**: Max results per page (default: 50, max: 100)
-    - **offset**: Skip this many results (for pagination)
+    - **cursor**: Continue after a previous page (use `next_cursor` from the last response)
+    - **offset**: Skip this many results (legacy pagination, slow on deep pages)
     - **status**: Filter by status (queued, processing, completed, failed)
+    - **user_id**: Only this user's generations
+    - **include_total**: Include the total matching count (default: true, served from maintained counters)
+    - **include_workflow**: Include each generation's ComfyUI workflow (default: false)
+    - **fields**: Comma-separated fields to return per generation, e.g. `status,created_at`
 
     **Pagination Example:**
     ```
     # Page 1
-    GET /generations?limit=10&offset=0
+    GET /generations?limit=10
 
-    # Page 2
-    GET /generations?limit=10&offset=10
+    # Page 2 (next_cursor from page 1)
+    GET /generations?limit=10&cursor=WyIyMDI1LTAxLTAxVDAwOjAw...
 
-    # Only completed
-    GET /generations?status=completed
+    # Only completed, without counting
+    GET /generations?status=completed&include_total=false
     ```
+
+    Cursor pagination stays fast at any depth; `next_cursor` is null on the last page.
+
+    **Serialization:** with FAST_JSON_RESPONSES enabled, pages are encoded
+    straight from the rows with orjson (or pydantic-core's encoder when
+    orjson is not installed) instead of building and re-validating a
+    response model per generation. The JSON is the same either way.
     """,
     tags=["Generation Management"]
 )
-async def list_generations(
+def list_generations(
     limit: int = Query(50, ge=1, le=100, description="Number of results to return"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
     status: Optional[str] = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    user_id: Optional[str] = Query(None, description="Filter by user ID"),
+    include_total: bool = Query(True, description="Include the total matching count"),
+    include_workflow: bool = Query(False, description="Include the full ComfyUI workflow JSON"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return per generation"),
+    db: Session = Depends(get_read_db)
 ) -> GenerationListResponse:
     """List generations with pagination and filtering"""
+    requested_fields = _parse_fields(fields)
+
     gen_service = GenerationService(db)
 
     generations = gen_service.list_generations(
         limit=limit,
         offset=offset,
-        status=status
+        status=status,
+        cursor=cursor,
+        user_id=user_id,
+        include_workflow=include_workflow,
+        columns=_field_columns(requested_fields)
     )
 
-    # Get total count
-    total_query = db.query(Generation)
-    if status:
-        total_query = total_query.filter(Generation.status == status)
-    total = total_query.count()
-
-    # Convert to response models
-    generation_responses = []
-    for gen in generations:
-        output_files = None
-        if gen.output_files:
-            output_files = [OutputFile(**f) for f in gen.output_files]
-
-        generation_responses.append(AvatarResponse(
-            generation_id=gen.generation_id,
-            status=gen.status,
-            message=f"Generation {gen.status}",
-            output_files=output_files,
-            created_at=gen.created_at,
-            started_at=gen.started_at,
-            completed_at=gen.completed_at,
-            error=gen.error_message,
-            comfyui_prompt_id=gen.comfyui_prompt_id
-        ))
+    # A full page may have more results after it
+    next_cursor = None
+    if len(generations) == limit:
+        next_cursor = gen_service.encode_cursor(generations[-1])
+
+    total = gen_service.count_generations(status, user_id) if include_total else None
+
+    with_workflow = include_workflow or bool(requested_fields and "workflow" in requested_fields)
+    workflows = [gen_service.get_workflow(gen) if with_workflow else None for gen in generations]
+
+    if requested_fields:
+        return _json_response({
+            "total": total,
+            "generations": [
+                _generation_fields(gen, requested_fields, workflow)
+                for gen, workflow in zip(generations, workflows)
+            ],
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor
+        })
+
+    if settings.FAST_JSON_RESPONSES:
+        return FastJSONResponse({
+            "total": total,
+            "generations": [_generation_dict(gen, workflow) for gen, workflow in zip(generations, workflows)],
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor
+        })
 
     return GenerationListResponse(
         total=total,
-        generations=generation_responses,
+        generations=[_generation_response(gen, workflow) for gen, workflow in zip(generations, workflows)],
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_cursor=next_cursor
     )
 
 
+@router.get(
+    "/generations/{generation_id}/webhooks",
+    response_model=List[WebhookDeliveryResponse],
+    summary="List Completion Webhook Deliveries",
+    description="""
+    Show the delivery state of the callbacks registered for a generation.
+
+    **Delivery Lifecycle:**
+    - `waiting`: The generation has not finished yet
+    - `pending`: Due, or waiting for a retry after a failed attempt
+    - `sending`: Being sent right now
+    - `delivered`: The receiver answered with a 2xx status
+    - `failed`: Gave up after WEBHOOK_MAX_ATTEMPTS attempts, or the receiver
+      rejected the payload with a 4xx status
+
+    **Retries:** Failed attempts are retried with exponential backoff and
+    jitter, starting at WEBHOOK_BACKOFF_SECONDS and capped at
+    WEBHOOK_MAX_BACKOFF_SECONDS. Deliveries are persisted, so retries
+    survive restarts.
+
+    **Verifying Deliveries:** Each POST carries `X-AvatarForge-Timestamp`
+    and `X-AvatarForge-Signature: sha256=<hex>`, the HMAC-SHA256 of
+    `"{timestamp}.{raw body}"` keyed with WEBHOOK_SECRET.
+    `X-AvatarForge-Delivery` holds the delivery ID (comma-separated when
+    several completions are batched into one `{"events": [...]}` body);
+    a delivery can arrive more than once, so deduplicate on it.
+    """,
+    tags=["Generation Management"]
+)
+def list_generation_webhooks(
+    generation_id: str,
+    db: Session = Depends(get_db)
+):
+    """List webhook deliveries for a generation"""
+    deliveries = WebhookService(db).list_deliveries(generation_id)
+    if not deliveries and not GenerationService(db).get_generation(generation_id, columns=["status"]):
+        raise HTTPException(status_code=404, detail="Generation not found")
+    return deliveries
+
+
 @router.delete(
     "/generations/{generation_id}",
     summary="Delete Generation",
@@ -631,7 +1660,7 @@ async def list_generations(
     """,
     tags=["Generation Management"]
 )
-async def delete_generation(
+def delete_generation(
     generation_id: str,
     db: Session = Depends(get_db)
 ):
@@ -645,6 +1674,61 @@ async def delete_generation(
         raise HTTPException(status_code=404, detail="Generation not found")
 
 
+@router.post(
+    "/generations/bulk-delete",
+    response_model=BulkDeleteResponse,
+    summary="Bulk Delete Generations",
+    description="""
+    Delete many generations at once and decrement their file references.
+
+    **Filters (combined with AND, at least one required):**
+    - **generation_ids**: Specific generation IDs
+    - **status**: e.g. "failed"
+    - **user_id**: A single user's generations
+    - **created_after** / **created_before**: Creation time range
+
+    **Example:**
+    ```json
+    {
+        "status": "failed",
+        "created_before": "2025-01-01T00:00:00Z"
+    }
+    ```
+
+    Archived generations matching the filters are deleted too. Deletion runs
+    in batches; each batch releases file references with a single grouped
+    update, so large purges finish quickly.
+
+    **Note:** Like single deletes, this does NOT delete output files.
+    """,
+    tags=["Generation Management"]
+)
+def bulk_delete_generations(
+    request: BulkDeleteRequest,
+    db: Session = Depends(get_db)
+) -> BulkDeleteResponse:
+    """Delete generations matching filters"""
+    if not request.model_dump(exclude_none=True):
+        raise HTTPException(
+            status_code=400,
+            detail="At least one filter is required (generation_ids, status, user_id, created_after, created_before)"
+        )
+
+    gen_service = GenerationService(db)
+    deleted = gen_service.bulk_delete_generations(
+        generation_ids=request.generation_ids,
+        status=request.status,
+        user_id=request.user_id,
+        created_after=request.created_after,
+        created_before=request.created_before
+    )
+
+    return BulkDeleteResponse(
+        deleted=deleted,
+        message=f"Deleted {deleted} generation(s)"
+    )
+
+
 # ============================================================================
 # UTILITY ENDPOINTS
 # ============================================================================
@@ -659,22 +1743,30 @@ async def delete_generation(
     - API status (always "healthy" if you get a response)
     - ComfyUI connection status
     - ComfyUI system stats (if available)
+    - Database connection pool usage (pool size, checked out/in connections,
+      overflow, and cumulative connects/checkouts/invalidations)
 
     **Use this to:**
     - Verify API is running
     - Check if ComfyUI backend is accessible
     - Monitor system resources
+    - Spot connection pool exhaustion or churn
     """,
     tags=["Utility"]
 )
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """Health check for API and ComfyUI"""
     gen_service = GenerationService(db)
     comfyui_health = gen_service.check_comfyui_health()
 
     return {
         "api_status": "healthy",
-        "comfyui": comfyui_health
+        "comfyui": comfyui_health,
+        "database": pool_status(engine),
+        "replicas": [
+            {"url": url, "available": available, **pool_status(replica_engine)}
+            for (url, available), replica_engine in zip(replicas.status(), replicas.engines)
+        ]
     }
 
 
@@ -741,7 +1833,7 @@ async def list_poses():
     """,
     tags=["Maintenance"]
 )
-async def cleanup_orphaned_files(
+def cleanup_orphaned_files(
     days: int = Query(None, ge=1, le=365, description="Delete files older than this many days (overrides config)"),
     db: Session = Depends(get_db)
 ) -> CleanupResponse:
@@ -763,3 +1855,45 @@ async def cleanup_orphaned_files(
         cleanup_days=cleanup_days,
         message=f"Cleanup complete. Deleted {files_deleted} orphaned file(s) older than {cleanup_days} days."
     )
+
+
+@router.post(
+    "/cleanup/storage-budget",
+    response_model=StorageBudgetResponse,
+    summary="Enforce Storage Budget",
+    description="""
+    Manually evict files until hot storage fits the storage budget.
+
+    **What gets deleted:**
+    - Files with reference_count = 0 (uploads, outputs and other stored blobs)
+    - Least recently accessed first
+    - Only as many as needed to get under the budget
+
+    Files referenced by a generation and files in cold storage are never evicted.
+
+    **Note:** When STORAGE_BUDGET_BYTES is set, this runs automatically every
+    STORAGE_EVICTION_INTERVAL_MINUTES if ENABLE_SCHEDULER is True.
+
+    **Query Parameters:**
+    - `budget_bytes` (optional): Override the configured STORAGE_BUDGET_BYTES
+    """,
+    tags=["Maintenance"]
+)
+def enforce_storage_budget(
+    budget_bytes: int = Query(None, ge=0, description="Hot storage budget in bytes (overrides config)"),
+    db: Session = Depends(get_db)
+) -> StorageBudgetResponse:
+    """Manually trigger storage budget eviction"""
+    budget = budget_bytes if budget_bytes is not None else settings.STORAGE_BUDGET_BYTES
+    if not budget:
+        raise HTTPException(status_code=400, detail="No storage budget configured. Set STORAGE_BUDGET_BYTES or pass budget_bytes.")
+
+    file_service = FileService(db)
+    files_evicted, bytes_freed = file_service.enforce_storage_budget(budget)
+
+    return StorageBudgetResponse(
+        files_evicted=files_evicted,
+        bytes_freed=bytes_freed,
+        budget_bytes=budget,
+        message=f"Evicted {files_evicted} file(s), freed {bytes_freed} bytes to stay under {budget} bytes."
+    )
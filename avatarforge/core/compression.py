@@ -0,0 +1,212 @@
+"""
+Negotiated response compression
+
+CompressionMiddleware compresses text-like responses (JSON, NDJSON, CSV,
+...) with brotli or gzip, whichever the client prefers from those
+available. Brotli is used only when the optional brotli package is
+installed.
+
+Responses are left alone when their content type is not in the allowlist
+(images from GET /files/{id}, ZIP archives, gzip exports and Server-Sent
+Events, which must not be buffered), when they already carry a
+Content-Encoding, or when the body is smaller than the threshold.
+Streamed responses are compressed chunk by chunk and flushed after each
+chunk, so the client keeps receiving data as it is produced.
+"""
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+# gzip container (not raw deflate or zlib)
+GZIP_WBITS = 31
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[coding] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding the client accepts ('br', 'gzip' or None)"""
+    accepted = accepted_encodings(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        # Ties go to the earlier (denser) coding
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor for one response"""
+
+    def __init__(self, encoding: str, level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so it can be sent now"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and end the stream"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses with brotli or gzip"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = ("application/json",)
+    ):
+        """
+        Args:
+            app: Application to wrap
+            minimum_size: Don't compress bodies smaller than this many bytes
+            level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+            content_types: Media types that may be compressed
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.content_types = {content_type.lower() for content_type in content_types}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Wraps send() for one response, deciding on the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        # None until decided; then True (compressing) or False (pass through)
+        self.compressing: Optional[bool] = None
+        self.compressor: Optional[_Compressor] = None
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return media_type in self.middleware.content_types
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Held until the first body message shows whether to compress
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            # e.g. http.response.pathsend for files: never compressed
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            await self._send(message)
+            return
+
+        if self.compressing is None:
+            await self._decide(message)
+            return
+
+        if not self.compressing:
+            await self._send(message)
+            return
+
+        more_body = message.get("more_body", False)
+        if more_body:
+            body = self.compressor.compress(message.get("body", b""))
+        else:
+            body = self.compressor.finish(message.get("body", b""))
+        if body or not more_body:
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _decide(self, message: Message):
+        """Handle the first body message, choosing compression or pass-through"""
+        self.start["headers"] = list(self.start.get("headers", []))
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self._eligible(headers):
+            self.compressing = False
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        # Caches must keep compressed and uncompressed copies apart
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body and len(body) < self.middleware.minimum_size:
+            self.compressing = False
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        self.compressing = True
+        self.compressor = _Compressor(self.encoding, self.middleware.level, self.middleware.brotli_quality)
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            # Streamed: the compressed length is not known up front
+            del headers["Content-Length"]
+            body = self.compressor.compress(body)
+        else:
+            body = self.compressor.finish(body)
+            headers["Content-Length"] = str(len(body))
+
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
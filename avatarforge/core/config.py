@@ -16,6 +16,36 @@ class Settings(BaseSettings):
     # Server settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKER_THREADS: int = Field(
+        default=40,
+        description="Threads available for blocking endpoint work (database queries); keep near DB_POOL_SIZE + DB_MAX_OVERFLOW"
+    )
+    FAST_JSON_RESPONSES: bool = Field(
+        default=False,
+        description="Serialize generation responses straight from rows with orjson (or pydantic-core), skipping response model validation"
+    )
+
+    # Response compression settings
+    RESPONSE_COMPRESSION: bool = Field(
+        default=True,
+        description="Compress JSON and other text responses with brotli (if installed) or gzip when the client accepts it"
+    )
+    COMPRESSION_MINIMUM_SIZE: int = Field(
+        default=1024,
+        description="Don't compress response bodies smaller than this many bytes"
+    )
+    COMPRESSION_LEVEL: int = Field(
+        default=6,
+        description="gzip compression level (1 = fastest, 9 = smallest)"
+    )
+    COMPRESSION_BROTLI_QUALITY: int = Field(
+        default=4,
+        description="brotli quality (0 = fastest, 11 = smallest)"
+    )
+    COMPRESSION_CONTENT_TYPES: List[str] = Field(
+        default=["application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"],
+        description="Media types that may be compressed; images, archives and event streams are never listed"
+    )
 
     # CORS settings
     ALLOWED_ORIGINS: List[str] = ["*"]
@@ -25,6 +55,46 @@ class Settings(BaseSettings):
         default="sqlite:///./avatarforge.db",
         description="Database connection URL"
     )
+    DATABASE_ENGINE_PROFILE: str = Field(
+        default="auto",
+        description="Engine tuning profile: 'auto' (by URL), 'sqlite', 'server' or 'default' (no tuning)"
+    )
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(
+        default=5000,
+        description="How long SQLite waits for a lock before raising 'database is locked'"
+    )
+    SQLITE_MMAP_SIZE: int = Field(
+        default=256 * 1024 * 1024,  # 256MB
+        description="Bytes of the SQLite database file to memory-map"
+    )
+    SQLITE_CACHE_SIZE_KB: int = Field(
+        default=64 * 1024,  # 64MB
+        description="SQLite page cache size per connection in KiB"
+    )
+    DB_POOL_SIZE: int = Field(
+        default=10,
+        description="Connections kept open in the pool (server databases)"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=20,
+        description="Extra connections allowed above DB_POOL_SIZE under load (server databases)"
+    )
+    DB_POOL_TIMEOUT_SECONDS: int = Field(
+        default=30,
+        description="Seconds to wait for a free pooled connection (server databases)"
+    )
+    DB_POOL_RECYCLE_SECONDS: int = Field(
+        default=1800,
+        description="Replace pooled connections older than this many seconds (server databases)"
+    )
+    DATABASE_REPLICA_URLS: List[str] = Field(
+        default=[],
+        description="Read replica URLs for read-only endpoints (JSON list); empty = all traffic on the primary"
+    )
+    READ_YOUR_WRITES_SECONDS: int = Field(
+        default=5,
+        description="After a client writes, serve its reads from the primary for this many seconds"
+    )
 
     # Security settings
     SECRET_KEY: str = Field(
@@ -54,6 +124,116 @@ class Settings(BaseSettings):
         default=30,
         description="Delete orphaned files after this many days of no use"
     )
+    PERCEPTUAL_HASH_MAX_DISTANCE: int = Field(
+        default=6,
+        description="Maximum Hamming distance (out of 64 bits) for two images to count as near-duplicates"
+    )
+    PIXEL_DEDUPE_ENABLED: bool = Field(
+        default=False,
+        description="Deduplicate uploads by a hash of their decoded pixels, ignoring metadata and compression differences"
+    )
+    STRIP_IMAGE_METADATA: bool = Field(
+        default=False,
+        description="Losslessly strip EXIF/XMP/text metadata from PNG and JPEG files before storing them"
+    )
+    USER_STORAGE_QUOTA_BYTES: int = Field(
+        default=0,
+        description="Maximum bytes a single user may hold (0 = unlimited)"
+    )
+    USER_STORAGE_QUOTA_FILES: int = Field(
+        default=0,
+        description="Maximum number of files a single user may hold (0 = unlimited)"
+    )
+
+    # Cold storage tier settings
+    COLD_STORAGE_PATH: str = Field(
+        default="./storage/cold",
+        description="Directory for compressed pack files holding rarely accessed files (can be a cheaper volume)"
+    )
+    COLD_TIER_DAYS: int = Field(
+        default=90,
+        description="Move files to cold storage after this many days without access (0 = disabled)"
+    )
+    COLD_PACK_MAX_BYTES: int = Field(
+        default=1024 * 1024 * 1024,  # 1GB
+        description="Start a new pack file once the current one reaches this size"
+    )
+
+    # Storage budget settings
+    STORAGE_BUDGET_BYTES: int = Field(
+        default=0,
+        description="Keep hot storage under this many bytes by evicting least recently used unreferenced files (0 = disabled)"
+    )
+    STORAGE_EVICTION_INTERVAL_MINUTES: int = Field(
+        default=15,
+        description="How often to enforce the storage budget"
+    )
+
+    # Generation archive settings
+    GENERATION_ARCHIVE_DAYS: int = Field(
+        default=30,
+        description="Archive completed/failed generations this many days after they finish (0 = disabled)"
+    )
+    GENERATION_ARCHIVE_BATCH_SIZE: int = Field(
+        default=500,
+        description="Generations moved to the archive per transaction"
+    )
+    GENERATION_EXPORT_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Rows fetched and serialized per chunk when streaming a generation export"
+    )
+
+    # Generation status streaming settings
+    GENERATION_EVENT_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Undelivered status events buffered per subscriber before the oldest are dropped"
+    )
+    SSE_HEARTBEAT_SECONDS: int = Field(
+        default=15,
+        description="Send a keep-alive comment on idle status streams this often"
+    )
+
+    # Completion webhook settings
+    WEBHOOK_SECRET: str = Field(
+        default="",
+        description="HMAC key for webhook signatures; required to send webhooks (empty = deliveries stay queued)"
+    )
+    WEBHOOK_ALLOW_PRIVATE_ADDRESSES: bool = Field(
+        default=False,
+        description="Deliver webhooks to loopback, private and link-local addresses (local development only)"
+    )
+    WEBHOOK_WORKERS: int = Field(
+        default=8,
+        description="Maximum concurrent webhook POSTs (0 = do not send webhooks from this process)"
+    )
+    WEBHOOK_BATCH_SIZE: int = Field(
+        default=1,
+        description="Completions for the same callback URL sent together in one POST (1 = no batching)"
+    )
+    WEBHOOK_MAX_ATTEMPTS: int = Field(
+        default=8,
+        description="Give up on a webhook delivery after this many attempts"
+    )
+    WEBHOOK_BACKOFF_SECONDS: float = Field(
+        default=5,
+        description="Delay before the first webhook retry; doubles after each failed attempt"
+    )
+    WEBHOOK_MAX_BACKOFF_SECONDS: float = Field(
+        default=3600,
+        description="Longest delay between webhook retries"
+    )
+    WEBHOOK_TIMEOUT_SECONDS: float = Field(
+        default=10,
+        description="Timeout for a single webhook POST"
+    )
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = Field(
+        default=5,
+        description="Check the outbox for due deliveries this often when no completion wakes the sender"
+    )
+    WEBHOOK_RETENTION_DAYS: int = Field(
+        default=7,
+        description="Delete delivered and failed webhook records after N days"
+    )
 
     # Scheduled tasks settings
     ENABLE_SCHEDULER: bool = Field(
@@ -70,6 +250,14 @@ class Settings(BaseSettings):
         default="http://localhost:8188",
         description="ComfyUI API base URL"
     )
+    COMFYUI_PREVIEW_MAX_DIMENSION: int = Field(
+        default=256,
+        description="Downscale live preview frames relayed to clients to fit this many pixels"
+    )
+    COMFYUI_PREVIEW_MIN_INTERVAL_MS: int = Field(
+        default=250,
+        description="Relay at most one preview frame per generation this often"
+    )
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
@@ -0,0 +1,33 @@
+"""
+Fast JSON responses
+
+Endpoints normally return Pydantic models, which FastAPI validates again
+against the response model and encodes with the standard json module. For
+large pages that is most of the request's CPU time. FastJSONResponse takes
+plain dicts built straight from the rows and encodes them in one native
+pass: with orjson when it is installed, otherwise with pydantic-core's
+encoder. Datetimes are written the same way the response models write them.
+"""
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return pydantic_core.to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (or pydantic-core) instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
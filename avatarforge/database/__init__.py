@@ -1,5 +1,5 @@
 """Database layer with SQLAlchemy"""
-from avatarforge.database.session import SessionLocal, engine, get_db
+from avatarforge.database.session import SessionLocal, engine, get_db, get_read_db
 from avatarforge.database.base import Base
 
-__all__ = ["SessionLocal", "engine", "get_db", "Base"]
+__all__ = ["SessionLocal", "engine", "get_db", "get_read_db", "Base"]
@@ -0,0 +1,146 @@
+"""
+Database engine profiles
+
+Profiles tune the engine for the database it talks to:
+
+- default: driver defaults (no tuning)
+- sqlite: WAL journaling, synchronous=NORMAL, busy timeout, mmap and page
+  cache pragmas applied to every new connection
+- server: connection pool sizing, overflow, recycling and pre-ping for
+  PostgreSQL/MySQL
+- auto: sqlite or server depending on DATABASE_URL
+"""
+import threading
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+from avatarforge.core.config import settings
+
+ENGINE_PROFILES = {"default", "sqlite", "server", "auto"}
+
+
+def resolve_profile(url: str, profile: str) -> str:
+    """
+    Resolve the profile to apply for a database URL
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database engine profile: {profile}. Allowed: {', '.join(sorted(ENGINE_PROFILES))}")
+    if profile == "auto":
+        return "sqlite" if make_url(url).get_backend_name() == "sqlite" else "server"
+    return profile
+
+
+def engine_options(url: str, profile: str) -> Dict[str, Any]:
+    """Keyword arguments for create_engine under a profile"""
+    options: Dict[str, Any] = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+
+    if resolve_profile(url, profile) == "server":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+        )
+    return options
+
+
+def _apply_sqlite_pragmas(engine: Engine, in_memory: bool):
+    """Set SQLite pragmas on every new connection"""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if not in_memory:
+                # WAL lets readers proceed while a writer holds the lock
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            # Negative cache_size is in KiB rather than pages
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
+
+
+class PoolMetrics:
+    """Counts pool activity via pool events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.checkouts = 0
+        self.invalidations = 0
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_created += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+def build_engine(url: str, profile: str) -> Engine:
+    """
+    Create an engine tuned by the given profile
+
+    Args:
+        url: Database URL
+        profile: Engine profile name ('default', 'sqlite', 'server', 'auto')
+
+    Returns:
+        Engine with pool metrics attached as engine.pool_metrics
+    """
+    engine = create_engine(url, **engine_options(url, profile))
+
+    if resolve_profile(url, profile) == "sqlite":
+        database = make_url(url).database
+        _apply_sqlite_pragmas(engine, in_memory=database in (None, "", ":memory:"))
+
+    engine.pool_metrics = PoolMetrics()
+    engine.pool_metrics.attach(engine)
+    return engine
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Report connection pool usage
+
+    Returns:
+        Dict with the pool class, current usage (for queue pools) and
+        cumulative connect/checkout/invalidation counts
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+
+    metrics = getattr(engine, "pool_metrics", None)
+    if metrics is not None:
+        status.update(
+            connections_created=metrics.connections_created,
+            checkouts=metrics.checkouts,
+            invalidations=metrics.invalidations,
+        )
+    return status
@@ -0,0 +1,101 @@
+"""
+Full-text search index over generation prompts
+
+SQLite: an external-content FTS5 table (generations_fts) over prompt,
+clothing and style, kept in sync with generations by triggers.
+
+PostgreSQL: a GIN expression index on the tsvector of the same columns,
+which the database maintains itself.
+
+Other databases have no index; search falls back to LIKE matching.
+
+The FTS5 table maps entries to generations by SQLite rowid. VACUUM may
+renumber rowids of tables without an INTEGER PRIMARY KEY, so run
+rebuild_fulltext_index after vacuuming the database.
+"""
+from sqlalchemy import column, table, text
+from sqlalchemy.engine import Connection
+
+FTS_TABLE = "generations_fts"
+SEARCH_CONFIG = "english"
+
+# tsvector expression shared by the PostgreSQL index and queries so the
+# planner can use the index
+PG_DOCUMENT = (
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(generations.prompt, '') || ' ' || "
+    "coalesce(generations.clothing, '') || ' ' || coalesce(generations.style, ''))"
+)
+
+# Lightweight handle for querying the FTS5 table (not part of the ORM metadata)
+generations_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE))
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        prompt, clothing, style,
+        content='generations', content_rowid='rowid',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS generations_fts_insert AFTER INSERT ON generations BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, prompt, clothing, style)
+        VALUES (new.rowid, new.prompt, new.clothing, new.style);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS generations_fts_delete AFTER DELETE ON generations BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, prompt, clothing, style)
+        VALUES ('delete', old.rowid, old.prompt, old.clothing, old.style);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS generations_fts_update
+        AFTER UPDATE OF prompt, clothing, style ON generations BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, prompt, clothing, style)
+        VALUES ('delete', old.rowid, old.prompt, old.clothing, old.style);
+        INSERT INTO {FTS_TABLE}(rowid, prompt, clothing, style)
+        VALUES (new.rowid, new.prompt, new.clothing, new.style);
+    END""",
+]
+
+PG_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_generations_fulltext ON generations USING GIN ({PG_DOCUMENT})",
+]
+
+
+def install_fulltext_index(target, connection: Connection, **kw):
+    """
+    Create the full-text index for the connection's database (idempotent)
+
+    Registered as an after_create listener on the generations table, and
+    safe to call on existing databases: a newly created SQLite index is
+    populated from the rows already present.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existed = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            rebuild_fulltext_index(connection)
+    elif dialect == "postgresql":
+        for statement in PG_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_fulltext_index(target, connection: Connection, **kw):
+    """Drop the SQLite FTS5 table with the generations table (its triggers go with it)"""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_fulltext_index(connection: Connection):
+    """Re-index every generation (SQLite only; PostgreSQL indexes need no rebuild)"""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def fts5_query(terms: str) -> str:
+    """
+    Quote user input as FTS5 terms so punctuation can't break the syntax
+
+    Every whitespace-separated word must match (implicit AND).
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in terms.split())
@@ -6,8 +6,14 @@ Run this to create all database tables
 from sqlalchemy import create_engine
 from avatarforge.database.base import Base
 from avatarforge.core.config import settings
+from avatarforge.database.migrations import upgrade_schema
 from avatarforge.models.uploaded_file import UploadedFile
 from avatarforge.models.generation import Generation
+from avatarforge.models.storage_usage import UserStorageUsage, FileOwner
+from avatarforge.models.generation_counter import GenerationCounter
+from avatarforge.models.workflow_blob import WorkflowBlob
+from avatarforge.models.archived_generation import ArchivedGeneration
+from avatarforge.models.webhook_delivery import WebhookDelivery
 
 
 def init_db():
@@ -17,9 +23,21 @@ def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
 
+    # Add columns and indexes that existing tables are missing
+    upgraded = upgrade_schema(engine)
+
     print("✓ Database tables created successfully!")
     print(f"  - uploaded_files")
     print(f"  - generations")
+    print(f"  - generations_fts (full-text search index, SQLite)")
+    print(f"  - user_storage_usage")
+    print(f"  - file_owners")
+    print(f"  - generation_counters")
+    print(f"  - workflow_blobs")
+    print(f"  - archived_generations")
+    print(f"  - webhook_deliveries")
+    if upgraded:
+        print(f"✓ Upgraded existing tables: {', '.join(upgraded)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+"""
+Schema upgrades for existing databases
+
+Base.metadata.create_all creates missing tables but never changes tables
+that already exist. Columns added to a table after it first shipped are
+listed in ADDED_COLUMNS; upgrade_schema adds any of them an existing
+database lacks (ALTER TABLE ... ADD COLUMN) and then creates the table's
+missing indexes.
+
+upgrade_schema is idempotent. It runs from init_db, at application startup
+and before data migrations such as scripts/migrate_workflows.py.
+"""
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from avatarforge.database.base import Base
+
+# Columns added to existing tables, by table
+ADDED_COLUMNS = {
+    "generations": ["workflow_hash", "version"],
+    "uploaded_files": [
+        "perceptual_hash", "pixel_hash", "storage_tier", "pack_name", "pack_offset", "pack_length"
+    ],
+}
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Add missing columns and indexes to existing tables
+
+    Tables that don't exist yet are skipped; create_all creates them whole.
+
+    Returns:
+        Names of the columns ("table.column") and indexes that were added
+    """
+    import avatarforge.models  # noqa: F401 - registers all tables on Base.metadata
+
+    added = []
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        for table_name, column_names in ADDED_COLUMNS.items():
+            if not inspector.has_table(table_name):
+                continue
+            table = Base.metadata.tables[table_name]
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+            for column_name in column_names:
+                if column_name in existing_columns:
+                    continue
+                column_ddl = CreateColumn(table.c[column_name]).compile(dialect=engine.dialect)
+                connection.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}")
+                added.append(f"{table_name}.{column_name}")
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table_name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    added.append(index.name)
+    return added
@@ -0,0 +1,74 @@
+"""
+Read replica routing
+
+Read-only endpoints can be served from replica databases. Replicas are
+used round-robin; a replica that fails to connect is skipped for a cooldown
+period and reads fall back to the primary.
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from avatarforge.database.engine import build_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Round-robin replica sessions with failure cooldown"""
+
+    def __init__(self, urls: List[str], profile: str, cooldown_seconds: float = 30.0):
+        self.engines: List[Engine] = [build_engine(url, profile) for url in urls]
+        self._sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines
+        ]
+        self.cooldown_seconds = cooldown_seconds
+        self._down_until = [0.0] * len(self.engines)
+        self._order = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def _next_candidates(self) -> List[int]:
+        """Replica indexes to try, starting from the next in rotation"""
+        with self._lock:
+            start = next(self._order)
+        now = time.monotonic()
+        indexes = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+        return [i for i in indexes if self._down_until[i] <= now]
+
+    def open_session(self) -> Optional[Session]:
+        """
+        Open a session on an available replica
+
+        Returns:
+            Session bound to a replica with a live connection, or None if no
+            replica is available (callers fall back to the primary)
+        """
+        for index in self._next_candidates():
+            session = self._sessionmakers[index]()
+            try:
+                # Check out a connection now so failures fall back before use
+                session.connection()
+                session.info["replica"] = True
+                return session
+            except DBAPIError as e:
+                session.close()
+                self._down_until[index] = time.monotonic() + self.cooldown_seconds
+                logger.warning(f"Read replica {index} unavailable, falling back: {e}")
+        return None
+
+    def status(self) -> List[Tuple[str, bool]]:
+        """(masked URL, available) per replica"""
+        now = time.monotonic()
+        return [
+            (engine.url.render_as_string(hide_password=True), self._down_until[i] <= now)
+            for i, engine in enumerate(self.engines)
+        ]
@@ -1,23 +1,96 @@
 """Database session management"""
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.orm import Session, sessionmaker
 from avatarforge.core.config import settings
+from avatarforge.database.engine import build_engine
+from avatarforge.database.replicas import ReplicaSet
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+engine = build_engine(settings.DATABASE_URL, settings.DATABASE_ENGINE_PROFILE)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS, settings.DATABASE_ENGINE_PROFILE)
+
+# Cookie marking a client that wrote recently; holds the time until which
+# its reads must see the primary
+READ_YOUR_WRITES_COOKIE = "avatarforge_rw_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
-def get_db():
+
+def get_db(request: Request, response: Response):
     """
     Dependency for getting database session
     Usage: db: Session = Depends(get_db)
+
+    Writes (non-GET requests) mark the client so its reads stay on the
+    primary for READ_YOUR_WRITES_SECONDS when replicas are configured.
     """
+    if len(replicas) and request.method not in SAFE_METHODS:
+        until = int(time.time()) + settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(until),
+            max_age=settings.READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def _recently_wrote(request: Request) -> bool:
+    """Whether the client wrote within the read-your-writes window"""
+    try:
+        return int(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """
+    Dependency for read-only endpoints
+    Usage: db: Session = Depends(get_read_db)
+
+    Returns a session on a read replica when one is configured and
+    reachable, and the primary session otherwise (no replicas, all replicas
+    down, or the client wrote within READ_YOUR_WRITES_SECONDS). Replica
+    sessions are marked with session.info["replica"] = True.
+    """
+    if not len(replicas) or _recently_wrote(request):
+        yield db
+        return
+
+    replica_db = replicas.open_session()
+    if replica_db is None:
+        yield db
+        return
+
+    try:
+        yield replica_db
+    finally:
+        replica_db.close()
+
+
+def is_replica_session(db: Session) -> bool:
+    """Whether a session reads from a replica"""
+    return getattr(db, "info", {}).get("replica") is True
+
+
+def open_read_session(request: Request) -> Session:
+    """
+    Open a read session outside dependency injection
+
+    Follows the same routing as get_read_db. For work that outlives the
+    request handler (e.g. streamed responses); the caller closes the session.
+    """
+    if len(replicas) and not _recently_wrote(request):
+        replica_db = replicas.open_session()
+        if replica_db is not None:
+            return replica_db
+    return SessionLocal()
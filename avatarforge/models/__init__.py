@@ -1,5 +1,10 @@
 """Database models for AvatarForge"""
 from .uploaded_file import UploadedFile
 from .generation import Generation
+from .storage_usage import UserStorageUsage, FileOwner
+from .generation_counter import GenerationCounter
+from .workflow_blob import WorkflowBlob
+from .archived_generation import ArchivedGeneration
+from .webhook_delivery import WebhookDelivery
 
-__all__ = ["UploadedFile", "Generation"]
+__all__ = ["UploadedFile", "Generation", "UserStorageUsage", "FileOwner", "GenerationCounter", "WorkflowBlob", "ArchivedGeneration", "WebhookDelivery"]
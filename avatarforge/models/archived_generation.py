@@ -0,0 +1,36 @@
+"""Database model for archived generations"""
+from sqlalchemy import Column, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+
+class ArchivedGeneration(Base):
+    """
+    Old terminal generation moved out of the generations table
+
+    Only the columns needed to find a row are kept as columns; the full
+    record is stored as zlib-compressed JSON.
+
+    Attributes:
+        generation_id: Unique identifier (UUID) of the original generation
+        user_id: User who requested the generation
+        status: Final status ('completed' or 'failed')
+        pose_file_id: Referenced pose file (still holds a file reference)
+        reference_file_id: Referenced reference file (still holds a file reference)
+        created_at: Original request timestamp
+        payload: zlib-compressed JSON of every generation column
+        archived_at: When the generation was archived
+    """
+    __tablename__ = "archived_generations"
+
+    generation_id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=True, index=True)
+    status = Column(String, nullable=False)
+    pose_file_id = Column(String, nullable=True)
+    reference_file_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    payload = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ArchivedGeneration(id={self.generation_id}, status={self.status})>"
@@ -1,7 +1,10 @@
 """Database model for avatar generation tracking"""
-from sqlalchemy import Column, String, Integer, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Index, ForeignKey, event
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from ..database.base import Base
+from ..database.fulltext import install_fulltext_index, drop_fulltext_index
 
 
 class Generation(Base):
@@ -19,15 +22,25 @@ class Generation(Base):
         reference_file_id: Reference to uploaded reference image
         user_id: User who requested the generation (nullable for backward compatibility)
         status: Current status ('queued', 'processing', 'completed', 'failed')
-        workflow: ComfyUI workflow JSON
+        workflow: Inline ComfyUI workflow JSON for rows stored before workflow_hash (deferred)
+        workflow_hash: Hash of the deduplicated workflow in workflow_blobs
         output_files: JSON array of output file information
         error_message: Error details if status is 'failed'
         comfyui_prompt_id: ComfyUI's prompt ID for tracking
         created_at: Request timestamp
         started_at: Processing start timestamp
         completed_at: Processing completion timestamp
+        version: Incremented on every visible change; served as the ETag
     """
     __tablename__ = "generations"
+    __table_args__ = (
+        # Keyset pagination: newest first, generation_id breaks timestamp ties
+        Index("ix_generations_created_id", "created_at", "generation_id"),
+        Index("ix_generations_status_created_id", "status", "created_at", "generation_id"),
+        Index("ix_generations_user_created_id", "user_id", "created_at", "generation_id"),
+        # Archival job scans terminal generations by completion time
+        Index("ix_generations_status_completed", "status", "completed_at"),
+    )
 
     generation_id = Column(String, primary_key=True)
     prompt = Column(Text, nullable=False)
@@ -39,13 +52,26 @@ class Generation(Base):
     reference_file_id = Column(String, nullable=True)
     user_id = Column(String, nullable=True, index=True)  # User who requested the generation
     status = Column(String, default="queued")  # queued, processing, completed, failed
-    workflow = Column(JSON, nullable=True)
+    # Full ComfyUI graph - only loaded when accessed or explicitly undeferred.
+    # New generations store workflows in workflow_blobs via workflow_hash instead.
+    workflow = deferred(Column(JSON, nullable=True))
+    workflow_hash = Column(String(64), ForeignKey("workflow_blobs.workflow_hash"), nullable=True, index=True)
     output_files = Column(JSON, nullable=True)
     error_message = Column(Text, nullable=True)
     comfyui_prompt_id = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Python-side default gives microsecond timestamps in a consistent format,
+    # which keyset pagination compares against
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    workflow_blob = relationship("WorkflowBlob", lazy="select")
 
     def __repr__(self):
         return f"<Generation(id={self.generation_id}, status={self.status}, prompt={self.prompt[:30]}...)>"
+
+
+# Full-text search over prompt/clothing/style (FTS5 on SQLite, GIN on PostgreSQL)
+event.listen(Generation.__table__, "after_create", install_fulltext_index)
+event.listen(Generation.__table__, "before_drop", drop_fulltext_index)
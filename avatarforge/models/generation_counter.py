@@ -0,0 +1,25 @@
+"""Database model for maintained generation counts"""
+from sqlalchemy import Column, String, Integer
+from ..database.base import Base
+
+
+class GenerationCounter(Base):
+    """
+    Number of generations per scope and status, maintained incrementally
+
+    Adjusted in the same transaction as every insert, status transition and
+    deletion, so counts are primary key lookups instead of table scans.
+
+    Attributes:
+        scope: 'all' for global counts or 'user:{user_id}' for per-user counts
+        status: Generation status ('queued', 'processing', 'completed', 'failed')
+        count: Number of generations in this scope with this status
+    """
+    __tablename__ = "generation_counters"
+
+    scope = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<GenerationCounter(scope={self.scope}, status={self.status}, count={self.count})>"
@@ -0,0 +1,51 @@
+"""Database models for per-user storage accounting"""
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+
+class UserStorageUsage(Base):
+    """
+    Running storage totals per user, maintained incrementally
+
+    Updated in the same transaction as the upload, dedupe hit or deletion
+    that changes it, so usage is an O(1) primary key lookup.
+
+    Attributes:
+        user_id: User the totals belong to
+        bytes_used: Total size of files held by the user
+        file_count: Number of files held by the user
+        updated_at: Last time the totals changed
+    """
+    __tablename__ = "user_storage_usage"
+
+    user_id = Column(String, primary_key=True)
+    bytes_used = Column(BigInteger, nullable=False, default=0)
+    file_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserStorageUsage(user_id={self.user_id}, bytes={self.bytes_used}, files={self.file_count})>"
+
+
+class FileOwner(Base):
+    """
+    Records which users hold a (possibly deduplicated) file
+
+    A user is charged for a file once, whether they uploaded it first or
+    hit an existing copy through deduplication. When the file is deleted
+    every holder is credited back.
+
+    Attributes:
+        file_id: Held file
+        user_id: User holding the file
+        created_at: When the user first uploaded the file
+    """
+    __tablename__ = "file_owners"
+
+    file_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<FileOwner(file_id={self.file_id}, user_id={self.user_id})>"
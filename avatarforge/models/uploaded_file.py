@@ -1,5 +1,5 @@
 """Database model for uploaded files with deduplication support"""
-from sqlalchemy import Column, String, Integer, DateTime, Boolean
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from ..database.base import Base
 
@@ -11,13 +11,19 @@ class UploadedFile(Base):
     Attributes:
         file_id: Unique identifier (UUID)
         filename: Original filename from upload
-        content_hash: SHA256 hash of file content (for deduplication)
+        content_hash: SHA256 hash of stored file content (for deduplication)
+        perceptual_hash: 64-bit dHash as hex (for near-duplicate detection)
+        pixel_hash: SHA256 hash of decoded pixels (for metadata-insensitive deduplication)
         file_type: Type of file ('pose_image', 'reference_image', 'output')
         mime_type: MIME type (image/png, image/jpeg, etc.)
         size: File size in bytes
         width: Image width in pixels
         height: Image height in pixels
         storage_path: Relative path in storage system
+        storage_tier: 'hot' (individual file under storage_path) or 'cold' (in a pack file)
+        pack_name: Pack file holding the compressed content when cold
+        pack_offset: Byte offset of the compressed content in the pack
+        pack_length: Length of the compressed content in the pack
         reference_count: Number of generations using this file
         user_id: User who uploaded the file (nullable for backward compatibility)
         created_at: Upload timestamp
@@ -25,16 +31,28 @@ class UploadedFile(Base):
         is_deleted: Soft delete flag
     """
     __tablename__ = "uploaded_files"
+    __table_args__ = (
+        # Tiering job scans hot files by age
+        Index("ix_uploaded_files_tier_last_accessed", "storage_tier", "last_accessed"),
+        # Storage budget eviction walks unreferenced files in LRU order
+        Index("ix_uploaded_files_lru", "reference_count", "last_accessed"),
+    )
 
     file_id = Column(String, primary_key=True)
     filename = Column(String, nullable=False)
     content_hash = Column(String, nullable=False, index=True, unique=True)
+    perceptual_hash = Column(String(16), nullable=True)
+    pixel_hash = Column(String(64), nullable=True, index=True)
     file_type = Column(String, nullable=False)  # 'pose_image', 'reference_image', 'output'
     mime_type = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
     storage_path = Column(String, nullable=False)
+    storage_tier = Column(String, nullable=False, default="hot", server_default="hot")  # 'hot', 'cold'
+    pack_name = Column(String, nullable=True)
+    pack_offset = Column(BigInteger, nullable=True)
+    pack_length = Column(Integer, nullable=True)
     reference_count = Column(Integer, default=0)
     user_id = Column(String, nullable=True, index=True)  # User who uploaded the file
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,46 @@
+"""Database model for the webhook delivery outbox"""
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+
+class WebhookDelivery(Base):
+    """
+    Outbox entry for a generation completion callback
+
+    A row is written with the generation when a callback URL is given and
+    becomes due in the same transaction that moves the generation to a
+    final status, so no completion is lost between the commit and the send.
+
+    Attributes:
+        delivery_id: Unique identifier (UUID), sent as X-AvatarForge-Delivery
+        generation_id: Generation the callback is for
+        url: Callback URL to POST to
+        status: 'waiting' (generation not finished), 'pending' (due or retrying),
+            'sending' (claimed by a worker), 'delivered' or 'failed' (gave up)
+        payload: Event body, set when the generation finishes
+        attempts: Delivery attempts made so far
+        next_attempt_at: When a pending delivery is next due (or a claim expires)
+        last_error: Error from the latest failed attempt
+        created_at: When the callback was registered
+        delivered_at: When the receiver accepted the delivery
+    """
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # Workers poll for due deliveries
+        Index("ix_webhook_deliveries_status_next", "status", "next_attempt_at"),
+    )
+
+    delivery_id = Column(String, primary_key=True)
+    generation_id = Column(String, nullable=False, index=True)
+    url = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="waiting")
+    payload = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<WebhookDelivery(id={self.delivery_id}, generation={self.generation_id}, status={self.status})>"
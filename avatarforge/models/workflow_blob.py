@@ -0,0 +1,28 @@
+"""Database model for content-addressed workflow storage"""
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from ..database.base import Base
+
+
+class WorkflowBlob(Base):
+    """
+    Compressed ComfyUI workflow stored once per distinct content
+
+    Generations reference workflows by hash, so identical workflows are
+    stored once and the generations table stays narrow.
+
+    Attributes:
+        workflow_hash: SHA256 of the canonical (sorted-key, compact) workflow JSON
+        data: zlib-compressed canonical JSON
+        size: Uncompressed size in bytes
+        created_at: When the workflow was first stored
+    """
+    __tablename__ = "workflow_blobs"
+
+    workflow_hash = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<WorkflowBlob(hash={self.workflow_hash[:8]}..., size={self.size})>"
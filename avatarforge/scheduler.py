@@ -4,11 +4,16 @@ Background task scheduler for automated maintenance tasks
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
 from .core.config import settings
-from .database.session import SessionLocal
+from .database.session import SessionLocal, engine
+from .database.migrations import upgrade_schema
+from .database.fulltext import install_fulltext_index
 from .services.file_service import FileService
+from .services.generation_service import GenerationService
+from .services.webhook_service import WebhookService
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +21,18 @@ logger = logging.getLogger(__name__)
 scheduler: BackgroundScheduler | None = None
 
 
+def _tables_exist(*table_names: str) -> bool:
+    """
+    Whether the database has these tables.
+    Startup jobs skip databases that init_db has not created yet.
+    """
+    inspector = inspect(engine)
+    missing = [name for name in table_names if not inspector.has_table(name)]
+    if missing:
+        logger.info(f"Skipping startup job: table(s) {', '.join(missing)} not created yet (run init_db)")
+    return not missing
+
+
 def cleanup_orphaned_files_job():
     """
     Background job to cleanup orphaned files.
@@ -35,6 +52,153 @@ def cleanup_orphaned_files_job():
         db.close()
 
 
+def tier_cold_files_job():
+    """
+    Background job to move rarely accessed files into cold pack storage.
+    Runs in a separate database session.
+    """
+    db: Session = SessionLocal()
+    try:
+        file_service = FileService(db)
+        files_moved = file_service.tier_cold_files(days=settings.COLD_TIER_DAYS)
+        logger.info(
+            f"Cold tiering completed: moved {files_moved} file(s) "
+            f"not accessed in {settings.COLD_TIER_DAYS} days"
+        )
+    except Exception as e:
+        logger.error(f"Error during cold tiering: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def enforce_storage_budget_job():
+    """
+    Background job to evict least recently used unreferenced files
+    when hot storage exceeds STORAGE_BUDGET_BYTES.
+    Runs in a separate database session.
+    """
+    db: Session = SessionLocal()
+    try:
+        file_service = FileService(db)
+        files_evicted, bytes_freed = file_service.enforce_storage_budget(settings.STORAGE_BUDGET_BYTES)
+        if files_evicted:
+            logger.info(
+                f"Storage budget enforced: evicted {files_evicted} file(s), "
+                f"freed {bytes_freed} bytes (budget {settings.STORAGE_BUDGET_BYTES} bytes)"
+            )
+    except Exception as e:
+        logger.error(f"Error enforcing storage budget: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def archive_generations_job():
+    """
+    Background job to move old completed/failed generations to the archive table.
+    Runs in a separate database session.
+    """
+    db: Session = SessionLocal()
+    try:
+        gen_service = GenerationService(db)
+        archived = gen_service.archive_generations(
+            days=settings.GENERATION_ARCHIVE_DAYS,
+            batch_size=settings.GENERATION_ARCHIVE_BATCH_SIZE
+        )
+        logger.info(
+            f"Generation archival completed: archived {archived} generation(s) "
+            f"finished more than {settings.GENERATION_ARCHIVE_DAYS} days ago"
+        )
+    except Exception as e:
+        logger.error(f"Error archiving generations: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def purge_webhook_deliveries_job():
+    """
+    Background job to delete finished webhook delivery records.
+    Runs in a separate database session.
+    """
+    db: Session = SessionLocal()
+    try:
+        purged = WebhookService(db).purge_deliveries(days=settings.WEBHOOK_RETENTION_DAYS)
+        logger.info(
+            f"Webhook delivery purge completed: deleted {purged} record(s) "
+            f"older than {settings.WEBHOOK_RETENTION_DAYS} days"
+        )
+    except Exception as e:
+        logger.error(f"Error purging webhook deliveries: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def upgrade_schema_job():
+    """
+    Add columns and indexes that tables from older releases are missing.
+    Runs once at application startup, before the other startup jobs.
+    """
+    try:
+        added = upgrade_schema(engine)
+        if added:
+            logger.info(f"Database schema upgraded: {', '.join(added)}")
+    except Exception as e:
+        logger.error(f"Error upgrading database schema: {e}", exc_info=True)
+
+
+def rebuild_perceptual_index_job():
+    """
+    Backfill missing perceptual hashes and rebuild the in-memory index from the database.
+    Runs once at application startup.
+    """
+    if not _tables_exist("uploaded_files"):
+        return
+    db: Session = SessionLocal()
+    try:
+        file_service = FileService(db)
+        files_indexed = file_service.rebuild_perceptual_index()
+        logger.info(f"Perceptual hash index rebuilt with {files_indexed} file(s)")
+    except Exception as e:
+        logger.error(f"Error rebuilding perceptual hash index: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def backfill_generation_counters_job():
+    """
+    Populate generation counters for databases created before they existed.
+    Runs once at application startup; a no-op once counters are present.
+    """
+    if not _tables_exist("generations", "generation_counters"):
+        return
+    db: Session = SessionLocal()
+    try:
+        gen_service = GenerationService(db)
+        if not gen_service.counters_initialized():
+            rows = gen_service.rebuild_generation_counters()
+            logger.info(f"Generation counters backfilled ({rows} counter row(s))")
+    except Exception as e:
+        logger.error(f"Error backfilling generation counters: {e}", exc_info=True)
+    finally:
+        db.close()
+
+
+def ensure_search_index_job():
+    """
+    Create the generation full-text search index for databases created before it existed.
+    Runs once at application startup; a no-op once the index is present.
+    """
+    try:
+        # The FTS triggers reference generations; creating them first would
+        # leave a half-built index behind
+        if not _tables_exist("generations"):
+            return
+        with engine.begin() as connection:
+            install_fulltext_index(None, connection)
+        logger.info("Generation search index ready")
+    except Exception as e:
+        logger.error(f"Error creating generation search index: {e}", exc_info=True)
+
+
 def start_scheduler():
     """
     Start the background scheduler if ENABLE_SCHEDULER is True.
@@ -62,6 +226,44 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Move cold files to pack storage after cleanup has removed orphans
+    if settings.COLD_TIER_DAYS:
+        scheduler.add_job(
+            tier_cold_files_job,
+            trigger=CronTrigger(hour=settings.CLEANUP_SCHEDULE_HOUR, minute=30),
+            id="tier_cold_files",
+            name="Move cold files to pack storage",
+            replace_existing=True
+        )
+
+    if settings.GENERATION_ARCHIVE_DAYS:
+        scheduler.add_job(
+            archive_generations_job,
+            trigger=CronTrigger(hour=settings.CLEANUP_SCHEDULE_HOUR, minute=45),
+            id="archive_generations",
+            name="Archive old generations",
+            replace_existing=True
+        )
+
+    if settings.WEBHOOK_RETENTION_DAYS:
+        scheduler.add_job(
+            purge_webhook_deliveries_job,
+            trigger=CronTrigger(hour=settings.CLEANUP_SCHEDULE_HOUR, minute=50),
+            id="purge_webhook_deliveries",
+            name="Purge finished webhook deliveries",
+            replace_existing=True
+        )
+
+    if settings.STORAGE_BUDGET_BYTES:
+        scheduler.add_job(
+            enforce_storage_budget_job,
+            trigger="interval",
+            minutes=settings.STORAGE_EVICTION_INTERVAL_MINUTES,
+            id="enforce_storage_budget",
+            name="Enforce storage budget",
+            replace_existing=True
+        )
+
     scheduler.start()
     logger.info(
         f"Scheduler started. Daily cleanup scheduled at {settings.CLEANUP_SCHEDULE_HOUR}:00 "
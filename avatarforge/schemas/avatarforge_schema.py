@@ -55,7 +55,7 @@ class AvatarRequest(BaseModel):
     # Legacy base64 support (for backward compatibility)
     pose_image: Optional[str] = Field(
         None,
-        description="[LEGACY] Base64 encoded image or file path for pose reference. For new integrations, prefer using pose_file_id instead. Accepts: base64 string, local file path, or URL"
+        description="[LEGACY] Base64 encoded image or data URL for pose reference. For new integrations, prefer using pose_file_id instead. Inline images are stored and deduplicated like uploads; URLs and file paths are ignored"
     )
 
     reference_image: Optional[str] = Field(
@@ -63,6 +63,18 @@ class AvatarRequest(BaseModel):
         description="[LEGACY] Base64 encoded reference image for character appearance/style. For new integrations, prefer using reference_file_id instead."
     )
 
+    user_id: Optional[str] = Field(
+        None,
+        description="Optional user ID requesting the generation. Legacy base64 images are charged to this user's storage quota."
+    )
+
+    callback_url: Optional[str] = Field(
+        None,
+        pattern=r"^https?://",
+        description="Optional URL that receives a signed POST when the generation completes or fails. Deliveries are retried with backoff until the receiver returns 2xx; verify X-AvatarForge-Signature and deduplicate on X-AvatarForge-Delivery. Loopback, private and link-local addresses are not delivered to.",
+        examples=["https://example.com/hooks/avatarforge"]
+    )
+
     clothing: Optional[str] = Field(
         None,
         description="Specific clothing details to add to the avatar. Examples: 'leather jacket, jeans', 'medieval armor, cape', 'casual t-shirt and shorts'",
@@ -112,7 +124,76 @@ class AvatarResponse(BaseModel):
 
 class GenerationListResponse(BaseModel):
     """Response for listing generations"""
-    total: int = Field(..., description="Total number of generations matching filter")
+    total: Optional[int] = Field(None, description="Total number of generations matching filter (omitted when include_total=false)")
     generations: List[AvatarResponse] = Field(..., description="List of generation records")
     limit: int = Field(..., description="Number of results per page")
     offset: int = Field(..., description="Number of results skipped")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; null when there are no more results")
+
+
+class GenerationStatsResponse(BaseModel):
+    """Generation counts by status"""
+    user_id: Optional[str] = Field(None, description="User the counts are for (null for all users)")
+    total: int = Field(..., description="Total number of generations")
+    by_status: Dict[str, int] = Field(..., description="Number of generations per status")
+
+
+class BulkDeleteRequest(BaseModel):
+    """
+    Bulk generation delete request (at least one filter is required)
+
+    Examples:
+        Purge failed test generations for a user:
+        {
+            "status": "failed",
+            "user_id": "load-test-user"
+        }
+
+        Delete specific generations:
+        {
+            "generation_ids": ["550e8400-e29b-41d4-a716-446655440000"]
+        }
+    """
+    generation_ids: Optional[List[str]] = Field(None, description="Only delete these generation IDs")
+    status: Optional[str] = Field(None, description="Only delete generations with this status")
+    user_id: Optional[str] = Field(None, description="Only delete this user's generations")
+    created_after: Optional[datetime] = Field(None, description="Only delete generations created at or after this time")
+    created_before: Optional[datetime] = Field(None, description="Only delete generations created before this time")
+
+
+class BulkDeleteResponse(BaseModel):
+    """Response for bulk generation delete"""
+    deleted: int = Field(..., description="Number of generations deleted")
+    message: str = Field(..., description="Summary message")
+
+
+class WebhookDeliveryResponse(BaseModel):
+    """Delivery state of a completion callback"""
+    model_config = ConfigDict(from_attributes=True)
+
+    delivery_id: str = Field(..., description="Delivery ID, sent as X-AvatarForge-Delivery")
+    url: str = Field(..., description="Callback URL")
+    status: str = Field(..., description="waiting, pending, sending, delivered or failed")
+    attempts: int = Field(..., description="Delivery attempts made so far")
+    next_attempt_at: Optional[datetime] = Field(None, description="When the next attempt is due")
+    last_error: Optional[str] = Field(None, description="Error from the latest failed attempt")
+    created_at: Optional[datetime] = Field(None, description="When the callback was registered")
+    delivered_at: Optional[datetime] = Field(None, description="When the receiver accepted the delivery")
+
+
+class GenerationSearchResult(BaseModel):
+    """A generation matching a full-text search"""
+    generation_id: str = Field(..., description="Generation identifier")
+    prompt: str = Field(..., description="Character description")
+    clothing: Optional[str] = Field(None, description="Clothing description")
+    style: Optional[str] = Field(None, description="Art style")
+    status: str = Field(..., description="Generation status")
+    user_id: Optional[str] = Field(None, description="User who requested the generation")
+    created_at: Optional[datetime] = Field(None, description="When the generation was created")
+    score: float = Field(..., description="Relevance score; higher is a better match")
+
+
+class GenerationSearchResponse(BaseModel):
+    """Response for full-text generation search"""
+    query: str = Field(..., description="The search query")
+    results: List[GenerationSearchResult] = Field(..., description="Matching generations, best match first")
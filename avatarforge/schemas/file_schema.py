@@ -1,6 +1,6 @@
 """File upload and management schemas"""
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 
 
@@ -20,7 +20,7 @@ class FileUploadResponse(BaseModel):
     )
     content_hash: str = Field(
         ...,
-        description="SHA256 hash of file content. Used for deduplication."
+        description="SHA256 hash of the stored file content (after any metadata stripping). Used for deduplication."
     )
     size: int = Field(
         ...,
@@ -95,3 +95,54 @@ class CleanupResponse(BaseModel):
         ...,
         description="Summary message"
     )
+
+
+class SimilarFileMatch(BaseModel):
+    """A stored file that is perceptually similar to the queried file"""
+    file_id: str = Field(..., description="ID of the similar file")
+    filename: str = Field(..., description="Original filename of the similar file")
+    distance: int = Field(
+        ...,
+        description="Hamming distance between perceptual hashes (0 = visually identical, max 64)"
+    )
+    url: str = Field(..., description="URL to access the similar file")
+
+
+class SimilarFilesResponse(BaseModel):
+    """Response for near-duplicate lookup"""
+    file_id: str = Field(..., description="ID of the queried file")
+    perceptual_hash: str = Field(..., description="64-bit perceptual hash (dHash) as hex")
+    max_distance: int = Field(..., description="Maximum Hamming distance searched")
+    matches: List[SimilarFileMatch] = Field(
+        ...,
+        description="Similar files, closest first (the queried file itself is excluded)"
+    )
+
+
+class StorageUsageResponse(BaseModel):
+    """Per-user storage usage and quota"""
+    user_id: str = Field(..., description="User ID")
+    bytes_used: int = Field(..., description="Total bytes of files held by the user")
+    file_count: int = Field(..., description="Number of files held by the user")
+    quota_bytes: Optional[int] = Field(None, description="Byte quota (null = unlimited)")
+    quota_files: Optional[int] = Field(None, description="File count quota (null = unlimited)")
+
+
+class StorageBudgetResponse(BaseModel):
+    """Response for storage budget enforcement"""
+    files_evicted: int = Field(
+        ...,
+        description="Number of unreferenced files permanently deleted"
+    )
+    bytes_freed: int = Field(
+        ...,
+        description="Bytes freed from hot storage"
+    )
+    budget_bytes: int = Field(
+        ...,
+        description="Hot storage budget that was enforced"
+    )
+    message: str = Field(
+        ...,
+        description="Summary message"
+    )
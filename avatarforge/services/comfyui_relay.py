@@ -0,0 +1,226 @@
+"""
+Relay of ComfyUI execution progress to API clients
+
+ComfyUI reports per-step sampler progress and latent preview images over
+its /ws WebSocket, but only to the client_id that queued the prompt. Each
+backend gets one ProgressRelay with its own client_id: generations are
+queued under that id, and the relay holds a single upstream connection
+that fans messages out to every subscribed API client by prompt ID.
+
+The upstream connection is opened when the first client subscribes and
+closed when the last one leaves. Preview frames are decoded, downscaled
+and re-encoded once per frame (off the event loop) no matter how many
+clients watch, and only when at least one of them asked for previews.
+"""
+import asyncio
+import base64
+import io
+import json
+import logging
+import struct
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import websockets
+from PIL import Image
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Binary message types from ComfyUI's WebSocket
+PREVIEW_IMAGE_EVENT = 1
+PREVIEW_MIME_TYPES = {1: "image/jpeg", 2: "image/png"}
+
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+def websocket_url(comfyui_url: str, client_id: str) -> str:
+    """ComfyUI's WebSocket URL for an HTTP base URL"""
+    parts = urlsplit(comfyui_url)
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    path = parts.path.rstrip("/") + "/ws"
+    return urlunsplit((scheme, parts.netloc, path, f"clientId={client_id}", ""))
+
+
+def downscale_preview(image_bytes: bytes, max_dimension: int) -> bytes:
+    """Shrink a preview frame to fit max_dimension and encode it as JPEG"""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = image.convert("RGB")
+        image.thumbnail((max_dimension, max_dimension))
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=80)
+    return output.getvalue()
+
+
+class ProgressSubscription:
+    """A client's bounded queue of progress messages for one prompt"""
+
+    def __init__(self, prompt_id: str, previews: bool, queue_size: int):
+        self.prompt_id = prompt_id
+        self.previews = previews
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, message: Dict[str, Any]):
+        """Queue a message, dropping the oldest when the client falls behind"""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class ProgressRelay:
+    """Single upstream ComfyUI WebSocket shared by all progress subscribers"""
+
+    def __init__(self, comfyui_url: str):
+        self.comfyui_url = comfyui_url
+        self.client_id = str(uuid.uuid4())
+        self._subscriptions: Dict[str, List[ProgressSubscription]] = {}
+        # prompt_id -> (node, first progress time, value, max) for ETA
+        self._progress: Dict[str, tuple] = {}
+        self._executing: Optional[str] = None
+        self._last_preview: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, prompt_id: str, previews: bool = False) -> ProgressSubscription:
+        """
+        Receive progress messages for a ComfyUI prompt
+
+        Must be called on the application's event loop; starts the upstream
+        connection if it is not running.
+        """
+        subscription = ProgressSubscription(prompt_id, previews, settings.GENERATION_EVENT_QUEUE_SIZE)
+        self._subscriptions.setdefault(prompt_id, []).append(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription):
+        """Stop a subscription; closes the upstream connection after the last one"""
+        subscribers = self._subscriptions.get(subscription.prompt_id, [])
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        if not subscribers:
+            self._subscriptions.pop(subscription.prompt_id, None)
+            self._progress.pop(subscription.prompt_id, None)
+            self._last_preview.pop(subscription.prompt_id, None)
+        if not self._subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        """Hold the upstream connection, reconnecting with backoff"""
+        delay = RECONNECT_DELAY_SECONDS
+        url = websocket_url(self.comfyui_url, self.client_id)
+        while self._subscriptions:
+            try:
+                async with websockets.connect(url, max_size=None) as upstream:
+                    delay = RECONNECT_DELAY_SECONDS
+                    async for message in upstream:
+                        if isinstance(message, bytes):
+                            await self.handle_binary(message)
+                        else:
+                            self.handle_text(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ComfyUI progress connection to {self.comfyui_url} lost: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    def _publish(self, prompt_id: Optional[str], message: Dict[str, Any], previews_only: bool = False):
+        for subscription in self._subscriptions.get(prompt_id, []):
+            if subscription.previews or not previews_only:
+                subscription.deliver(message)
+
+    def handle_text(self, raw: str):
+        """Handle a JSON message from ComfyUI"""
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        kind = message.get("type")
+        data = message.get("data") or {}
+        prompt_id = data.get("prompt_id")
+
+        if kind == "executing":
+            # node is null once the whole prompt has finished
+            self._executing = prompt_id if data.get("node") is not None else None
+            if prompt_id in self._subscriptions:
+                self._publish(prompt_id, {"type": "executing", "node": data.get("node")})
+        elif kind == "progress":
+            self._executing = prompt_id or self._executing
+            prompt_id = prompt_id or self._executing
+            if prompt_id in self._subscriptions:
+                self._publish(prompt_id, self._progress_message(prompt_id, data))
+        elif kind == "execution_error" and prompt_id in self._subscriptions:
+            self._publish(prompt_id, {"type": "error", "message": data.get("exception_message")})
+
+    def _progress_message(self, prompt_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Progress message with an ETA extrapolated from the current node's step rate"""
+        value, maximum, node = data.get("value", 0), data.get("max", 0), data.get("node")
+        now = time.monotonic()
+
+        previous = self._progress.get(prompt_id)
+        if previous is None or previous[0] != node or value < previous[2]:
+            # New node (or restarted sampler): time from its first step
+            self._progress[prompt_id] = (node, now, value, maximum)
+            eta = None
+        else:
+            _, started, first_value, _ = previous
+            steps_done = value - first_value
+            eta = (now - started) / steps_done * (maximum - value) if steps_done > 0 else None
+
+        return {
+            "type": "progress",
+            "node": node,
+            "value": value,
+            "max": maximum,
+            "percent": round(100 * value / maximum, 1) if maximum else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+    async def handle_binary(self, raw: bytes):
+        """Handle a binary message from ComfyUI (latent preview frames)"""
+        if len(raw) < 8:
+            return
+        event_type, image_type = struct.unpack(">II", raw[:8])
+        prompt_id = self._executing
+        if event_type != PREVIEW_IMAGE_EVENT or image_type not in PREVIEW_MIME_TYPES:
+            return
+        if not any(s.previews for s in self._subscriptions.get(prompt_id, [])):
+            return
+
+        # Previews arrive every step; forward at most one per interval
+        now = time.monotonic()
+        if now - self._last_preview.get(prompt_id, 0) < settings.COMFYUI_PREVIEW_MIN_INTERVAL_MS / 1000:
+            return
+        self._last_preview[prompt_id] = now
+
+        try:
+            image = await asyncio.to_thread(downscale_preview, raw[8:], settings.COMFYUI_PREVIEW_MAX_DIMENSION)
+        except Exception as e:
+            logger.debug(f"Skipping unreadable preview frame: {e}")
+            return
+
+        self._publish(prompt_id, {
+            "type": "preview",
+            "mime_type": "image/jpeg",
+            "image": base64.b64encode(image).decode("ascii"),
+        }, previews_only=True)
+
+
+_relays: Dict[str, ProgressRelay] = {}
+
+
+def get_relay(comfyui_url: str) -> ProgressRelay:
+    """The shared relay for a ComfyUI backend"""
+    relay = _relays.get(comfyui_url)
+    if relay is None:
+        relay = _relays.setdefault(comfyui_url, ProgressRelay(comfyui_url))
+    return relay
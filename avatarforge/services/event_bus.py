@@ -0,0 +1,165 @@
+"""
+In-process pub/sub for generation status changes
+
+GenerationService publishes an event after every committed status change.
+Subscribers (SSE streams, long polls) each get a bounded asyncio queue on
+their own event loop; publishing is thread-safe, so sync endpoints running
+in the threadpool can publish directly.
+
+Events only reach subscribers in the same process. With several API
+workers, a client only sees changes made by the worker it is connected to
+plus whatever it reads from the database.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Status carried by events for deleted generations
+DELETED_STATUS = "deleted"
+
+
+def generation_event(generation) -> Dict[str, Any]:
+    """Build the status event payload for a generation"""
+    def iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        "generation_id": generation.generation_id,
+        "user_id": generation.user_id,
+        "status": generation.status,
+        "output_files": generation.output_files,
+        "error": generation.error_message,
+        "comfyui_prompt_id": generation.comfyui_prompt_id,
+        "created_at": iso(generation.created_at),
+        "started_at": iso(generation.started_at),
+        "completed_at": iso(generation.completed_at),
+    }
+
+
+class Subscription:
+    """A subscriber's queue of matching events"""
+
+    def __init__(
+        self,
+        bus: "GenerationEventBus",
+        loop: asyncio.AbstractEventLoop,
+        generation_ids: Optional[Iterable[str]],
+        user_id: Optional[str],
+        queue_size: int
+    ):
+        self.bus = bus
+        self.loop = loop
+        self.generation_ids = set(generation_ids) if generation_ids else None
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.generation_ids is not None and event["generation_id"] not in self.generation_ids:
+            return False
+        if self.user_id is not None and event.get("user_id") != self.user_id:
+            return False
+        return True
+
+    def _deliver(self, event: Dict[str, Any]):
+        """Queue an event (runs on the subscriber's loop); drops the oldest when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrives within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GenerationEventBus:
+    """Fan-out of generation events to in-process subscribers"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def subscribe(
+        self,
+        generation_ids: Optional[Iterable[str]] = None,
+        user_id: Optional[str] = None
+    ) -> Subscription:
+        """
+        Subscribe the running event loop to generation events
+
+        Args:
+            generation_ids: Only events for these generations
+            user_id: Only events for this user's generations
+
+        Returns:
+            Subscription; close it (or use it as a context manager) when done
+        """
+        subscription = Subscription(
+            self, asyncio.get_running_loop(), generation_ids, user_id, self.queue_size
+        )
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event: Dict[str, Any]):
+        """
+        Send an event to every matching subscriber (safe from any thread)
+
+        Events get a process-wide increasing "sequence" number.
+        """
+        if not self._subscriptions:
+            return
+        event = {**event, "sequence": next(self._sequence)}
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.matches(event)]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self._unsubscribe(subscription)
+
+    def publish_generation(self, generation):
+        """Publish a generation's current status"""
+        try:
+            self.publish(generation_event(generation))
+        except Exception as e:
+            # Notifications must never fail the status change itself
+            logger.warning(f"Failed to publish event for generation {generation.generation_id}: {e}")
+
+    def publish_deleted(self, generation_id: str, user_id: Optional[str]):
+        """Tell subscribers a generation no longer exists"""
+        self.publish({"generation_id": generation_id, "user_id": user_id, "status": DELETED_STATUS})
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+event_bus = GenerationEventBus(settings.GENERATION_EVENT_QUEUE_SIZE)
@@ -4,19 +4,45 @@ File management service with deduplication support
 Handles file uploads, downloads, storage, and automatic deduplication
 using content-based hashing (SHA256).
 """
+import binascii
 import hashlib
+import os
+import tempfile
 import uuid
 from pathlib import Path
-from typing import Optional, Tuple, BinaryIO
+from typing import Optional, Tuple, BinaryIO, List, Dict
 from datetime import datetime, timezone
 from PIL import Image
 import io
 
+from sqlalchemy import select, func, case
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from ..models.uploaded_file import UploadedFile
+from ..models.storage_usage import UserStorageUsage, FileOwner
 from ..core.config import settings
+from .image_hash import dhash, pixel_hash, hash_to_hex, hex_to_hash, perceptual_index
+from .image_metadata import strip_metadata
+from .pack_store import PackStore
+
+# Magic numbers used to identify legacy base64 payloads without a data-URL header
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+MIME_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+
+def output_file_id(output: Dict[str, object]) -> Optional[str]:
+    """File ID of an output_files entry (explicit file_id or a /files/{id} URL)"""
+    if output.get("file_id"):
+        return str(output["file_id"])
+    url = str(output.get("url") or "")
+    if "/files/" in url:
+        return url.rsplit("/files/", 1)[1].split("?", 1)[0].strip("/") or None
+    return None
 
 
 class FileService:
@@ -34,6 +60,8 @@ class FileService:
         self.uploads_dir = self.storage_root / "uploads"
         self.outputs_dir = self.storage_root / "outputs"
 
+        self.pack_store = PackStore(Path(settings.COLD_STORAGE_PATH), settings.COLD_PACK_MAX_BYTES)
+
         # Create directories if they don't exist
         self.uploads_dir.mkdir(parents=True, exist_ok=True)
         self.outputs_dir.mkdir(parents=True, exist_ok=True)
@@ -42,7 +70,8 @@ class FileService:
         self,
         file: UploadFile,
         file_type: str = "pose_image",
-        user_id: str = None
+        user_id: str = None,
+        reuse_similar: bool = False
     ) -> UploadedFile:
         """
         Upload a file with automatic deduplication
@@ -51,6 +80,9 @@ class FileService:
             file: The uploaded file
             file_type: Type of file ('pose_image', 'reference_image')
             user_id: Optional user ID who is uploading the file
+            reuse_similar: If True, return the closest perceptually similar
+                stored image (within PERCEPTUAL_HASH_MAX_DISTANCE) instead
+                of storing a near-duplicate
 
         Returns:
             UploadedFile: Database record (existing or newly created)
@@ -75,8 +107,57 @@ class FileService:
                 detail=f"File too large: {len(content)} bytes. Max: {self.MAX_FILE_SIZE} bytes"
             )
 
+        # Hashing, image decoding, disk writes and queries all block, so run
+        # them in the worker pool and keep the event loop free
+        return await run_in_threadpool(
+            self._store_content,
+            content,
+            filename=file.filename,
+            mime_type=file.content_type,
+            file_type=file_type,
+            user_id=user_id,
+            reuse_similar=reuse_similar
+        )
+
+    def _store_content(
+        self,
+        content: bytes,
+        filename: str,
+        mime_type: str,
+        file_type: str,
+        user_id: Optional[str] = None,
+        reuse_similar: bool = False,
+        content_hash: Optional[str] = None
+    ) -> UploadedFile:
+        """
+        Validate, deduplicate and store image content
+
+        Shared by multipart uploads and legacy base64 ingestion. Blocking -
+        async callers run it in the worker pool.
+
+        Args:
+            content: Encoded image bytes (size already validated)
+            filename: Original filename (used for the stored extension)
+            mime_type: Validated MIME type of the content
+            file_type: Type of file ('pose_image', 'reference_image')
+            user_id: Optional user ID who is storing the file
+            reuse_similar: Reuse a perceptually similar stored image if found
+            content_hash: SHA256 of content if the caller already computed it
+
+        Returns:
+            UploadedFile: Database record (existing or newly created)
+        """
+        # Strip before hashing so content_hash is the SHA256 of the bytes
+        # actually stored and served. Stripping is deterministic, so exact
+        # re-uploads still match on content_hash.
+        if settings.STRIP_IMAGE_METADATA:
+            stripped = strip_metadata(content, mime_type)
+            if stripped != content:
+                content, content_hash = stripped, None
+
         # Calculate content hash
-        content_hash = hashlib.sha256(content).hexdigest()
+        if content_hash is None:
+            content_hash = hashlib.sha256(content).hexdigest()
 
         # Check if file already exists
         existing_file = self.db.query(UploadedFile).filter(
@@ -86,40 +167,25 @@ class FileService:
 
         if existing_file:
             # File already exists - update last accessed and return
-            existing_file.last_accessed = datetime.now(timezone.utc)
-            self.db.commit()
-            self.db.refresh(existing_file)
-            return existing_file
+            return self._reuse_existing_file(existing_file, user_id)
 
-        # Validate and get image dimensions
-        try:
-            image = Image.open(io.BytesIO(content))
-            width, height = image.size
+        width, height, perceptual_hash, pixel_hash = self._analyze_image(content)
 
-            if width > self.MAX_DIMENSION or height > self.MAX_DIMENSION:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Image dimensions too large: {width}x{height}. Max: {self.MAX_DIMENSION}x{self.MAX_DIMENSION}"
-                )
+        if pixel_hash:
+            # Same pixels stored under different bytes (metadata, compression level)
+            existing_file = self.get_file_by_pixel_hash(pixel_hash)
+            if existing_file:
+                return self._reuse_existing_file(existing_file, user_id)
 
-            if width < self.MIN_DIMENSION or height < self.MIN_DIMENSION:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Image dimensions too small: {width}x{height}. Min: {self.MIN_DIMENSION}x{self.MIN_DIMENSION}"
-                )
-
-        except HTTPException:
-            # Re-raise HTTP exceptions (validation errors)
-            raise
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid image file: {str(e)}"
-            )
+        if reuse_similar:
+            matches = self.find_similar_files(perceptual_hash, limit=1)
+            if matches:
+                # Near-duplicate exists - reuse it instead of storing a new copy
+                return self._reuse_existing_file(matches[0][1], user_id)
 
         # Generate storage path using hash-based directory structure
         # Format: uploads/{type}/{hash[:2]}/{hash[2:4]}/{hash}.ext
-        file_ext = Path(file.filename).suffix.lower()
+        file_ext = Path(filename).suffix.lower()
         if file_ext not in self.ALLOWED_EXTENSIONS:
             file_ext = ".png"  # Default to PNG
 
@@ -130,17 +196,23 @@ class FileService:
         # Create directories
         storage_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # Charge the uploader before touching the disk so over-quota
+        # uploads are rejected without writing anything
+        file_id = str(uuid.uuid4())
+        self._charge_user(file_id, len(content), user_id)
+
         # Save file to disk
         storage_path.write_bytes(content)
 
         # Create database record
-        file_id = str(uuid.uuid4())
         db_file = UploadedFile(
             file_id=file_id,
-            filename=file.filename,
+            filename=filename,
             content_hash=content_hash,
+            perceptual_hash=hash_to_hex(perceptual_hash),
+            pixel_hash=pixel_hash,
             file_type=file_type,
-            mime_type=file.content_type,
+            mime_type=mime_type,
             size=len(content),
             width=width,
             height=height,
@@ -153,8 +225,272 @@ class FileService:
         self.db.commit()
         self.db.refresh(db_file)
 
+        perceptual_index.add(perceptual_hash, file_id)
+
         return db_file
 
+    BASE64_CHUNK_SIZE = 64 * 1024  # characters decoded per step (multiple of 4)
+
+    def decode_base64_image(self, data: str) -> Optional[Tuple[bytes, str, str]]:
+        """
+        Incrementally decode a legacy base64 or data-URL image
+
+        The payload is decoded in fixed-size slices straight into one output
+        buffer while it is hashed, so no intermediate full-size copies of the
+        encoded or decoded data are built.
+
+        Args:
+            data: 'data:image/png;base64,...' URL or bare base64 string
+
+        Returns:
+            Tuple of (content, mime_type, content_hash), or None if the value
+            is not inline image data (e.g. a URL or file path)
+
+        Raises:
+            HTTPException: If a data URL or base64 image is malformed, too
+                large or of an unsupported type
+        """
+        mime_type = None
+        start = 0
+        if data.startswith("data:"):
+            header_end = data.find(",")
+            header = data[5:header_end] if header_end != -1 else ""
+            if not header.endswith(";base64"):
+                raise HTTPException(status_code=400, detail="Invalid data URL: only base64 data URLs are supported")
+            mime_type = header[:-len(";base64")].lower()
+            if mime_type not in self.ALLOWED_MIME_TYPES:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file type: {mime_type}. Allowed: {', '.join(self.ALLOWED_MIME_TYPES)}"
+                )
+            start = header_end + 1
+        elif "://" in data:
+            # Remote URL - not inline data
+            return None
+
+        # Reject oversized payloads before decoding anything
+        if (len(data) - start) * 3 // 4 > self.MAX_FILE_SIZE + 3:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large: base64 payload exceeds {self.MAX_FILE_SIZE} bytes"
+            )
+
+        hasher = hashlib.sha256()
+        output = io.BytesIO()
+        pending = b""
+        try:
+            for pos in range(start, len(data), self.BASE64_CHUNK_SIZE):
+                # Drop line breaks/whitespace and carry incomplete quanta forward
+                chunk = pending + data[pos:pos + self.BASE64_CHUNK_SIZE].encode("ascii").translate(None, b" \t\r\n")
+                usable = len(chunk) - len(chunk) % 4
+                pending = chunk[usable:]
+                decoded = binascii.a2b_base64(chunk[:usable], strict_mode=True)
+                if output.tell() == 0 and mime_type is None:
+                    mime_type = self._sniff_mime_type(decoded)
+                    if mime_type is None:
+                        # Not an image we recognise - treat as a path/URL value
+                        return None
+                hasher.update(decoded)
+                output.write(decoded)
+            if pending:
+                raise binascii.Error("Incorrect padding")
+        except (binascii.Error, UnicodeEncodeError) as e:
+            if mime_type is None and output.tell() == 0:
+                # Did not look like base64 at all (e.g. a local file path)
+                return None
+            raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {str(e)}")
+
+        if output.tell() == 0:
+            raise HTTPException(status_code=400, detail="Invalid base64 image data: empty payload")
+
+        if output.tell() > self.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large: {output.tell()} bytes. Max: {self.MAX_FILE_SIZE} bytes"
+            )
+
+        return output.getvalue(), mime_type, hasher.hexdigest()
+
+    @staticmethod
+    def _sniff_mime_type(head: bytes) -> Optional[str]:
+        """Identify an image MIME type from its leading bytes"""
+        for signature, mime_type in IMAGE_SIGNATURES:
+            if head.startswith(signature):
+                return mime_type
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+        return None
+
+    def ingest_base64_image(
+        self,
+        data: str,
+        file_type: str = "pose_image",
+        user_id: Optional[str] = None
+    ) -> Optional[UploadedFile]:
+        """
+        Store a legacy base64/data-URL image through the upload path
+
+        The decoded image is validated, deduplicated and stored exactly like
+        a multipart upload, so legacy clients get a reusable file_id.
+
+        Args:
+            data: 'data:image/png;base64,...' URL or bare base64 string
+            file_type: Type of file ('pose_image', 'reference_image')
+            user_id: Optional user ID who is storing the file
+
+        Returns:
+            UploadedFile, or None if the value is not inline image data
+
+        Raises:
+            HTTPException: If validation fails
+        """
+        decoded = self.decode_base64_image(data)
+        if decoded is None:
+            return None
+
+        content, mime_type, content_hash = decoded
+        return self._store_content(
+            content,
+            filename=f"{file_type}{MIME_EXTENSIONS[mime_type]}",
+            mime_type=mime_type,
+            file_type=file_type,
+            user_id=user_id,
+            content_hash=content_hash
+        )
+
+    def _reuse_existing_file(self, existing_file: UploadedFile, user_id: Optional[str]) -> UploadedFile:
+        """Return an already stored file for a deduplicated upload"""
+        self._charge_user(existing_file.file_id, existing_file.size, user_id)
+        existing_file.last_accessed = datetime.now(timezone.utc)
+        self.db.commit()
+        self.db.refresh(existing_file)
+        return existing_file
+
+    def _charge_user(self, file_id: str, size: int, user_id: Optional[str]):
+        """
+        Add a file to a user's storage usage (no-op if already held)
+
+        Changes are left uncommitted so they land in the caller's transaction.
+
+        Raises:
+            HTTPException: 413 if the file would exceed the user's quota
+        """
+        if not user_id:
+            return
+
+        if self.db.get(FileOwner, (file_id, user_id)) is not None:
+            return
+
+        usage = self.db.get(UserStorageUsage, user_id)
+        if usage is None:
+            usage = UserStorageUsage(user_id=user_id, bytes_used=0, file_count=0)
+            self.db.add(usage)
+            self.db.flush()
+
+        # Check and charge in one conditional UPDATE so concurrent uploads
+        # can't both pass the check and together exceed the quota
+        quota_bytes = settings.USER_STORAGE_QUOTA_BYTES
+        quota_files = settings.USER_STORAGE_QUOTA_FILES
+        conditions = [UserStorageUsage.user_id == user_id]
+        if quota_bytes:
+            conditions.append(UserStorageUsage.bytes_used + size <= quota_bytes)
+        if quota_files:
+            conditions.append(UserStorageUsage.file_count + 1 <= quota_files)
+
+        charged = self.db.query(UserStorageUsage).filter(*conditions).update(
+            {
+                UserStorageUsage.bytes_used: UserStorageUsage.bytes_used + size,
+                UserStorageUsage.file_count: UserStorageUsage.file_count + 1,
+            },
+            synchronize_session=False
+        )
+        self.db.expire(usage)
+
+        if not charged:
+            if quota_bytes and usage.bytes_used + size > quota_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Storage quota exceeded: {usage.bytes_used + size} bytes. Quota: {quota_bytes} bytes"
+                )
+            raise HTTPException(
+                status_code=413,
+                detail=f"File quota exceeded: {usage.file_count + 1} files. Quota: {quota_files} files"
+            )
+
+        self.db.add(FileOwner(file_id=file_id, user_id=user_id))
+
+    def _release_owners(self, file: UploadedFile):
+        """
+        Credit every holder of a file back for its size
+
+        Changes are left uncommitted so they land in the caller's transaction.
+        """
+        owners = select(FileOwner.user_id).where(FileOwner.file_id == file.file_id)
+        self.db.query(UserStorageUsage).filter(
+            UserStorageUsage.user_id.in_(owners)
+        ).update(
+            {
+                UserStorageUsage.bytes_used: UserStorageUsage.bytes_used - file.size,
+                UserStorageUsage.file_count: UserStorageUsage.file_count - 1,
+            },
+            synchronize_session=False
+        )
+        self.db.query(FileOwner).filter(FileOwner.file_id == file.file_id).delete(
+            synchronize_session=False
+        )
+
+    def get_user_usage(self, user_id: str) -> UserStorageUsage:
+        """Get a user's storage totals (zero if the user holds nothing)"""
+        usage = self.db.get(UserStorageUsage, user_id)
+        if usage is None:
+            return UserStorageUsage(user_id=user_id, bytes_used=0, file_count=0)
+        return usage
+
+    def _analyze_image(self, content: bytes) -> Tuple[int, int, int, Optional[str]]:
+        """
+        Validate an image and compute its hashes
+
+        Args:
+            content: Encoded image bytes
+
+        Returns:
+            Tuple of (width, height, perceptual hash, pixel hash). The pixel
+            hash is None unless PIXEL_DEDUPE_ENABLED is set.
+
+        Raises:
+            HTTPException: If the image is invalid or has unsupported dimensions
+        """
+        try:
+            image = Image.open(io.BytesIO(content))
+            width, height = image.size
+
+            if width > self.MAX_DIMENSION or height > self.MAX_DIMENSION:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Image dimensions too large: {width}x{height}. Max: {self.MAX_DIMENSION}x{self.MAX_DIMENSION}"
+                )
+
+            if width < self.MIN_DIMENSION or height < self.MIN_DIMENSION:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Image dimensions too small: {width}x{height}. Min: {self.MIN_DIMENSION}x{self.MIN_DIMENSION}"
+                )
+
+            # Pixel hash needs the full-resolution decode, so compute it before dhash
+            canonical_hash = pixel_hash(image) if settings.PIXEL_DEDUPE_ENABLED else None
+            perceptual_hash = dhash(image)
+
+        except HTTPException:
+            # Re-raise HTTP exceptions (validation errors)
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid image file: {str(e)}"
+            )
+
+        return width, height, perceptual_hash, canonical_hash
+
     def get_file_by_id(self, file_id: str) -> Optional[UploadedFile]:
         """Get file metadata by ID"""
         return self.db.query(UploadedFile).filter(
@@ -169,10 +505,209 @@ class FileService:
             UploadedFile.is_deleted == False
         ).first()
 
+    def find_similar_files(
+        self,
+        perceptual_hash: int,
+        max_distance: Optional[int] = None,
+        limit: int = 10
+    ) -> List[Tuple[int, UploadedFile]]:
+        """
+        Find stored images perceptually similar to the given hash
+
+        Args:
+            perceptual_hash: dHash value to compare against
+            max_distance: Maximum Hamming distance (default: PERCEPTUAL_HASH_MAX_DISTANCE)
+            limit: Maximum number of matches to return
+
+        Returns:
+            List of (distance, UploadedFile) tuples, closest first
+        """
+        if max_distance is None:
+            max_distance = settings.PERCEPTUAL_HASH_MAX_DISTANCE
+
+        candidates = perceptual_index.search(perceptual_hash, max_distance)
+        if not candidates:
+            return []
+
+        files = self.db.query(UploadedFile).filter(
+            UploadedFile.file_id.in_([file_id for _, file_id in candidates]),
+            UploadedFile.is_deleted == False
+        ).all()
+        files_by_id = {f.file_id: f for f in files}
+
+        return [
+            (distance, files_by_id[file_id])
+            for distance, file_id in candidates
+            if file_id in files_by_id
+        ][:limit]
+
+    def get_perceptual_hash(self, file: UploadedFile) -> int:
+        """
+        Get a file's perceptual hash
+
+        Never writes, so it is safe on read-replica sessions. Files uploaded
+        before perceptual hashing existed have their hash computed here and
+        stored by rebuild_perceptual_index at the next startup.
+        """
+        if file.perceptual_hash:
+            return hex_to_hash(file.perceptual_hash)
+        return self._compute_perceptual_hash(file)
+
+    def _compute_perceptual_hash(self, file: UploadedFile) -> int:
+        """Compute a stored file's perceptual hash from its content"""
+        if file.storage_tier == "cold":
+            # Read from the pack without promoting, so this stays read-only
+            source = io.BytesIO(self.pack_store.read(file.pack_name, file.pack_offset, file.pack_length))
+        else:
+            source = self.get_file_path(file)
+        with Image.open(source) as image:
+            return dhash(image)
+
+    def backfill_perceptual_hashes(self) -> int:
+        """
+        Store perceptual hashes for files uploaded before perceptual hashing existed
+
+        Files that are missing or not readable as images are left without a
+        hash and tried again on the next run.
+
+        Returns:
+            int: Number of files hashed
+        """
+        missing = self.db.query(UploadedFile).filter(
+            UploadedFile.perceptual_hash.is_(None),
+            UploadedFile.is_deleted == False
+        ).all()
+
+        count = 0
+        for file in missing:
+            try:
+                value = self._compute_perceptual_hash(file)
+            except (OSError, ValueError):
+                continue
+            file.perceptual_hash = hash_to_hex(value)
+            count += 1
+
+        if count:
+            self.db.commit()
+        return count
+
+    def rebuild_perceptual_index(self) -> int:
+        """
+        Rebuild the in-memory perceptual hash index from the database,
+        first backfilling hashes missing from older files
+
+        Returns:
+            int: Number of files indexed
+        """
+        self.backfill_perceptual_hashes()
+        rows = self.db.query(UploadedFile.file_id, UploadedFile.perceptual_hash).filter(
+            UploadedFile.perceptual_hash.isnot(None),
+            UploadedFile.is_deleted == False
+        ).all()
+        perceptual_index.rebuild([(hex_to_hash(phash), file_id) for file_id, phash in rows])
+        return len(rows)
+
+    def get_file_by_pixel_hash(self, pixel_hash: str) -> Optional[UploadedFile]:
+        """Get file metadata by canonical pixel hash"""
+        return self.db.query(UploadedFile).filter(
+            UploadedFile.pixel_hash == pixel_hash,
+            UploadedFile.is_deleted == False
+        ).first()
+
     def get_file_path(self, file: UploadedFile) -> Path:
         """Get full filesystem path for a file"""
+        if file.file_type == "output":
+            return self.outputs_dir / file.storage_path
         return self.uploads_dir / file.storage_path
 
+    def get_readable_path(self, file: UploadedFile) -> Path:
+        """
+        Get a filesystem path holding the file's content, promoting the file
+        from cold storage first if needed
+        """
+        if file.storage_tier == "cold":
+            self.promote_file(file)
+        return self.get_file_path(file)
+
+    def promote_file(self, file: UploadedFile):
+        """
+        Move a cold file back to hot storage
+
+        The file keeps its ID and storage path; its pack entry becomes dead
+        space in the append-only pack.
+        """
+        content = self.pack_store.read(file.pack_name, file.pack_offset, file.pack_length)
+
+        file_path = self.get_file_path(file)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a uniquely named temp file and rename it into place, so
+        # concurrent promotions of the same file never share a partial write
+        fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        file.storage_tier = "hot"
+        file.pack_name = None
+        file.pack_offset = None
+        file.pack_length = None
+        file.last_accessed = datetime.now(timezone.utc)
+        self.db.commit()
+
+    def tier_cold_files(self, days: int = 90) -> int:
+        """
+        Move files not accessed in the given number of days into cold pack storage
+
+        Args:
+            days: Move files not accessed in this many days
+
+        Returns:
+            int: Number of files moved
+        """
+        from datetime import timedelta
+
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+
+        cold_files = self.db.query(UploadedFile).filter(
+            UploadedFile.storage_tier == "hot",
+            UploadedFile.last_accessed < cutoff_date,
+            UploadedFile.is_deleted == False
+        ).all()
+
+        count = 0
+        for file in cold_files:
+            file_path = self.get_file_path(file)
+            if not file_path.exists():
+                continue
+
+            pack_name, offset, length = self.pack_store.append(file.file_id, file_path.read_bytes())
+
+            # Bulk update so last_accessed keeps its value - moving a file
+            # must not count as accessing it
+            self.db.query(UploadedFile).filter(
+                UploadedFile.file_id == file.file_id
+            ).update(
+                {
+                    UploadedFile.storage_tier: "cold",
+                    UploadedFile.pack_name: pack_name,
+                    UploadedFile.pack_offset: offset,
+                    UploadedFile.pack_length: length,
+                    UploadedFile.last_accessed: UploadedFile.last_accessed,
+                },
+                synchronize_session=False
+            )
+            self.db.commit()
+
+            # Only remove the hot copy once the pack location is committed
+            file_path.unlink()
+            count += 1
+
+        return count
+
     def increment_reference(self, file_id: str):
         """Increment reference count when file is used in generation"""
         file = self.get_file_by_id(file_id)
@@ -188,6 +723,56 @@ class FileService:
             file.reference_count -= 1
             self.db.commit()
 
+    def add_references(self, counts: Dict[str, int]):
+        """
+        Increment reference counts for many files in one statement
+
+        Changes are left uncommitted so they land in the caller's transaction.
+
+        Args:
+            counts: Number of references to add per file ID
+        """
+        if not counts:
+            return
+
+        self.db.query(UploadedFile).filter(
+            UploadedFile.file_id.in_(list(counts))
+        ).update(
+            {
+                UploadedFile.reference_count: UploadedFile.reference_count + case(
+                    counts, value=UploadedFile.file_id, else_=0
+                ),
+                UploadedFile.last_accessed: datetime.now(timezone.utc)
+            },
+            synchronize_session=False
+        )
+
+    def release_references(self, counts: Dict[str, int]):
+        """
+        Decrement reference counts for many files in one statement
+
+        Changes are left uncommitted so they land in the caller's transaction.
+
+        Args:
+            counts: Number of references to release per file ID
+        """
+        if not counts:
+            return
+
+        decrement = case(counts, value=UploadedFile.file_id, else_=0)
+        self.db.query(UploadedFile).filter(
+            UploadedFile.file_id.in_(list(counts)),
+            UploadedFile.is_deleted == False
+        ).update(
+            {
+                UploadedFile.reference_count: case(
+                    (UploadedFile.reference_count > decrement, UploadedFile.reference_count - decrement),
+                    else_=0
+                )
+            },
+            synchronize_session=False
+        )
+
     def delete_file(self, file_id: str, force: bool = False) -> bool:
         """
         Soft delete a file (or hard delete if force=True and no references)
@@ -219,7 +804,12 @@ class FileService:
             # Soft delete - mark as deleted
             file.is_deleted = True
 
+        # Either way the file no longer counts against its holders' quotas
+        self._release_owners(file)
+
         self.db.commit()
+        perceptual_index.discard(file_id)
+
         return True
 
     def cleanup_orphaned_files(self, days: int = 30) -> int:
@@ -252,6 +842,121 @@ class FileService:
 
         return count
 
+    def save_output_file(
+        self,
+        content: bytes,
+        filename: str,
+        mime_type: str,
+        user_id: Optional[str] = None
+    ) -> UploadedFile:
+        """
+        Store a generated output so it is tracked like uploads
+
+        Outputs are deduplicated by content hash and stored under
+        outputs/{hash[:2]}/{hash[2:4]}/{hash}.ext, which makes them subject
+        to the same tiering and storage budget policies as uploads. The
+        generation whose output_files point at the file holds a reference
+        to it (see GenerationService.update_generation_status).
+
+        Args:
+            content: Output file content
+            filename: Output filename (used for the extension)
+            mime_type: MIME type of the output
+            user_id: Optional user who requested the generation
+
+        Returns:
+            UploadedFile: Database record (existing or newly created)
+        """
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        existing_file = self.get_file_by_hash(content_hash)
+        if existing_file:
+            return self._reuse_existing_file(existing_file, user_id)
+
+        file_ext = Path(filename).suffix.lower() or ".png"
+        storage_subpath = Path(content_hash[:2]) / content_hash[2:4] / f"{content_hash}{file_ext}"
+
+        file_id = str(uuid.uuid4())
+        self._charge_user(file_id, len(content), user_id)
+
+        storage_path = self.outputs_dir / storage_subpath
+        storage_path.parent.mkdir(parents=True, exist_ok=True)
+        storage_path.write_bytes(content)
+
+        db_file = UploadedFile(
+            file_id=file_id,
+            filename=filename,
+            content_hash=content_hash,
+            file_type="output",
+            mime_type=mime_type,
+            size=len(content),
+            storage_path=str(storage_subpath),
+            reference_count=0,
+            user_id=user_id
+        )
+        self.db.add(db_file)
+        self.db.commit()
+        self.db.refresh(db_file)
+
+        return db_file
+
+    def get_hot_storage_bytes(self) -> int:
+        """Total size of files held in hot storage (including soft-deleted files still on disk)"""
+        return self.db.query(func.coalesce(func.sum(UploadedFile.size), 0)).filter(
+            UploadedFile.storage_tier == "hot"
+        ).scalar()
+
+    def enforce_storage_budget(self, budget_bytes: int, batch_size: int = 100) -> Tuple[int, int]:
+        """
+        Evict least-recently-accessed unreferenced files until hot storage fits the budget
+
+        Candidates come from the (reference_count, last_accessed) index rather
+        than a directory scan, and cover every tracked file type: uploads,
+        outputs and any other stored blobs. Files still referenced by a
+        generation are never evicted.
+
+        Args:
+            budget_bytes: Maximum bytes to keep in hot storage
+            batch_size: Number of files to evict per transaction
+
+        Returns:
+            Tuple of (files evicted, bytes freed)
+        """
+        excess = self.get_hot_storage_bytes() - budget_bytes
+        files_evicted = 0
+        bytes_freed = 0
+
+        while bytes_freed < excess:
+            batch = self.db.query(UploadedFile).filter(
+                UploadedFile.reference_count == 0,
+                UploadedFile.storage_tier == "hot"
+            ).order_by(UploadedFile.last_accessed.asc()).limit(batch_size).all()
+
+            if not batch:
+                break
+
+            evicted = []
+            for file in batch:
+                if bytes_freed >= excess:
+                    break
+
+                if not file.is_deleted:
+                    self._release_owners(file)
+                self.db.delete(file)
+                evicted.append((file.file_id, self.get_file_path(file)))
+
+                files_evicted += 1
+                bytes_freed += file.size
+
+            self.db.commit()
+
+            # Only remove the files once their rows are gone
+            for file_id, file_path in evicted:
+                file_path.unlink(missing_ok=True)
+                perceptual_index.discard(file_id)
+
+        return files_evicted, bytes_freed
+
     def calculate_file_hash(self, file_path: Path) -> str:
         """Calculate SHA256 hash of a file"""
         sha256_hash = hashlib.sha256()
@@ -3,27 +3,49 @@ Generation service for managing avatar generation workflows
 
 Handles creation, tracking, and execution of ComfyUI workflows
 """
+import base64
+import binascii
+import json
 import uuid
+import zlib
 import requests
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from collections import Counter
+from datetime import datetime, timezone, timedelta
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, func, null, literal, literal_column
+from sqlalchemy.orm import Session, load_only, undefer, selectinload
 from fastapi import HTTPException
 
+from ..core.config import settings
 from ..models.generation import Generation
+from ..models.generation_counter import GenerationCounter
+from ..models.archived_generation import ArchivedGeneration
 from ..models.uploaded_file import UploadedFile
-from ..services.file_service import FileService
+from ..database.fulltext import FTS_TABLE, SEARCH_CONFIG, PG_DOCUMENT, generations_fts, fts5_query
+from ..services.file_service import FileService, output_file_id
+from ..services.workflow_store import WorkflowStore
+from ..services.event_bus import event_bus
+from ..services.comfyui_relay import get_relay
+from ..services.webhook_service import WebhookService
+
 from ..services.workflow_builder import build_workflow, build_pose_workflow, build_all_poses_workflow
 
+# Generation timestamps, restored from ISO strings when reading the archive
+DATETIME_COLUMNS = ("created_at", "started_at", "completed_at")
+TERMINAL_STATUSES = ("completed", "failed")
+
 
 class GenerationService:
     """Service for managing avatar generation"""
 
-    def __init__(self, db: Session, comfyui_url: str = "http://localhost:8188"):
+    def __init__(self, db: Session, comfyui_url: Optional[str] = None):
         self.db = db
-        self.comfyui_url = comfyui_url
+        # Defaults to the configured backend, whose progress relay the
+        # WebSocket endpoint listens on
+        self.comfyui_url = comfyui_url or settings.COMFYUI_URL
         self.file_service = FileService(db)
+        self.workflow_store = WorkflowStore(db)
 
     def create_generation(
         self,
@@ -37,6 +59,7 @@ class GenerationService:
         pose_image: Optional[str] = None,  # Legacy base64 support
         reference_image: Optional[str] = None,  # Legacy base64 support
         user_id: Optional[str] = None,
+        callback_url: Optional[str] = None,
     ) -> Generation:
         """
         Create a new generation request
@@ -52,6 +75,7 @@ class GenerationService:
             pose_image: Legacy base64 pose image
             reference_image: Legacy base64 reference image
             user_id: Optional user ID who is requesting the generation
+            callback_url: Optional URL to POST to when the generation completes or fails
 
         Returns:
             Generation: Created generation record
@@ -86,8 +110,12 @@ class GenerationService:
         )
 
         self.db.add(generation)
+        self._adjust_counters(user_id, "queued", 1)
+        if callback_url:
+            WebhookService(self.db).register(generation_id, callback_url)
         self.db.commit()
         self.db.refresh(generation)
+        event_bus.publish_generation(generation)
 
         return generation
 
@@ -114,14 +142,14 @@ class GenerationService:
                 if gen.pose_file_id:
                     pose_file = file_service.get_file_by_id(gen.pose_file_id)
                     if pose_file:
-                        self.pose_image = str(file_service.get_file_path(pose_file))
+                        self.pose_image = str(file_service.get_readable_path(pose_file))
 
                 # Handle reference image
                 self.reference_image = None
                 if gen.reference_file_id:
                     ref_file = file_service.get_file_by_id(gen.reference_file_id)
                     if ref_file:
-                        self.reference_image = str(file_service.get_file_path(ref_file))
+                        self.reference_image = str(file_service.get_readable_path(ref_file))
 
         request = WorkflowRequest(generation, self.file_service)
 
@@ -148,7 +176,7 @@ class GenerationService:
         Raises:
             HTTPException: If generation not found or execution fails
         """
-        generation = self.get_generation(generation_id)
+        generation = self.get_generation(generation_id, include_archived=False)
         if not generation:
             raise HTTPException(status_code=404, detail="Generation not found")
 
@@ -160,15 +188,17 @@ class GenerationService:
             workflow = self.build_workflow_for_generation(generation)
 
             # Update status
-            generation.status = "processing"
+            self._set_status(generation, "processing")
             generation.started_at = datetime.now(timezone.utc)
-            generation.workflow = workflow
+            generation.workflow_hash = self.workflow_store.save(workflow)
             self.db.commit()
+            event_bus.publish_generation(generation)
 
-            # Send to ComfyUI
+            # Send to ComfyUI, queued under the progress relay's client ID so
+            # step progress and previews reach its WebSocket
             response = requests.post(
                 f"{self.comfyui_url}/prompt",
-                json=workflow,
+                json={**workflow, "client_id": get_relay(self.comfyui_url).client_id},
                 timeout=30
             )
             response.raise_for_status()
@@ -178,54 +208,368 @@ class GenerationService:
             # Store ComfyUI prompt ID for tracking
             if "prompt_id" in comfyui_response:
                 generation.comfyui_prompt_id = comfyui_response["prompt_id"]
+                self._bump_version(generation)
                 self.db.commit()
+                event_bus.publish_generation(generation)
 
             return generation
 
         except requests.exceptions.RequestException as e:
-            generation.status = "failed"
+            self._set_status(generation, "failed")
             generation.error_message = f"ComfyUI request failed: {str(e)}"
             generation.completed_at = datetime.now(timezone.utc)
+            self._schedule_webhooks(generation)
             self.db.commit()
+            event_bus.publish_generation(generation)
             raise HTTPException(status_code=500, detail=generation.error_message)
 
         except Exception as e:
-            generation.status = "failed"
+            self._set_status(generation, "failed")
             generation.error_message = f"Generation failed: {str(e)}"
             generation.completed_at = datetime.now(timezone.utc)
+            self._schedule_webhooks(generation)
             self.db.commit()
+            event_bus.publish_generation(generation)
             raise HTTPException(status_code=500, detail=generation.error_message)
 
-    def get_generation(self, generation_id: str) -> Optional[Generation]:
-        """Get generation by ID"""
-        return self.db.query(Generation).filter(
+    def get_generation(
+        self,
+        generation_id: str,
+        include_workflow: bool = False,
+        columns: Optional[List[str]] = None,
+        include_archived: bool = True
+    ) -> Optional[Generation]:
+        """
+        Get generation by ID
+
+        Args:
+            generation_id: Generation ID
+            include_workflow: Load the workflow JSON with the row instead of on access
+            columns: Only load these Generation attributes (others load on access)
+            include_archived: Fall back to the archive if the generation is not
+                in the generations table. Archived generations are returned as
+                read-only, detached Generation objects.
+
+        Returns:
+            Generation record or None
+        """
+        query = self._project(self.db.query(Generation), include_workflow, columns)
+        generation = query.filter(
             Generation.generation_id == generation_id
         ).first()
 
+        if generation is None and include_archived:
+            archived = self.db.query(ArchivedGeneration).filter(
+                ArchivedGeneration.generation_id == generation_id
+            ).first()
+            if archived is not None:
+                return self._restore_archived(archived)
+
+        return generation
+
+    def get_generation_version(self, generation_id: str) -> Optional[int]:
+        """
+        Get only the current version of a generation (for conditional requests)
+
+        Archived generations are not looked up; callers fall back to a full read.
+
+        Args:
+            generation_id: Generation ID
+
+        Returns:
+            Version number or None if the generation is not in the generations table
+        """
+        return self.db.query(Generation.version).filter(
+            Generation.generation_id == generation_id
+        ).scalar()
+
+    @staticmethod
+    def _project(query, include_workflow: bool, columns: Optional[List[str]]):
+        """Restrict a Generation query to the columns a caller needs"""
+        if columns:
+            return query.options(load_only(*[getattr(Generation, c) for c in columns]))
+        if include_workflow:
+            return query.options(undefer(Generation.workflow), selectinload(Generation.workflow_blob))
+        return query
+
+    def get_workflow(self, generation: Generation) -> Optional[Dict[str, Any]]:
+        """
+        Get a generation's workflow, whether deduplicated or stored inline
+
+        Args:
+            generation: Generation record
+
+        Returns:
+            Workflow JSON or None if the generation has none
+        """
+        if generation.workflow_hash:
+            blob = generation.workflow_blob
+            if blob is None:
+                # Detached (archived) generations can't lazy-load the relationship
+                return self.workflow_store.load(generation.workflow_hash)
+            return self.workflow_store.decode(blob)
+        return generation.workflow
+
+    def migrate_inline_workflows(self, batch_size: int = 500) -> int:
+        """
+        Move inline workflows into the deduplicated workflow store
+
+        Args:
+            batch_size: Generations migrated per transaction
+
+        Returns:
+            Number of generations migrated
+        """
+        migrated = 0
+        while True:
+            batch = self.db.query(Generation).options(undefer(Generation.workflow)).filter(
+                Generation.workflow.isnot(None),
+                Generation.workflow_hash.is_(None)
+            ).limit(batch_size).all()
+            if not batch:
+                return migrated
+
+            for generation in batch:
+                if generation.workflow is not None:
+                    generation.workflow_hash = self.workflow_store.save(generation.workflow)
+                    migrated += 1
+                # SQL NULL rather than JSON 'null' so the row leaves the filter above
+                generation.workflow = null()
+            self.db.commit()
+
     def list_generations(
         self,
         limit: int = 50,
         offset: int = 0,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+        include_workflow: bool = False,
+        columns: Optional[List[str]] = None
     ) -> List[Generation]:
         """
-        List generations with optional filtering
+        List generations with optional filtering, newest first
 
         Args:
             limit: Maximum number of results
             offset: Number of results to skip
             status: Filter by status
+            cursor: Opaque cursor from a previous page (see encode_cursor).
+                Results continue after the cursor position, which stays
+                index-backed at any depth unlike large offsets.
+            user_id: Filter by requesting user
+            include_workflow: Load workflow JSON with each row
+            columns: Only load these Generation attributes
 
         Returns:
             List of Generation records
         """
-        query = self.db.query(Generation).order_by(Generation.created_at.desc())
+        # Cursor columns are always needed to build next_cursor
+        if columns:
+            columns = list(dict.fromkeys([*columns, "created_at"]))
+        query = self._project(self.db.query(Generation), include_workflow, columns).order_by(
+            Generation.created_at.desc(),
+            Generation.generation_id.desc()
+        )
 
         if status:
             query = query.filter(Generation.status == status)
 
+        if user_id:
+            query = query.filter(Generation.user_id == user_id)
+
+        if cursor:
+            created_at, generation_id = self.decode_cursor(cursor)
+            query = query.filter(or_(
+                Generation.created_at < created_at,
+                and_(Generation.created_at == created_at, Generation.generation_id < generation_id)
+            ))
+
         return query.limit(limit).offset(offset).all()
 
+    def search_generations(
+        self,
+        query: str,
+        status: Optional[str] = None,
+        user_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 20
+    ) -> List[Tuple[Generation, float]]:
+        """
+        Full-text search over prompt, clothing and style, best matches first
+
+        Uses the FTS5 index on SQLite (BM25, prompt matches weighted double)
+        and the tsvector index on PostgreSQL (ts_rank). Other databases fall
+        back to unranked substring matching. Archived generations are not
+        searched.
+
+        Args:
+            query: Search words; every word must match
+            status: Filter by status
+            user_id: Filter by requesting user
+            created_after: Only generations created at or after this time
+            created_before: Only generations created before this time
+            limit: Maximum number of results
+
+        Returns:
+            List of (Generation, score) tuples; higher scores rank higher
+        """
+        if not query.split():
+            raise HTTPException(status_code=400, detail="Search query must not be empty")
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            # bm25() is lower for better matches
+            score = (-func.bm25(literal_column(FTS_TABLE), 2.0, 1.0, 1.0)).label("score")
+            search = self.db.query(Generation, score).join(
+                generations_fts, generations_fts.c.rowid == literal_column("generations.rowid")
+            ).filter(literal_column(FTS_TABLE).op("MATCH")(fts5_query(query)))
+        elif dialect == "postgresql":
+            document = literal_column(PG_DOCUMENT)
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            score = func.ts_rank(document, tsquery).label("score")
+            search = self.db.query(Generation, score).filter(document.op("@@")(tsquery))
+        else:
+            score = literal(0.0).label("score")
+            search = self.db.query(Generation, score).filter(*[
+                or_(
+                    Generation.prompt.ilike(f"%{word}%"),
+                    Generation.clothing.ilike(f"%{word}%"),
+                    Generation.style.ilike(f"%{word}%")
+                )
+                for word in query.split()
+            ])
+
+        if status:
+            search = search.filter(Generation.status == status)
+        if user_id:
+            search = search.filter(Generation.user_id == user_id)
+        if created_after:
+            search = search.filter(Generation.created_at >= created_after)
+        if created_before:
+            search = search.filter(Generation.created_at < created_before)
+
+        rows = search.order_by(score.desc(), Generation.created_at.desc()).limit(limit).all()
+        return [(generation, float(rank)) for generation, rank in rows]
+
+    def count_generations(self, status: Optional[str] = None, user_id: Optional[str] = None) -> int:
+        """
+        Count generations from the maintained counters
+
+        Args:
+            status: Filter by status
+            user_id: Count only this user's generations
+
+        Returns:
+            Number of matching generations
+        """
+        query = self.db.query(func.coalesce(func.sum(GenerationCounter.count), 0)).filter(
+            GenerationCounter.scope == self._counter_scope(user_id)
+        )
+        if status:
+            query = query.filter(GenerationCounter.status == status)
+        return query.scalar()
+
+    def get_generation_stats(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        """Get generation counts by status from the maintained counters"""
+        counters = self.db.query(GenerationCounter).filter(
+            GenerationCounter.scope == self._counter_scope(user_id)
+        ).all()
+        return {counter.status: counter.count for counter in counters if counter.count}
+
+    @staticmethod
+    def _counter_scope(user_id: Optional[str]) -> str:
+        return f"user:{user_id}" if user_id else "all"
+
+    def _adjust_counters(self, user_id: Optional[str], status: Optional[str], delta: int):
+        """
+        Add delta to the global and per-user counters for a status
+
+        Changes are left uncommitted so they land in the caller's transaction.
+        """
+        scopes = ["all"] + ([self._counter_scope(user_id)] if user_id else [])
+        for scope in scopes:
+            counter = self.db.get(GenerationCounter, (scope, status))
+            if counter is None:
+                counter = GenerationCounter(scope=scope, status=status, count=0)
+                self.db.add(counter)
+                self.db.flush()
+            # SQL-side increment so concurrent transitions don't lose updates;
+            # flushed right away so a second adjustment in the same
+            # transaction doesn't replace this one
+            counter.count = GenerationCounter.count + delta
+            self.db.flush()
+
+    def _set_status(self, generation: Generation, status: str):
+        """Change a generation's status and move it between counters"""
+        if generation.status == status:
+            return
+        self._adjust_counters(generation.user_id, generation.status, -1)
+        self._adjust_counters(generation.user_id, status, 1)
+        generation.status = status
+        self._bump_version(generation)
+
+    @staticmethod
+    def _bump_version(generation: Generation):
+        """Give a changed generation a new version (and so a new ETag)"""
+        # SQL-side increment so concurrent changes never share a version
+        generation.version = Generation.version + 1
+
+    def _schedule_webhooks(self, generation: Generation):
+        """Make a generation's callbacks due once it reaches a final status (before commit)"""
+        if generation.status in TERMINAL_STATUSES:
+            WebhookService(self.db).schedule(generation)
+
+    def rebuild_generation_counters(self) -> int:
+        """
+        Recompute all generation counters from the generations table
+
+        Used to backfill databases created before counters existed.
+
+        Returns:
+            Number of counter rows written
+        """
+        self.db.query(GenerationCounter).delete(synchronize_session=False)
+
+        rows = []
+        for row in self.db.query(Generation.status, func.count()).group_by(Generation.status):
+            rows.append(GenerationCounter(scope="all", status=row[0], count=row[1]))
+        for row in self.db.query(Generation.user_id, Generation.status, func.count()).filter(
+            Generation.user_id.isnot(None)
+        ).group_by(Generation.user_id, Generation.status):
+            rows.append(GenerationCounter(scope=self._counter_scope(row[0]), status=row[1], count=row[2]))
+
+        self.db.add_all(rows)
+        self.db.commit()
+        return len(rows)
+
+    def counters_initialized(self) -> bool:
+        """Whether counters exist (or there is nothing to count)"""
+        if self.db.query(GenerationCounter.scope).first() is not None:
+            return True
+        return self.db.query(Generation.generation_id).first() is None
+
+    @staticmethod
+    def encode_cursor(generation: Generation) -> str:
+        """Build an opaque pagination cursor pointing just after a generation"""
+        payload = json.dumps([generation.created_at.isoformat(), generation.generation_id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """
+        Decode a pagination cursor
+
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            created_at, generation_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(created_at), str(generation_id)
+        except (binascii.Error, ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
     def update_generation_status(
         self,
         generation_id: str,
@@ -245,26 +589,79 @@ class GenerationService:
         Returns:
             Updated generation record
         """
-        generation = self.get_generation(generation_id)
+        generation = self.get_generation(generation_id, include_archived=False)
         if not generation:
             raise HTTPException(status_code=404, detail="Generation not found")
 
-        generation.status = status
+        self._set_status(generation, status)
+        self._bump_version(generation)
 
         if status in ["completed", "failed"]:
             generation.completed_at = datetime.now(timezone.utc)
 
         if output_files:
+            # Generations hold a reference to each stored output they list
+            previous = self._output_references(generation.output_files)
+            current = self._output_references(output_files)
+            self.file_service.add_references(current - previous)
+            self.file_service.release_references(previous - current)
             generation.output_files = output_files
 
         if error_message:
             generation.error_message = error_message
 
+        self._schedule_webhooks(generation)
         self.db.commit()
         self.db.refresh(generation)
+        event_bus.publish_generation(generation)
 
         return generation
 
+    def complete_generation(
+        self,
+        generation_id: str,
+        outputs: List[Tuple[str, bytes, Optional[str]]]
+    ) -> Generation:
+        """
+        Store a generation's output images and mark it completed
+
+        Outputs are stored through FileService.save_output_file, so they are
+        deduplicated and covered by tiering and the storage budget.
+
+        Args:
+            generation_id: Generation ID
+            outputs: (filename, content, pose_type) for each output image
+
+        Returns:
+            Updated generation record
+        """
+        generation = self.get_generation(generation_id, include_archived=False)
+        if not generation:
+            raise HTTPException(status_code=404, detail="Generation not found")
+
+        output_files = []
+        for filename, content, pose_type in outputs:
+            mime_type = FileService._sniff_mime_type(content[:16]) or "application/octet-stream"
+            stored = self.file_service.save_output_file(content, filename, mime_type, user_id=generation.user_id)
+            output_files.append({
+                "file_id": stored.file_id,
+                "filename": filename,
+                "url": f"/files/{stored.file_id}",
+                "pose_type": pose_type,
+                "size": stored.size,
+                "dimensions": {"width": stored.width, "height": stored.height} if stored.width else None
+            })
+
+        return self.update_generation_status(generation_id, "completed", output_files=output_files)
+
+    @staticmethod
+    def _output_references(output_files: Optional[List[Dict[str, Any]]]) -> Counter:
+        """Stored files referenced by an output_files list, with multiplicity"""
+        return Counter(
+            file_id for output in output_files or []
+            if (file_id := output_file_id(output))
+        )
+
     def delete_generation(self, generation_id: str) -> bool:
         """
         Delete a generation and decrement file references
@@ -275,22 +672,195 @@ class GenerationService:
         Returns:
             bool: True if deleted
         """
-        generation = self.get_generation(generation_id)
+        generation = self.get_generation(generation_id, include_archived=False)
         if not generation:
-            return False
-
-        # Decrement file references
-        if generation.pose_file_id:
-            self.file_service.decrement_reference(generation.pose_file_id)
+            # Archived generations are not counted, but still hold file references
+            generation = self.db.query(ArchivedGeneration).filter(
+                ArchivedGeneration.generation_id == generation_id
+            ).first()
+            if not generation:
+                return False
+            output_files = self._restore_archived(generation).output_files
+        else:
+            self._adjust_counters(generation.user_id, generation.status, -1)
+            output_files = generation.output_files
 
-        if generation.reference_file_id:
-            self.file_service.decrement_reference(generation.reference_file_id)
+        # Release the input and output file references
+        references = self._output_references(output_files)
+        references.update(
+            file_id for file_id in (generation.pose_file_id, generation.reference_file_id) if file_id
+        )
+        self.file_service.release_references(references)
 
+        user_id = generation.user_id
         self.db.delete(generation)
+        WebhookService(self.db).discard([generation_id])
         self.db.commit()
+        event_bus.publish_deleted(generation_id, user_id)
 
         return True
 
+    def bulk_delete_generations(
+        self,
+        generation_ids: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        user_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        Delete many generations (including archived ones) in batches
+
+        Each batch releases its file references with one grouped UPDATE and
+        adjusts counters per (user, status) instead of per generation.
+
+        Args:
+            generation_ids: Only these generations
+            status: Only generations with this status
+            user_id: Only this user's generations
+            created_after: Only generations created at or after this time
+            created_before: Only generations created before this time
+            batch_size: Generations deleted per transaction
+
+        Returns:
+            Number of generations deleted
+        """
+        deleted = 0
+        for model in (Generation, ArchivedGeneration):
+            filters = []
+            if status:
+                filters.append(model.status == status)
+            if user_id:
+                filters.append(model.user_id == user_id)
+            if created_after:
+                filters.append(model.created_at >= created_after)
+            if created_before:
+                filters.append(model.created_at < created_before)
+
+            if generation_ids is not None:
+                # Chunk the ID list to stay under database parameter limits
+                for start in range(0, len(generation_ids), batch_size):
+                    chunk = generation_ids[start:start + batch_size]
+                    deleted += self._delete_batch(model, [*filters, model.generation_id.in_(chunk)])
+            else:
+                while True:
+                    count = self._delete_batch(model, filters, limit=batch_size)
+                    if not count:
+                        break
+                    deleted += count
+
+        return deleted
+
+    def _delete_batch(self, model, filters: List[Any], limit: Optional[int] = None) -> int:
+        """Delete one batch of generation or archive rows and commit"""
+        # Output references live in output_files, which archive rows keep in the payload
+        outputs_column = Generation.output_files if model is Generation else ArchivedGeneration.payload
+        rows = self.db.query(
+            model.generation_id,
+            model.user_id,
+            model.status,
+            model.pose_file_id,
+            model.reference_file_id,
+            outputs_column
+        ).filter(*filters).limit(limit).all()
+        if not rows:
+            return 0
+
+        references = Counter(
+            file_id
+            for row in rows
+            for file_id in (row.pose_file_id, row.reference_file_id)
+            if file_id
+        )
+        for row in rows:
+            if model is Generation:
+                references.update(self._output_references(row.output_files))
+            else:
+                references.update(self._output_references(json.loads(zlib.decompress(row.payload)).get("output_files")))
+        self.file_service.release_references(references)
+
+        # Archived generations are not counted
+        if model is Generation:
+            for (user_id, status), count in Counter((row.user_id, row.status) for row in rows).items():
+                self._adjust_counters(user_id, status, -count)
+            WebhookService(self.db).discard([row.generation_id for row in rows])
+
+        self.db.query(model).filter(
+            model.generation_id.in_([row.generation_id for row in rows])
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+        if model is Generation:
+            for row in rows:
+                event_bus.publish_deleted(row.generation_id, row.user_id)
+        return len(rows)
+
+    def archive_generations(self, days: int = 30, batch_size: int = 500) -> int:
+        """
+        Move old completed/failed generations to the archive table
+
+        Archived generations keep their file references and remain readable
+        through get_generation, but are no longer listed or counted.
+
+        Args:
+            days: Archive generations that finished more than this many days ago
+            batch_size: Generations moved per transaction
+
+        Returns:
+            Number of generations archived
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        archived = 0
+
+        while True:
+            batch = self.db.query(Generation).options(undefer(Generation.workflow)).filter(
+                Generation.status.in_(TERMINAL_STATUSES),
+                Generation.completed_at < cutoff
+            ).limit(batch_size).all()
+            if not batch:
+                return archived
+
+            self.db.add_all([self._to_archive(generation) for generation in batch])
+
+            counts = Counter((generation.user_id, generation.status) for generation in batch)
+            for (user_id, status), count in counts.items():
+                self._adjust_counters(user_id, status, -count)
+
+            self.db.query(Generation).filter(
+                Generation.generation_id.in_([generation.generation_id for generation in batch])
+            ).delete(synchronize_session=False)
+            self.db.commit()
+            self.db.expunge_all()
+            archived += len(batch)
+
+    @staticmethod
+    def _to_archive(generation: Generation) -> ArchivedGeneration:
+        """Pack a generation into an archive row"""
+        record = {}
+        for attr in Generation.__mapper__.column_attrs:
+            value = getattr(generation, attr.key)
+            record[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+
+        return ArchivedGeneration(
+            generation_id=generation.generation_id,
+            user_id=generation.user_id,
+            status=generation.status,
+            pose_file_id=generation.pose_file_id,
+            reference_file_id=generation.reference_file_id,
+            created_at=generation.created_at,
+            payload=zlib.compress(json.dumps(record, separators=(",", ":")).encode())
+        )
+
+    @staticmethod
+    def _restore_archived(archived: ArchivedGeneration) -> Generation:
+        """Rebuild a detached Generation from an archive row"""
+        record = json.loads(zlib.decompress(archived.payload))
+        for key in DATETIME_COLUMNS:
+            if record.get(key):
+                record[key] = datetime.fromisoformat(record[key])
+        return Generation(**record)
+
     def check_comfyui_health(self) -> Dict[str, Any]:
         """Check if ComfyUI is available"""
         try:
@@ -0,0 +1,195 @@
+"""
+Perceptual image hashing and near-duplicate lookup
+
+Provides a 64-bit difference hash (dHash) that is stable across re-encoding,
+resizing and small colour shifts, plus an in-memory BK-tree index for
+finding stored images within a given Hamming distance. Also provides a
+canonical pixel hash for exact-pixel deduplication independent of the
+container format and metadata.
+"""
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+HASH_SIZE = 8
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the difference hash of an image
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale
+    thumbnail and each bit records whether a pixel is brighter than its
+    right-hand neighbour.
+
+    Args:
+        image: Opened PIL image
+        hash_size: Number of bits per row (64-bit hash by default)
+
+    Returns:
+        int: Hash value with hash_size * hash_size bits
+    """
+    # Let JPEG decoders downscale while decoding instead of inflating
+    # the full-size image first
+    image.draft("L", (hash_size * 8, hash_size * 8))
+    thumbnail = image.convert("L").resize(
+        (hash_size + 1, hash_size),
+        Image.Resampling.LANCZOS
+    )
+    pixels = thumbnail.tobytes()
+
+    value = 0
+    row_width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * row_width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return value
+
+
+def pixel_hash(image: Image.Image) -> str:
+    """
+    Compute a SHA256 hash over an image's decoded pixels
+
+    Images are normalised to RGB (or RGBA when they carry transparency)
+    before hashing, so files with identical pixels hash identically
+    regardless of metadata chunks, compression level or palette/grayscale
+    encoding. Must be called before dhash(), which may reduce the decode
+    resolution of the image.
+
+    Args:
+        image: Opened PIL image
+
+    Returns:
+        str: Hex SHA256 digest
+    """
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    canonical_mode = "RGBA" if has_alpha else "RGB"
+    canonical = image if image.mode == canonical_mode else image.convert(canonical_mode)
+
+    digest = hashlib.sha256(f"{canonical_mode}:{canonical.width}x{canonical.height}:".encode())
+    # tobytes() hands back the whole raster in one C-level copy
+    digest.update(canonical.tobytes())
+    return digest.hexdigest()
+
+
+def hash_to_hex(value: int) -> str:
+    """Format a 64-bit hash as a fixed-width hex string"""
+    return f"{value:016x}"
+
+
+def hex_to_hash(value: str) -> int:
+    """Parse a hex string produced by hash_to_hex"""
+    return int(value, 16)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+class _BKNode:
+    __slots__ = ("value", "file_ids", "children")
+
+    def __init__(self, value: int):
+        self.value = value
+        self.file_ids: set = set()
+        self.children: Dict[int, "_BKNode"] = {}
+
+
+class PerceptualHashIndex:
+    """
+    Thread-safe BK-tree over perceptual hashes
+
+    Each node holds every file ID sharing the same hash. Removing a file
+    only empties its node; empty nodes keep routing searches until the
+    next rebuild() drops them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._root: Optional[_BKNode] = None
+        self._hashes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, value: int, file_id: str):
+        """Insert a file ID under the given hash"""
+        with self._lock:
+            self._insert(value, file_id)
+
+    def _insert(self, value: int, file_id: str):
+        if file_id in self._hashes:
+            self._remove(file_id)
+        self._hashes[file_id] = value
+        if self._root is None:
+            self._root = _BKNode(value)
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.file_ids.add(file_id)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                child = _BKNode(value)
+                node.children[distance] = child
+            node = child
+
+    def discard(self, file_id: str):
+        """Remove a file ID from the index if present"""
+        with self._lock:
+            if file_id in self._hashes:
+                self._remove(file_id)
+
+    def _remove(self, file_id: str):
+        value = self._hashes.pop(file_id)
+        node = self._root
+        while node is not None:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.file_ids.discard(file_id)
+                return
+            node = node.children.get(distance)
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find all files within max_distance bits of the given hash
+
+        Returns:
+            List of (distance, file_id) tuples, closest first
+        """
+        results: List[Tuple[int, str]] = []
+        with self._lock:
+            if self._root is None:
+                return results
+            stack = [self._root]
+            while stack:
+                node = stack.pop()
+                distance = hamming_distance(value, node.value)
+                if distance <= max_distance:
+                    results.extend((distance, file_id) for file_id in node.file_ids)
+                # Triangle inequality: only subtrees whose edge distance is
+                # within max_distance of ours can contain matches
+                low = distance - max_distance
+                high = distance + max_distance
+                for edge, child in node.children.items():
+                    if low <= edge <= high:
+                        stack.append(child)
+        results.sort()
+        return results
+
+    def rebuild(self, entries: List[Tuple[int, str]]):
+        """Replace the index contents with the given (hash, file_id) pairs"""
+        with self._lock:
+            self._root = None
+            self._hashes = {}
+            for value, file_id in entries:
+                self._insert(value, file_id)
+
+
+# Process-wide index, populated at startup and maintained by FileService
+perceptual_index = PerceptualHashIndex()
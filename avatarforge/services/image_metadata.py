@@ -0,0 +1,95 @@
+"""
+Lossless metadata stripping for stored images
+
+Removes exporter metadata (EXIF, XMP, text chunks, timestamps) by copying
+the container structure without the metadata segments. Pixel data is never
+re-encoded, so stripping is lossless and cheap.
+"""
+import struct
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Ancillary PNG chunks that carry metadata only and never affect rendering
+PNG_METADATA_CHUNKS = {b"tEXt", b"zTXt", b"iTXt", b"eXIf", b"tIME"}
+
+# JPEG APPn markers to keep: APP0 (JFIF), APP2 (ICC profile) and
+# APP14 (Adobe colour transform) change how pixels are decoded
+JPEG_KEPT_APP_MARKERS = {0xE0, 0xE2, 0xEE}
+JPEG_COMMENT_MARKER = 0xFE
+JPEG_SOS_MARKER = 0xDA
+
+
+def strip_metadata(content: bytes, mime_type: str) -> bytes:
+    """
+    Strip metadata from an encoded image
+
+    Args:
+        content: Encoded image bytes
+        mime_type: MIME type of the image
+
+    Returns:
+        bytes: Image without metadata segments, or the original content if
+        the format is unsupported or the file cannot be parsed
+    """
+    try:
+        if mime_type == "image/png":
+            return _strip_png(content)
+        if mime_type == "image/jpeg":
+            return _strip_jpeg(content)
+    except (ValueError, struct.error):
+        pass
+    return content
+
+
+def _strip_png(content: bytes) -> bytes:
+    if not content.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+
+    view = memoryview(content)
+    parts = [PNG_SIGNATURE]
+    pos = len(PNG_SIGNATURE)
+    while pos < len(content):
+        length, = struct.unpack_from(">I", content, pos)
+        chunk_type = bytes(view[pos + 4:pos + 8])
+        end = pos + 12 + length  # length + type + data + crc
+        if end > len(content):
+            raise ValueError("Truncated PNG chunk")
+        if chunk_type not in PNG_METADATA_CHUNKS:
+            parts.append(view[pos:end])
+        pos = end
+        if chunk_type == b"IEND":
+            break
+    return b"".join(parts)
+
+
+def _strip_jpeg(content: bytes) -> bytes:
+    if not content.startswith(b"\xff\xd8"):
+        raise ValueError("Not a JPEG file")
+
+    view = memoryview(content)
+    parts = [view[0:2]]
+    pos = 2
+    while pos < len(content):
+        if content[pos] != 0xFF:
+            raise ValueError("Expected JPEG marker")
+        marker = content[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == JPEG_SOS_MARKER:
+            # Entropy-coded data follows - copy the rest verbatim
+            parts.append(view[pos:])
+            break
+        length, = struct.unpack_from(">H", content, pos + 2)
+        end = pos + 2 + length
+        if end > len(content):
+            raise ValueError("Truncated JPEG segment")
+        is_metadata = (
+            marker == JPEG_COMMENT_MARKER
+            or (0xE0 <= marker <= 0xEF and marker not in JPEG_KEPT_APP_MARKERS)
+        )
+        if not is_metadata:
+            parts.append(view[pos:end])
+        pos = end
+    return b"".join(parts)
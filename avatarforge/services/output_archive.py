@@ -0,0 +1,269 @@
+"""
+Streamed ZIP archives of generation outputs
+
+The archive is assembled while it is sent: each file is copied into the
+ZIP in small chunks and the bytes are yielded as soon as they are written,
+so there is no temp file and memory use does not grow with the archive.
+Already-compressed images are stored as-is instead of being deflated again.
+
+Generations (archived ones included) and output files are resolved up
+front in one short database session, which is closed before any file
+content is streamed.
+"""
+import json
+import zipfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, load_only
+
+from ..models.generation import Generation
+from ..models.archived_generation import ArchivedGeneration
+from ..models.uploaded_file import UploadedFile
+from .file_service import FileService, output_file_id
+from .generation_service import GenerationService
+
+# Formats that are already compressed; deflating them again only costs CPU
+STORED_MIME_TYPES = {"image/png", "image/webp", "image/jpeg", "image/gif"}
+
+MANIFEST_NAME = "manifest.json"
+
+# Oldest timestamp a ZIP entry can carry
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that hands written bytes to the stream"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        if chunks:
+            yield b"".join(chunks)
+
+
+class OutputArchiver:
+    """Streams generation outputs as a ZIP archive"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        """
+        Args:
+            session_factory: Opens the session used to resolve generations
+                and files. The archiver closes it before streaming content.
+        """
+        self.session_factory = session_factory
+
+    def stream(
+        self,
+        generation_ids: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        user_id: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 100
+    ) -> Iterator[bytes]:
+        """
+        Stream a ZIP of the outputs of matching generations (archived ones included), newest first
+
+        Each generation's files go in a folder named after its ID, and a
+        manifest.json lists every generation with its files and any outputs
+        that could not be found.
+
+        Args:
+            generation_ids: Only these generations
+            status: Only generations with this status
+            user_id: Only this user's generations
+            created_after: Only generations created at or after this time
+            created_before: Only generations created before this time
+            limit: Maximum number of generations
+
+        Yields:
+            ZIP archive bytes
+        """
+        entries, manifest, file_service = self._resolve(
+            generation_ids, status, user_id, created_after, created_before, limit
+        )
+
+        buffer = _ChunkBuffer()
+        with zipfile.ZipFile(buffer, "w", allowZip64=True) as archive:
+            for arcname, file, pose_type, date_time, record in entries:
+                written = yield from self._write_file(archive, arcname, file, date_time, file_service, buffer)
+                if not written:
+                    record["missing"].append(PurePosixPath(arcname).name)
+                    continue
+                record["files"].append({
+                    "path": arcname,
+                    "file_id": file.file_id,
+                    "pose_type": pose_type,
+                    "size": file.size,
+                })
+
+            archive.writestr(
+                MANIFEST_NAME,
+                json.dumps(manifest, indent=2),
+                compress_type=zipfile.ZIP_DEFLATED
+            )
+        yield from buffer.drain()
+
+    def _resolve(
+        self, generation_ids, status, user_id, created_after, created_before, limit
+    ) -> Tuple[List[tuple], List[Dict[str, Any]], FileService]:
+        """
+        Look up generations and their output files in one short session
+
+        Returns:
+            Tuple of (entries, manifest, file_service). Each entry is
+            (arcname, file, pose_type, date_time, manifest record).
+        """
+        def newest(query, model):
+            if generation_ids is not None:
+                query = query.filter(model.generation_id.in_(generation_ids))
+            if status:
+                query = query.filter(model.status == status)
+            if user_id:
+                query = query.filter(model.user_id == user_id)
+            if created_after:
+                query = query.filter(model.created_at >= created_after)
+            if created_before:
+                query = query.filter(model.created_at < created_before)
+            return query.order_by(model.created_at.desc(), model.generation_id.desc()).limit(limit).all()
+
+        db = self.session_factory()
+        try:
+            generations = newest(db.query(Generation).options(load_only(
+                Generation.generation_id,
+                Generation.status,
+                Generation.prompt,
+                Generation.output_files,
+                Generation.created_at,
+                Generation.completed_at
+            )), Generation)
+            # The newest `limit` of each table cover the newest `limit` overall
+            generations += [
+                GenerationService._restore_archived(archived)
+                for archived in newest(db.query(ArchivedGeneration), ArchivedGeneration)
+            ]
+            generations = sorted(
+                generations,
+                key=lambda generation: (
+                    generation.created_at is not None, generation.created_at or 0, generation.generation_id
+                ),
+                reverse=True
+            )[:limit]
+
+            file_ids = {
+                file_id
+                for generation in generations
+                for output in generation.output_files or []
+                if (file_id := output_file_id(output))
+            }
+            files = {
+                file.file_id: file
+                for file in db.query(UploadedFile).filter(
+                    UploadedFile.file_id.in_(file_ids),
+                    UploadedFile.is_deleted == False
+                ).all()
+            } if file_ids else {}
+            file_service = FileService(db)
+
+            entries = []
+            manifest = []
+            for generation in generations:
+                record = {
+                    "generation_id": generation.generation_id,
+                    "status": generation.status,
+                    "prompt": generation.prompt,
+                    "files": [],
+                    "missing": [],
+                }
+                manifest.append(record)
+                used_names = set()
+                for index, output in enumerate(generation.output_files or []):
+                    name = _unique_name(
+                        PurePosixPath(str(output.get("filename") or f"output_{index}")).name,
+                        used_names
+                    )
+                    file = files.get(output_file_id(output))
+                    if file is None:
+                        record["missing"].append(name)
+                        continue
+                    entries.append((
+                        f"{generation.generation_id}/{name}",
+                        file,
+                        output.get("pose_type"),
+                        generation.completed_at or generation.created_at or ZIP_EPOCH,
+                        record
+                    ))
+
+            # Entries are read after the session closes
+            db.expunge_all()
+            return entries, manifest, file_service
+        finally:
+            db.close()
+
+    def _write_file(
+        self,
+        archive: zipfile.ZipFile,
+        arcname: str,
+        file: UploadedFile,
+        date_time: datetime,
+        file_service: FileService,
+        buffer: _ChunkBuffer
+    ) -> Iterator[bytes]:
+        """
+        Copy one file into the archive, yielding archive bytes per chunk
+
+        Returns (as the generator's return value) False if the file's
+        content is unavailable.
+        """
+        date_time = max(date_time.replace(tzinfo=None), ZIP_EPOCH)
+        info = zipfile.ZipInfo(arcname, date_time=date_time.timetuple()[:6])
+        info.compress_type = zipfile.ZIP_STORED if file.mime_type in STORED_MIME_TYPES else zipfile.ZIP_DEFLATED
+        info.file_size = file.size
+
+        if file.storage_tier == "cold":
+            # Read straight from the pack; promoting on export would write
+            # every cold file back to hot storage
+            chunks = file_service.pack_store.read_chunks(
+                file.pack_name, file.pack_offset, file.pack_length, self.CHUNK_SIZE
+            )
+            with archive.open(info, "w") as target:
+                for chunk in chunks:
+                    target.write(chunk)
+                    yield from buffer.drain()
+            yield from buffer.drain()
+            return True
+
+        path: Path = file_service.get_file_path(file)
+        if not path.exists():
+            return False
+        with open(path, "rb") as source, archive.open(info, "w") as target:
+            while chunk := source.read(self.CHUNK_SIZE):
+                target.write(chunk)
+                yield from buffer.drain()
+        yield from buffer.drain()
+        return True
+
+
+def _unique_name(name: str, used: set) -> str:
+    """Make a filename unique within one generation's folder"""
+    candidate = name
+    stem, suffix = PurePosixPath(name).stem, PurePosixPath(name).suffix
+    counter = 1
+    while candidate in used:
+        counter += 1
+        candidate = f"{stem}_{counter}{suffix}"
+    used.add(candidate)
+    return candidate
@@ -0,0 +1,101 @@
+"""
+Append-only compressed pack files for cold storage
+
+Cold blobs are zlib-compressed and appended to large pack files instead of
+living as one file each, which frees inodes and hot-disk space. Each pack
+has a sidecar .idx file listing "file_id offset length" per entry so packs
+can be re-indexed without the database; the database copy of the offsets
+is what reads use.
+"""
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator, Tuple
+
+PACK_SUFFIX = ".pack"
+INDEX_SUFFIX = ".idx"
+
+
+class PackStore:
+    """Append-only pack file storage"""
+
+    COMPRESSION_LEVEL = 6
+
+    def __init__(self, root: Path, max_pack_bytes: int):
+        self.root = Path(root)
+        self.max_pack_bytes = max_pack_bytes
+        self._lock = threading.Lock()
+
+    def _pack_path(self, pack_name: str) -> Path:
+        return self.root / f"{pack_name}{PACK_SUFFIX}"
+
+    def _current_pack(self) -> str:
+        """Name of the pack to append to, starting a new one once full"""
+        packs = sorted(self.root.glob(f"pack-*{PACK_SUFFIX}"))
+        if packs and packs[-1].stat().st_size < self.max_pack_bytes:
+            return packs[-1].stem
+        number = int(packs[-1].stem.split("-")[1]) + 1 if packs else 1
+        return f"pack-{number:06d}"
+
+    def append(self, file_id: str, data: bytes) -> Tuple[str, int, int]:
+        """
+        Compress and append a blob to the current pack
+
+        Args:
+            file_id: ID of the file being stored (recorded in the sidecar index)
+            data: Raw file content
+
+        Returns:
+            Tuple of (pack_name, offset, length) locating the compressed blob
+        """
+        compressed = zlib.compress(data, self.COMPRESSION_LEVEL)
+
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            pack_name = self._current_pack()
+            pack_path = self._pack_path(pack_name)
+
+            with open(pack_path, "ab") as pack:
+                offset = pack.tell()
+                pack.write(compressed)
+                pack.flush()
+
+            with open(self.root / f"{pack_name}{INDEX_SUFFIX}", "a") as index:
+                index.write(f"{file_id} {offset} {len(compressed)}\n")
+
+        return pack_name, offset, len(compressed)
+
+    def read(self, pack_name: str, offset: int, length: int) -> bytes:
+        """Read and decompress a blob from a pack"""
+        with open(self._pack_path(pack_name), "rb") as pack:
+            pack.seek(offset)
+            compressed = pack.read(length)
+        return zlib.decompress(compressed)
+
+    def read_chunks(self, pack_name: str, offset: int, length: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Read and decompress a blob from a pack incrementally
+
+        Neither the compressed nor the decompressed blob is held in memory
+        whole; each yielded chunk is at most chunk_size bytes.
+
+        Raises:
+            zlib.error: If the blob is corrupt or truncated
+        """
+        decompressor = zlib.decompressobj()
+        with open(self._pack_path(pack_name), "rb") as pack:
+            pack.seek(offset)
+            remaining = length
+            while remaining > 0:
+                compressed = pack.read(min(chunk_size, remaining))
+                if not compressed:
+                    break
+                remaining -= len(compressed)
+                # Cap output per call and feed the unconsumed input back in,
+                # so one highly compressible chunk can't expand unbounded
+                data = decompressor.decompress(compressed, chunk_size)
+                while data:
+                    yield data
+                    data = decompressor.decompress(decompressor.unconsumed_tail, chunk_size)
+        if not decompressor.eof:
+            raise zlib.error(f"Incomplete blob at {pack_name}:{offset}")
@@ -0,0 +1,199 @@
+"""
+Async sender for the webhook delivery outbox
+
+One dispatcher runs on each API process's event loop. It wakes when a
+generation in this process reaches a final status, and otherwise polls the
+outbox so retries, and completions recorded by other processes, still go
+out. Claims are leased through the database, so any number of processes
+can dispatch from the same outbox.
+
+POSTs run concurrently up to WEBHOOK_WORKERS at a time over one pooled
+HTTP client; database work and callback host checks run on the threadpool.
+Without a WEBHOOK_SECRET nothing is claimed, so deliveries stay queued
+until one is configured.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.webhook_delivery import WebhookDelivery
+from .event_bus import event_bus
+from .webhook_service import (
+    WebhookService,
+    check_callback_url,
+    pin_callback_url,
+    sign_payload,
+    signing_secret,
+    ERROR_CONNECTION,
+    ERROR_RESPONSE,
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    DELIVERY_HEADER,
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses that make callbacks due
+WAKE_STATUSES = {"completed", "failed"}
+
+
+def delivery_body(deliveries: List[WebhookDelivery]) -> bytes:
+    """
+    JSON body for one POST
+
+    A single delivery is sent as its event; a batch is sent as
+    {"events": [...]}. Each event carries its delivery_id.
+    """
+    events = [{**delivery.payload, "delivery_id": delivery.delivery_id} for delivery in deliveries]
+    body = events[0] if len(events) == 1 else {"events": events}
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+class WebhookDispatcher:
+    """Sends due webhook deliveries with a bounded number of concurrent POSTs"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        """
+        Args:
+            session_factory: Opens the sessions used to claim and record deliveries
+            client: HTTP client to send with (default: a pooled client sized to WEBHOOK_WORKERS)
+        """
+        self.session_factory = session_factory
+        self.client = client or httpx.AsyncClient(
+            timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.WEBHOOK_WORKERS)
+        )
+        self._semaphore = asyncio.Semaphore(max(settings.WEBHOOK_WORKERS, 1))
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start dispatching on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop dispatching; claimed deliveries not yet recorded are retried after their lease"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.aclose()
+
+    async def _run(self):
+        with event_bus.subscribe() as subscription:
+            while True:
+                try:
+                    while await self.dispatch_due() == self._claim_limit():
+                        # A full claim means more may be due
+                        pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error dispatching webhooks: {e}", exc_info=True)
+
+                deadline = time.monotonic() + settings.WEBHOOK_POLL_INTERVAL_SECONDS
+                while (remaining := deadline - time.monotonic()) > 0:
+                    event = await subscription.get(timeout=remaining)
+                    if event is not None and event.get("status") in WAKE_STATUSES:
+                        break
+
+    @staticmethod
+    def _claim_limit() -> int:
+        return max(settings.WEBHOOK_WORKERS, 1) * max(settings.WEBHOOK_BATCH_SIZE, 1)
+
+    def _claim(self) -> List[WebhookDelivery]:
+        db = self.session_factory()
+        try:
+            return WebhookService(db).claim_due(self._claim_limit())
+        finally:
+            db.close()
+
+    def _record(self, results: Dict[str, Optional[Dict[str, object]]]):
+        db = self.session_factory()
+        try:
+            WebhookService(db).record_results(results)
+        finally:
+            db.close()
+
+    async def dispatch_due(self) -> int:
+        """
+        Claim due deliveries, send them and record the outcomes
+
+        Returns:
+            Number of deliveries claimed
+        """
+        if signing_secret() is None:
+            logger.warning("WEBHOOK_SECRET is not set; webhook deliveries stay queued until it is")
+            return 0
+
+        deliveries = await run_in_threadpool(self._claim)
+        if not deliveries:
+            return 0
+
+        by_url: Dict[str, List[WebhookDelivery]] = defaultdict(list)
+        for delivery in deliveries:
+            by_url[delivery.url].append(delivery)
+        batch_size = max(settings.WEBHOOK_BATCH_SIZE, 1)
+        batches = [
+            group[start:start + batch_size]
+            for group in by_url.values()
+            for start in range(0, len(group), batch_size)
+        ]
+
+        results: Dict[str, Optional[Dict[str, object]]] = {}
+        for outcome in await asyncio.gather(*(self._send(batch) for batch in batches)):
+            results.update(outcome)
+        await run_in_threadpool(self._record, results)
+        return len(deliveries)
+
+    async def _send(self, deliveries: List[WebhookDelivery]) -> Dict[str, Optional[Dict[str, object]]]:
+        """POST one batch to its URL; returns the outcome for each delivery"""
+        url = deliveries[0].url
+        address, failure = await run_in_threadpool(check_callback_url, url)
+        if failure is not None:
+            logger.warning(f"Not delivering webhook to {url}: {failure['error']}")
+            return {delivery.delivery_id: failure for delivery in deliveries}
+
+        body = delivery_body(deliveries)
+        timestamp = int(time.time())
+        headers = {
+            "Content-Type": "application/json",
+            TIMESTAMP_HEADER: str(timestamp),
+            SIGNATURE_HEADER: sign_payload(body, timestamp, signing_secret()),
+            DELIVERY_HEADER: ",".join(delivery.delivery_id for delivery in deliveries),
+        }
+
+        request_url, extensions = url, {}
+        if address is not None:
+            request_url, host_header, extensions = pin_callback_url(url, address)
+            headers.update(host_header)
+
+        async with self._semaphore:
+            try:
+                response = await self.client.post(request_url, content=body, headers=headers, extensions=extensions)
+            except httpx.HTTPError as e:
+                logger.info(f"Webhook POST to {url} failed: {type(e).__name__}: {e}")
+                failure = {"error": ERROR_CONNECTION, "status_code": None}
+            else:
+                if response.is_success:
+                    failure = None
+                else:
+                    logger.info(f"Webhook POST to {url} returned HTTP {response.status_code}")
+                    failure = {"error": ERROR_RESPONSE, "status_code": response.status_code}
+
+        return {delivery.delivery_id: failure for delivery in deliveries}
@@ -0,0 +1,306 @@
+"""
+Webhook delivery outbox
+
+Callbacks are registered with the generation and become due in the same
+transaction as its final status change. Workers claim due deliveries with
+a lease, so a worker that dies mid-send only delays a delivery until the
+lease expires; receivers should treat X-AvatarForge-Delivery as an
+idempotency key.
+
+Nothing is sent until a dedicated WEBHOOK_SECRET is configured, and
+callbacks whose host resolves to a loopback, private, link-local or
+otherwise non-public address are refused. Requests connect to the address
+that was checked, so the host can't be re-resolved elsewhere in between.
+"""
+import hashlib
+import hmac
+import ipaddress
+import random
+import socket
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.webhook_delivery import WebhookDelivery
+from .event_bus import generation_event
+
+SIGNATURE_HEADER = "X-AvatarForge-Signature"
+TIMESTAMP_HEADER = "X-AvatarForge-Timestamp"
+DELIVERY_HEADER = "X-AvatarForge-Delivery"
+
+# Responses worth retrying; other 4xx mean the receiver rejected the payload
+RETRYABLE_CLIENT_ERRORS = {408, 409, 425, 429}
+
+# Stored as last_error, which API clients can read: generic on purpose so
+# deliveries don't reveal anything about the receiver or our network
+ERROR_UNRESOLVABLE = "Callback host could not be resolved"
+ERROR_BLOCKED_ADDRESS = "Callback host resolves to a non-public address"
+ERROR_CONNECTION = "Could not connect to the callback URL"
+ERROR_RESPONSE = "Callback URL did not accept the delivery"
+
+
+def sign_payload(body: bytes, timestamp: int, secret: str) -> str:
+    """
+    HMAC-SHA256 signature of a webhook body
+
+    Receivers recompute HMAC(secret, "{timestamp}.{body}") and compare it
+    with the signature header, rejecting stale timestamps to stop replays.
+    """
+    message = f"{timestamp}.".encode() + body
+    return "sha256=" + hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def signing_secret() -> Optional[str]:
+    """Key for webhook signatures, or None when WEBHOOK_SECRET is not configured"""
+    return settings.WEBHOOK_SECRET or None
+
+
+def resolve_host(host: str, port: int) -> List[str]:
+    """IP addresses a host name resolves to (blocking DNS lookup)"""
+    return [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable unicast"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_url(url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Check a callback URL's host before delivering to it (blocking DNS lookup)
+
+    Returns:
+        Tuple of (address, failure). address is the checked IP address the
+        delivery must connect to (see pin_callback_url), or None when
+        WEBHOOK_ALLOW_PRIVATE_ADDRESSES skips the check. failure is None
+        if the URL may be delivered to, otherwise a failure for
+        record_results; blocked addresses fail permanently
+    """
+    parts = urlsplit(url)
+    if settings.WEBHOOK_ALLOW_PRIVATE_ADDRESSES:
+        return None, None
+    if not parts.hostname:
+        return None, {"error": ERROR_BLOCKED_ADDRESS, "status_code": None, "permanent": True}
+
+    try:
+        addresses = resolve_host(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    except (OSError, UnicodeError, ValueError):
+        # Possibly a transient DNS failure: retry with backoff
+        return None, {"error": ERROR_UNRESOLVABLE, "status_code": None}
+
+    if not addresses or not all(is_public_address(address) for address in addresses):
+        return None, {"error": ERROR_BLOCKED_ADDRESS, "status_code": None, "permanent": True}
+    return addresses[0], None
+
+
+def pin_callback_url(url: str, address: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """
+    Point a callback request at an already checked address
+
+    Connecting to the checked address instead of the host name stops DNS
+    rebinding: a name that resolved to a public address for the check
+    can't resolve to a private one for the request.
+
+    Returns:
+        Tuple of (url, headers, extensions) for the request: the URL with
+        its host replaced by the address, a Host header naming the original
+        host, and for HTTPS the SNI host name the certificate is verified
+        against
+    """
+    parts = urlsplit(url)
+    userinfo, _, host_port = parts.netloc.rpartition("@")
+    pinned_host = f"[{address}]" if ":" in address else address
+    netloc = f"{pinned_host}:{parts.port}" if parts.port else pinned_host
+    if userinfo:
+        netloc = f"{userinfo}@{netloc}"
+
+    extensions = {"sni_hostname": parts.hostname} if parts.scheme == "https" else {}
+    return urlunsplit(parts._replace(netloc=netloc)), {"Host": host_port}, extensions
+
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    """Whether a failed attempt should be retried (None = network error)"""
+    return status_code is None or status_code >= 500 or status_code in RETRYABLE_CLIENT_ERRORS
+
+
+class WebhookService:
+    """Service for the webhook delivery outbox"""
+
+    LEASE_SECONDS = 60
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def register(self, generation_id: str, url: str) -> WebhookDelivery:
+        """
+        Add a callback for a generation (committed with the caller's transaction)
+
+        Args:
+            generation_id: Generation to report on
+            url: Callback URL
+
+        Returns:
+            WebhookDelivery waiting for the generation to finish
+        """
+        delivery = WebhookDelivery(
+            delivery_id=str(uuid.uuid4()),
+            generation_id=generation_id,
+            url=url,
+            status="waiting"
+        )
+        self.db.add(delivery)
+        return delivery
+
+    def schedule(self, generation) -> int:
+        """
+        Make a finished generation's callbacks due (committed with the caller's transaction)
+
+        Args:
+            generation: Generation that reached a final status
+
+        Returns:
+            Number of deliveries scheduled
+        """
+        payload = {
+            "event": f"generation.{generation.status}",
+            "data": generation_event(generation),
+        }
+        return self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.generation_id == generation.generation_id,
+            WebhookDelivery.status == "waiting"
+        ).update({
+            WebhookDelivery.status: "pending",
+            WebhookDelivery.payload: payload,
+            WebhookDelivery.next_attempt_at: datetime.now(timezone.utc),
+        }, synchronize_session=False)
+
+    def discard(self, generation_ids: List[str]):
+        """Drop callbacks still waiting on deleted generations (committed with the caller's transaction)"""
+        self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.generation_id.in_(generation_ids),
+            WebhookDelivery.status == "waiting"
+        ).delete(synchronize_session=False)
+
+    def claim_due(self, limit: int) -> List[WebhookDelivery]:
+        """
+        Claim due deliveries for sending
+
+        Pending deliveries whose time has come and deliveries whose claim
+        expired are leased to the caller. Each claim is a conditional update
+        on the attempt count, so concurrent workers never claim the same
+        attempt twice.
+
+        Args:
+            limit: Maximum deliveries to claim
+
+        Returns:
+            Claimed deliveries (attempts already incremented)
+        """
+        now = datetime.now(timezone.utc)
+        candidates = self.db.query(
+            WebhookDelivery.delivery_id,
+            WebhookDelivery.attempts
+        ).filter(
+            or_(
+                and_(WebhookDelivery.status == "pending", WebhookDelivery.next_attempt_at <= now),
+                and_(WebhookDelivery.status == "sending", WebhookDelivery.next_attempt_at <= now)
+            )
+        ).order_by(WebhookDelivery.next_attempt_at).limit(limit).all()
+
+        claimed_ids = []
+        lease_until = now + timedelta(seconds=self.LEASE_SECONDS)
+        for delivery_id, attempts in candidates:
+            claimed = self.db.query(WebhookDelivery).filter(
+                WebhookDelivery.delivery_id == delivery_id,
+                WebhookDelivery.attempts == attempts,
+                WebhookDelivery.status.in_(("pending", "sending"))
+            ).update({
+                WebhookDelivery.status: "sending",
+                WebhookDelivery.attempts: attempts + 1,
+                WebhookDelivery.next_attempt_at: lease_until,
+            }, synchronize_session=False)
+            if claimed:
+                claimed_ids.append(delivery_id)
+        self.db.commit()
+
+        if not claimed_ids:
+            return []
+        deliveries = self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.delivery_id.in_(claimed_ids)
+        ).order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.created_at).all()
+        self.db.expunge_all()
+        return deliveries
+
+    def record_results(self, results: Dict[str, Optional[Dict[str, Any]]]):
+        """
+        Record the outcome of delivery attempts
+
+        Args:
+            results: delivery_id -> None on success, or
+                {"error": message, "status_code": HTTP status or None,
+                "permanent": optional, True to fail without retrying}
+        """
+        now = datetime.now(timezone.utc)
+        for delivery_id, failure in results.items():
+            delivery = self.db.get(WebhookDelivery, delivery_id)
+            if delivery is None or delivery.status != "sending":
+                continue
+
+            if failure is None:
+                delivery.status = "delivered"
+                delivery.delivered_at = now
+                delivery.last_error = None
+            elif (
+                failure.get("permanent")
+                or delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS
+                or not is_retryable(failure.get("status_code"))
+            ):
+                delivery.status = "failed"
+                delivery.last_error = failure["error"]
+            else:
+                delivery.status = "pending"
+                delivery.last_error = failure["error"]
+                delivery.next_attempt_at = now + timedelta(seconds=self.backoff_seconds(delivery.attempts))
+        self.db.commit()
+
+    @staticmethod
+    def backoff_seconds(attempts: int) -> float:
+        """Exponential backoff with jitter after the given number of attempts"""
+        delay = min(
+            settings.WEBHOOK_BACKOFF_SECONDS * 2 ** (attempts - 1),
+            settings.WEBHOOK_MAX_BACKOFF_SECONDS
+        )
+        # Jitter spreads retries from an outage so they don't arrive at once
+        return delay * random.uniform(0.5, 1.0)
+
+    def list_deliveries(self, generation_id: str) -> List[WebhookDelivery]:
+        """Deliveries registered for a generation, oldest first"""
+        return self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.generation_id == generation_id
+        ).order_by(WebhookDelivery.created_at).all()
+
+    def purge_deliveries(self, days: int) -> int:
+        """
+        Delete delivered and failed deliveries older than the retention period
+
+        Args:
+            days: Keep finished deliveries for this many days
+
+        Returns:
+            Number of deliveries deleted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        deleted = self.db.query(WebhookDelivery).filter(
+            WebhookDelivery.status.in_(("delivered", "failed")),
+            WebhookDelivery.created_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
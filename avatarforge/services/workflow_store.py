@@ -0,0 +1,76 @@
+"""
+Content-addressed storage for ComfyUI workflows
+
+Workflows are serialized to canonical JSON (sorted keys, no whitespace),
+hashed with SHA256 and stored zlib-compressed in the workflow_blobs table.
+Generations keep only the hash.
+"""
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.workflow_blob import WorkflowBlob
+
+COMPRESSION_LEVEL = 6
+
+
+def canonical_workflow(workflow: Dict[str, Any]) -> Tuple[str, bytes]:
+    """
+    Serialize a workflow canonically
+
+    Returns:
+        Tuple of (sha256 hex digest, canonical JSON bytes)
+    """
+    data = json.dumps(workflow, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest(), data
+
+
+class WorkflowStore:
+    """Deduplicated, compressed workflow storage"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def save(self, workflow: Dict[str, Any]) -> str:
+        """
+        Store a workflow if its content is not stored yet
+
+        Changes are left uncommitted so they land in the caller's transaction.
+
+        Args:
+            workflow: ComfyUI workflow JSON
+
+        Returns:
+            str: Workflow hash to reference from the generation
+        """
+        workflow_hash, data = canonical_workflow(workflow)
+
+        if self.db.get(WorkflowBlob, workflow_hash) is None:
+            try:
+                with self.db.begin_nested():
+                    self.db.add(WorkflowBlob(
+                        workflow_hash=workflow_hash,
+                        data=zlib.compress(data, COMPRESSION_LEVEL),
+                        size=len(data)
+                    ))
+            except IntegrityError:
+                # Stored concurrently by another request - same content
+                pass
+
+        return workflow_hash
+
+    def load(self, workflow_hash: str) -> Optional[Dict[str, Any]]:
+        """Load a workflow by hash (None if not stored)"""
+        blob = self.db.get(WorkflowBlob, workflow_hash)
+        if blob is None:
+            return None
+        return self.decode(blob)
+
+    @staticmethod
+    def decode(blob: WorkflowBlob) -> Dict[str, Any]:
+        """Decompress and parse a stored workflow"""
+        return json.loads(zlib.decompress(blob.data))
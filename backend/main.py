@@ -1,22 +1,53 @@
 """
 AvatarForge FastAPI Application Entry Point
 """
+import logging
 from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from avatarforge.core.config import settings
+from avatarforge.core.compression import CompressionMiddleware
+from avatarforge.database.session import SessionLocal
 from avatarforge.rest import api_router
 from avatarforge.controllers.avatarforge_controller import router as controller_router
-from avatarforge.scheduler import start_scheduler, shutdown_scheduler
+from avatarforge.scheduler import (
+    start_scheduler,
+    shutdown_scheduler,
+    upgrade_schema_job,
+    rebuild_perceptual_index_job,
+    backfill_generation_counters_job,
+    ensure_search_index_job
+)
+from avatarforge.services.webhook_dispatcher import WebhookDispatcher
+from avatarforge.services.webhook_service import signing_secret
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - handles startup and shutdown events"""
     # Startup
+    # Sync endpoints run their database work on this threadpool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.WORKER_THREADS
+    upgrade_schema_job()
+    rebuild_perceptual_index_job()
+    backfill_generation_counters_job()
+    ensure_search_index_job()
     start_scheduler()
+    webhook_dispatcher = None
+    if settings.WEBHOOK_WORKERS > 0:
+        if signing_secret():
+            webhook_dispatcher = WebhookDispatcher(SessionLocal)
+        else:
+            logger.warning("WEBHOOK_SECRET is not set; webhooks will not be sent")
+    if webhook_dispatcher:
+        webhook_dispatcher.start()
     yield
     # Shutdown
+    if webhook_dispatcher:
+        await webhook_dispatcher.stop()
     shutdown_scheduler()
 
 app = FastAPI(
@@ -38,6 +69,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/text responses for clients that accept brotli or gzip
+if settings.RESPONSE_COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES
+    )
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /generations serialization with and without FAST_JSON_RESPONSES
+
+Builds a page of completed generations in memory (no database) and measures
+the CPU time spent turning it into response bytes:
+
+- models: AvatarResponse/OutputFile objects, re-validated against the
+  route's response model and encoded with json, as FastAPI does by default
+- fast: plain dicts encoded by FastJSONResponse
+
+Usage:
+    python scripts/benchmark_json_responses.py
+    python scripts/benchmark_json_responses.py --page-size 100 --no-workflow --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from avatarforge.controllers import avatarforge_controller as controller
+from avatarforge.core.responses import FastJSONResponse, orjson
+from avatarforge.models.generation import Generation
+from avatarforge.schemas.avatarforge_schema import GenerationListResponse
+from avatarforge.services.workflow_builder import build_all_poses_workflow
+
+
+def sample_page(page_size: int, with_workflow: bool):
+    """A page of completed all-poses generations and their workflows"""
+    workflow = build_all_poses_workflow(SimpleNamespace(
+        prompt="female warrior, blue armor, long white hair",
+        clothing="plate armor, red cape",
+        style="cel-shaded",
+        realism=False,
+        pose_image=None,
+        reference_image=None
+    )) if with_workflow else None
+
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    generations = []
+    for i in range(page_size):
+        generation_id = str(uuid.uuid4())
+        generations.append(Generation(
+            generation_id=generation_id,
+            prompt=f"female warrior {i}",
+            status="completed",
+            comfyui_prompt_id=str(uuid.uuid4()),
+            output_files=[
+                {
+                    "filename": f"{pose}.png",
+                    "url": f"/files/{uuid.uuid4()}",
+                    "pose_type": pose,
+                    "size": 734_003,
+                    "dimensions": {"width": 512, "height": 768},
+                }
+                for pose in ("front", "back", "side", "quarter")
+            ],
+            created_at=created + timedelta(minutes=i),
+            started_at=created + timedelta(minutes=i, seconds=2),
+            completed_at=created + timedelta(minutes=i, seconds=40),
+        ))
+    return generations, [workflow] * page_size
+
+
+def response_field():
+    """The response model field FastAPI validates GET /generations against"""
+    for route in controller.router.routes:
+        if isinstance(route, APIRoute) and route.path == "/generations" and "GET" in route.methods:
+            return route.response_field
+    raise RuntimeError("GET /generations route not found")
+
+
+async def models_page(field, generations, workflows) -> bytes:
+    content = GenerationListResponse(
+        total=len(generations),
+        generations=[controller._generation_response(g, w) for g, w in zip(generations, workflows)],
+        limit=len(generations),
+        offset=0,
+        next_cursor=None
+    )
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def fast_page(field, generations, workflows) -> bytes:
+    return FastJSONResponse({
+        "total": len(generations),
+        "generations": [controller._generation_dict(g, w) for g, w in zip(generations, workflows)],
+        "limit": len(generations),
+        "offset": 0,
+        "next_cursor": None
+    }).body
+
+
+async def measure(render, field, generations, workflows, iterations: int) -> float:
+    """CPU milliseconds per page"""
+    await render(field, generations, workflows)  # warm up
+    start = time.process_time()
+    for _ in range(iterations):
+        await render(field, generations, workflows)
+    return (time.process_time() - start) * 1000 / iterations
+
+
+async def benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark generation list serialization")
+    parser.add_argument("--page-size", type=int, default=100, help="Generations per page")
+    parser.add_argument("--iterations", type=int, default=200, help="Pages serialized per measurement")
+    parser.add_argument("--no-workflow", action="store_true", help="Omit workflows (include_workflow=false)")
+    args = parser.parse_args()
+
+    generations, workflows = sample_page(args.page_size, not args.no_workflow)
+    field = response_field()
+
+    models_body = await models_page(field, generations, workflows)
+    fast_body = await fast_page(field, generations, workflows)
+    if json.loads(models_body) != json.loads(fast_body):
+        raise SystemExit("✗ Fast responses differ from the response model output")
+
+    models_ms = await measure(models_page, field, generations, workflows, args.iterations)
+    fast_ms = await measure(fast_page, field, generations, workflows, args.iterations)
+
+    print(f"Page: {args.page_size} generations, workflow {'omitted' if args.no_workflow else 'included'}, "
+          f"{len(fast_body) / 1024:.0f} KiB")
+    print(f"Encoder: {'orjson' if orjson is not None else 'pydantic-core (pip install orjson for the fastest path)'}")
+    print(f"  response models: {models_ms:8.2f} ms CPU/page")
+    print(f"  fast path:       {fast_ms:8.2f} ms CPU/page  ({models_ms / fast_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Export generation history as NDJSON or CSV
+
+Streams rows straight from the database in batches, so multi-million-row
+exports run in constant memory.
+
+Usage:
+    python scripts/export_generations.py --format csv --gzip -o generations.csv.gz
+    python scripts/export_generations.py --status completed --since 2025-01-01 > completed.ndjson
+"""
+import argparse
+from datetime import datetime
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from avatarforge.core.config import settings
+from avatarforge.database.session import SessionLocal
+from avatarforge.services.generation_export import EXPORT_FORMATS, GenerationExporter
+
+
+def export_generations():
+    """Write the export to a file or stdout"""
+    parser = argparse.ArgumentParser(description="Export generation history")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson", help="Output format")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    parser.add_argument("--status", help="Only generations with this status")
+    parser.add_argument("--user-id", help="Only this user's generations")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only generations created at or after this time")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only generations created before this time")
+    parser.add_argument("--batch-size", type=int, default=settings.GENERATION_EXPORT_BATCH_SIZE,
+                        help="Rows fetched per batch")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    exporter = GenerationExporter(SessionLocal, format=args.format, compress=args.gzip, batch_size=args.batch_size)
+    chunks = exporter.stream(
+        status=args.status,
+        user_id=args.user_id,
+        created_after=args.since,
+        created_before=args.until
+    )
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+    if args.output:
+        print(f"✓ Exported generations to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    export_generations()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Move inline generation workflows into the deduplicated workflow store
+
+Generations created before workflow deduplication keep their full ComfyUI
+workflow JSON inline. This script stores each distinct workflow once
+(compressed) in workflow_blobs and clears the inline copy.
+
+The schema is upgraded first, so databases from before workflow
+deduplication get the workflow_hash column and the workflow_blobs table.
+"""
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from avatarforge.database.base import Base
+from avatarforge.database.migrations import upgrade_schema
+from avatarforge.database.session import SessionLocal, engine
+from avatarforge.services.generation_service import GenerationService
+
+
+def migrate_workflows():
+    """Migrate inline workflows in batches"""
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    db = SessionLocal()
+    try:
+        migrated = GenerationService(db).migrate_inline_workflows()
+        print(f"✓ Migrated {migrated} workflow(s) to the workflow store")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate_workflows()
@@ -1,7 +1,15 @@
 """Pytest configuration and fixtures"""
+import os
 import sys
 from pathlib import Path
 
+# Test database URL
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+# The app's engine (used by startup jobs) is built from settings on import;
+# point it at the test database, never the real one
+os.environ["DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
+
 # Add backend directory to path
 backend_dir = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(backend_dir))
@@ -12,11 +20,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from avatarforge.database.base import Base
 from avatarforge.database import get_db
+from avatarforge.services.file_service import FileService
+from avatarforge.services.pack_store import PackStore
 from backend.main import app
 
-# Test database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
@@ -35,6 +42,36 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    """Session factory for a fresh temporary database with all tables"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", echo=False)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(session_factory):
+    """Session on a fresh temporary database"""
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="function")
+def file_service(db_session, tmp_path):
+    """FileService on the temporary database with temporary hot and cold storage"""
+    service = FileService(db_session)
+    service.storage_root = tmp_path / "storage"
+    service.uploads_dir = service.storage_root / "uploads"
+    service.outputs_dir = service.storage_root / "outputs"
+    service.uploads_dir.mkdir(parents=True, exist_ok=True)
+    service.outputs_dir.mkdir(parents=True, exist_ok=True)
+    service.pack_store = PackStore(tmp_path / "cold", max_pack_bytes=1024 * 1024)
+    return service
+
+
 @pytest.fixture(scope="function")
 def client(db):
     """Create a test client with database override"""
@@ -0,0 +1,92 @@
+"""Unit tests for bulk generation delete"""
+import pytest
+from datetime import datetime, timedelta
+
+from avatarforge.models.generation import Generation
+from avatarforge.models.archived_generation import ArchivedGeneration
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestBulkDeleteGenerations:
+    """Tests for bulk_delete_generations"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService with generations sharing two files"""
+        service = GenerationService(db_session)
+        for file_id in ("pose", "ref"):
+            db_session.add(UploadedFile(
+                file_id=file_id, filename=f"{file_id}.png", content_hash=f"hash-{file_id}",
+                file_type="pose_image", mime_type="image/png", size=10,
+                storage_path=f"{file_id}.png", reference_count=0
+            ))
+        db_session.commit()
+
+        base = datetime(2025, 1, 1)
+        for i in range(10):
+            gen = service.create_generation(
+                prompt=f"prompt {i}",
+                pose_file_id="pose",
+                reference_file_id="ref" if i < 4 else None,
+                user_id="tester" if i < 6 else "other"
+            )
+            gen.created_at = base + timedelta(days=i)
+            if i % 2:
+                service.update_generation_status(gen.generation_id, "failed")
+        db_session.commit()
+        return service
+
+    def ref_count(self, db_session, file_id):
+        db_session.expire_all()
+        return db_session.get(UploadedFile, file_id).reference_count
+
+    def test_delete_by_user_and_status(self, gen_service, db_session):
+        """Test filtered delete releases references and counters in bulk"""
+        deleted = gen_service.bulk_delete_generations(user_id="tester", status="failed", batch_size=2)
+
+        assert deleted == 3
+        assert self.ref_count(db_session, "pose") == 7
+        assert self.ref_count(db_session, "ref") == 2
+        assert gen_service.get_generation_stats("tester") == {"queued": 3}
+        assert gen_service.count_generations() == 7
+
+    def test_delete_by_ids(self, gen_service, db_session):
+        """Test deleting an explicit ID list in chunks"""
+        ids = [g.generation_id for g in gen_service.list_generations(limit=5)]
+
+        assert gen_service.bulk_delete_generations(generation_ids=ids, batch_size=2) == 5
+        assert db_session.query(Generation).count() == 5
+        assert self.ref_count(db_session, "pose") == 5
+
+    def test_delete_by_date_range(self, gen_service, db_session):
+        """Test deleting by creation time range"""
+        deleted = gen_service.bulk_delete_generations(
+            created_after=datetime(2025, 1, 3),
+            created_before=datetime(2025, 1, 6)
+        )
+
+        assert deleted == 3
+        assert self.ref_count(db_session, "ref") == 2
+
+    def test_includes_archived_generations(self, gen_service, db_session):
+        """Test that archived generations matching the filters are deleted"""
+        gen = gen_service.list_generations(limit=1, status="failed")[0]
+        gen.completed_at = datetime(2000, 1, 1)
+        db_session.commit()
+        gen_service.archive_generations(days=30)
+
+        deleted = gen_service.bulk_delete_generations(status="failed")
+
+        assert deleted == 5
+        assert db_session.query(ArchivedGeneration).count() == 0
+        assert self.ref_count(db_session, "pose") == 5
+
+    def test_references_never_negative(self, gen_service, db_session):
+        """Test that decrements stop at zero"""
+        db_session.get(UploadedFile, "ref").reference_count = 1
+        db_session.commit()
+
+        gen_service.bulk_delete_generations(user_id="tester")
+
+        assert self.ref_count(db_session, "ref") == 0
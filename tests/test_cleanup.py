@@ -8,7 +8,10 @@ from unittest.mock import patch, MagicMock
 from avatarforge.database.base import Base
 from avatarforge.models.uploaded_file import UploadedFile
 from avatarforge.services.file_service import FileService
-from avatarforge.scheduler import cleanup_orphaned_files_job, start_scheduler, shutdown_scheduler
+from avatarforge.scheduler import (
+    backfill_generation_counters_job, cleanup_orphaned_files_job, rebuild_perceptual_index_job,
+    start_scheduler, shutdown_scheduler
+)
 
 
 class TestCleanupOrphanedFiles:
@@ -221,7 +224,8 @@ class TestScheduler:
 
                 # Verify scheduler was created and started
                 MockScheduler.assert_called_once()
-                mock_scheduler_instance.add_job.assert_called_once()
+                job_ids = [c[1]['id'] for c in mock_scheduler_instance.add_job.call_args_list]
+                assert job_ids.count("cleanup_orphaned_files") == 1
                 mock_scheduler_instance.start.assert_called_once()
 
     def test_scheduler_disabled_when_setting_false(self):
@@ -312,9 +316,24 @@ class TestScheduler:
                 start_scheduler()
 
                 # Verify job was added with correct schedule
-                call_args = mock_scheduler_instance.add_job.call_args
+                call_args = next(
+                    c for c in mock_scheduler_instance.add_job.call_args_list
+                    if c[1]['id'] == "cleanup_orphaned_files"
+                )
                 trigger = call_args[1]['trigger']
 
                 # CronTrigger should have hour=3, minute=0
                 assert trigger.fields[5].expressions[0].first == 3  # hour field
                 assert trigger.fields[6].expressions[0].first == 0  # minute field
+
+    @pytest.mark.parametrize("job", [rebuild_perceptual_index_job, backfill_generation_counters_job])
+    def test_startup_job_skips_missing_tables(self, tmp_path, job):
+        """Test startup jobs don't query a database init_db has not created"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}", echo=False)
+
+        with patch('avatarforge.scheduler.engine', engine), \
+                patch('avatarforge.scheduler.SessionLocal') as MockSessionLocal:
+            job()
+
+        MockSessionLocal.assert_not_called()
+        engine.dispose()
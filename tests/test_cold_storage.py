@@ -0,0 +1,184 @@
+"""Unit tests for cold-tier pack storage"""
+import tempfile
+import zlib
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from datetime import datetime, timezone, timedelta
+
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.pack_store import PackStore
+
+
+class TestPackStore:
+    """Tests for the append-only pack store"""
+
+    def test_append_and_read(self, tmp_path):
+        """Test that appended blobs read back unchanged"""
+        store = PackStore(tmp_path / "cold", max_pack_bytes=1024 * 1024)
+
+        first = store.append("file-1", b"first blob" * 100)
+        second = store.append("file-2", b"second blob")
+
+        assert store.read(*first) == b"first blob" * 100
+        assert store.read(*second) == b"second blob"
+        assert first[0] == second[0]
+        assert second[1] == first[1] + first[2]
+
+    def test_read_chunks(self, tmp_path):
+        """Test that a blob streams back unchanged in bounded chunks"""
+        store = PackStore(tmp_path / "cold", max_pack_bytes=1024 * 1024)
+        content = bytes(range(256)) * 400 + b"\0" * 200_000
+        store.append("file-0", b"earlier blob")
+        location = store.append("file-1", content)
+
+        chunks = list(store.read_chunks(*location, chunk_size=4096))
+
+        assert b"".join(chunks) == content
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) <= 4096
+
+    def test_read_chunks_truncated_blob(self, tmp_path):
+        """Test that a truncated blob raises instead of streaming partial content"""
+        store = PackStore(tmp_path / "cold", max_pack_bytes=1024 * 1024)
+        pack_name, offset, length = store.append("file-1", bytes(range(256)) * 400)
+
+        with pytest.raises(zlib.error):
+            list(store.read_chunks(pack_name, offset, length - 10, chunk_size=4096))
+
+    def test_rolls_over_to_new_pack(self, tmp_path):
+        """Test that a new pack is started once the current one is full"""
+        store = PackStore(tmp_path / "cold", max_pack_bytes=10)
+
+        first = store.append("file-1", b"x" * 1000)
+        second = store.append("file-2", b"y" * 1000)
+
+        assert first[0] == "pack-000001"
+        assert second[0] == "pack-000002"
+        assert second[1] == 0
+
+    def test_sidecar_index_written(self, tmp_path):
+        """Test that each append is recorded in the pack's sidecar index"""
+        store = PackStore(tmp_path / "cold", max_pack_bytes=1024 * 1024)
+
+        pack_name, offset, length = store.append("file-1", b"data")
+
+        index = (tmp_path / "cold" / f"{pack_name}.idx").read_text()
+        assert index == f"file-1 {offset} {length}\n"
+
+
+class TestColdTiering:
+    """Tests for moving files between hot and cold storage"""
+
+    def create_test_file(self, file_service, file_id: str, days_old: int):
+        """Helper to create a stored file last accessed days_old days ago"""
+        storage_subpath = f"pose_image/{file_id}.png"
+        file_path = file_service.uploads_dir / storage_subpath
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(f"content of {file_id}".encode() * 50)
+
+        last_accessed = datetime.now(timezone.utc) - timedelta(days=days_old)
+        file_record = UploadedFile(
+            file_id=file_id,
+            filename=f"{file_id}.png",
+            content_hash=f"hash_{file_id}",
+            file_type="pose_image",
+            mime_type="image/png",
+            size=file_path.stat().st_size,
+            storage_path=storage_subpath,
+            reference_count=1,
+            is_deleted=False,
+            created_at=last_accessed,
+            last_accessed=last_accessed
+        )
+        file_service.db.add(file_record)
+        file_service.db.commit()
+        return file_path
+
+    def test_old_files_moved_to_cold(self, file_service):
+        """Test that files past the threshold are packed and removed from hot storage"""
+        old_path = self.create_test_file(file_service, "old", days_old=120)
+        recent_path = self.create_test_file(file_service, "recent", days_old=5)
+
+        moved = file_service.tier_cold_files(days=90)
+
+        assert moved == 1
+        assert not old_path.exists()
+        assert recent_path.exists()
+
+        old = file_service.get_file_by_id("old")
+        assert old.storage_tier == "cold"
+        assert old.pack_name is not None
+        assert file_service.get_file_by_id("recent").storage_tier == "hot"
+
+    def test_tiering_preserves_last_accessed(self, file_service):
+        """Test that moving a file to cold storage does not count as an access"""
+        self.create_test_file(file_service, "old", days_old=120)
+        before = file_service.get_file_by_id("old").last_accessed
+
+        file_service.tier_cold_files(days=90)
+        file_service.db.expire_all()
+
+        assert file_service.get_file_by_id("old").last_accessed == before
+
+    def test_cold_file_promoted_on_read(self, file_service):
+        """Test that reading a cold file restores it to hot storage unchanged"""
+        old_path = self.create_test_file(file_service, "old", days_old=120)
+        original = old_path.read_bytes()
+        file_service.tier_cold_files(days=90)
+
+        cold_file = file_service.get_file_by_id("old")
+        path = file_service.get_readable_path(cold_file)
+
+        assert path == old_path
+        assert path.read_bytes() == original
+        promoted = file_service.get_file_by_id("old")
+        assert promoted.storage_tier == "hot"
+        assert promoted.pack_name is None
+
+    def test_promotion_uses_unique_temp_files(self, file_service):
+        """Test that each promotion writes its own temp file and leaves none behind"""
+        old_path = self.create_test_file(file_service, "old", days_old=120)
+        file_service.tier_cold_files(days=90)
+        cold_file = file_service.get_file_by_id("old")
+        pack_location = (cold_file.pack_name, cold_file.pack_offset, cold_file.pack_length)
+
+        temp_names = []
+        real_mkstemp = tempfile.mkstemp
+
+        def recording_mkstemp(*args, **kwargs):
+            fd, name = real_mkstemp(*args, **kwargs)
+            temp_names.append(name)
+            return fd, name
+
+        with patch("avatarforge.services.file_service.tempfile.mkstemp", side_effect=recording_mkstemp):
+            file_service.promote_file(cold_file)
+            cold_file.storage_tier = "cold"
+            cold_file.pack_name, cold_file.pack_offset, cold_file.pack_length = pack_location
+            file_service.promote_file(cold_file)
+
+        assert len(set(temp_names)) == 2
+        assert all(Path(name).parent == old_path.parent for name in temp_names)
+        assert list(old_path.parent.iterdir()) == [old_path]
+
+    def test_failed_promotion_removes_temp_file(self, file_service):
+        """Test that a promotion that fails to rename cleans up its temp file"""
+        old_path = self.create_test_file(file_service, "old", days_old=120)
+        file_service.tier_cold_files(days=90)
+
+        with patch("avatarforge.services.file_service.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                file_service.promote_file(file_service.get_file_by_id("old"))
+
+        assert list(old_path.parent.iterdir()) == []
+        assert file_service.get_file_by_id("old").storage_tier == "cold"
+
+    def test_file_id_unchanged_across_tiers(self, file_service):
+        """Test that tiering never changes file IDs or storage paths"""
+        self.create_test_file(file_service, "old", days_old=120)
+        storage_path = file_service.get_file_by_id("old").storage_path
+
+        file_service.tier_cold_files(days=90)
+        file_service.get_readable_path(file_service.get_file_by_id("old"))
+
+        assert file_service.get_file_by_id("old").storage_path == storage_path
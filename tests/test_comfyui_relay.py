@@ -0,0 +1,104 @@
+"""Unit tests for the ComfyUI progress relay"""
+import asyncio
+import base64
+import io
+import json
+import struct
+import pytest
+from unittest.mock import patch
+from PIL import Image
+
+from avatarforge.services.comfyui_relay import ProgressRelay, get_relay, websocket_url
+
+
+def preview_frame(size=(512, 512)) -> bytes:
+    """Binary ComfyUI preview message holding a JPEG"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, format="JPEG")
+    return struct.pack(">II", 1, 1) + buffer.getvalue()
+
+
+class TestProgressRelay:
+    """Tests for ProgressRelay message handling"""
+
+    @pytest.fixture
+    def relay(self):
+        """Relay whose upstream connection never starts"""
+        relay = ProgressRelay("http://comfyui:8188")
+        with patch.object(ProgressRelay, "_run", lambda self: asyncio.sleep(3600)):
+            yield relay
+
+    def drain(self, subscription):
+        messages = []
+        while not subscription.queue.empty():
+            messages.append(subscription.queue.get_nowait())
+        return messages
+
+    @pytest.mark.asyncio
+    async def test_progress_routed_by_prompt(self, relay):
+        """Test progress reaches only the prompt's subscribers, with an ETA after two steps"""
+        watcher = relay.subscribe("prompt-1")
+        other = relay.subscribe("prompt-2")
+
+        relay.handle_text(json.dumps({"type": "executing", "data": {"node": "3", "prompt_id": "prompt-1"}}))
+        for value in (1, 2):
+            relay.handle_text(json.dumps({
+                "type": "progress",
+                "data": {"value": value, "max": 20, "node": "3", "prompt_id": "prompt-1"}
+            }))
+
+        messages = self.drain(watcher)
+        assert [m["type"] for m in messages] == ["executing", "progress", "progress"]
+        assert messages[1]["percent"] == 5.0 and messages[1]["eta_seconds"] is None
+        assert messages[2]["value"] == 2 and messages[2]["eta_seconds"] is not None
+        assert self.drain(other) == []
+
+        relay.unsubscribe(watcher)
+        relay.unsubscribe(other)
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_previews_only_for_opted_in_clients(self, relay):
+        """Test previews are downscaled and sent only to subscribers that asked"""
+        plain = relay.subscribe("prompt-1")
+        with_previews = relay.subscribe("prompt-1", previews=True)
+        relay.handle_text(json.dumps({"type": "executing", "data": {"node": "3", "prompt_id": "prompt-1"}}))
+        self.drain(plain), self.drain(with_previews)
+
+        await relay.handle_binary(preview_frame())
+        await relay.handle_binary(preview_frame())  # within the throttle interval
+
+        assert self.drain(plain) == []
+        previews = self.drain(with_previews)
+        assert len(previews) == 1
+        image = Image.open(io.BytesIO(base64.b64decode(previews[0]["image"])))
+        assert max(image.size) <= 256
+
+        relay.unsubscribe(plain)
+        relay.unsubscribe(with_previews)
+        await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_upstream_stopped_after_last_unsubscribe(self, relay):
+        """Test the shared connection only runs while someone is subscribed"""
+        first = relay.subscribe("prompt-1")
+        second = relay.subscribe("prompt-2")
+        task = relay._task
+
+        relay.unsubscribe(first)
+        assert relay._task is task
+        relay.unsubscribe(second)
+        await asyncio.sleep(0)
+
+        assert relay._task is None
+        assert task.cancelled()
+
+    def test_one_relay_per_backend(self):
+        """Test relays are shared per ComfyUI URL"""
+        assert get_relay("http://a:8188") is get_relay("http://a:8188")
+        assert get_relay("http://a:8188") is not get_relay("http://b:8188")
+
+    def test_websocket_url(self):
+        """Test the upstream URL is derived from the HTTP base URL"""
+        assert websocket_url("https://host/comfy/", "abc") == "wss://host/comfy/ws?clientId=abc"
+        assert websocket_url("http://localhost:8188", "abc") == "ws://localhost:8188/ws?clientId=abc"
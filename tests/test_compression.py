@@ -0,0 +1,139 @@
+"""Unit tests for negotiated response compression"""
+import gzip
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from avatarforge.core import compression
+from avatarforge.core.compression import CompressionMiddleware, accepted_encodings, choose_encoding
+
+LARGE = {"workflow": {str(i): {"class_type": "KSampler", "inputs": {"seed": i}} for i in range(200)}}
+
+
+@pytest.fixture
+def client():
+    """App with one route per kind of response"""
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=500,
+        content_types=["application/json", "application/x-ndjson"]
+    )
+
+    @app.get("/large")
+    def large():
+        return LARGE
+
+    @app.get("/small")
+    def small():
+        return {"status": "queued"}
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\x00" * 5000, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 5000), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((json.dumps({"row": i}) + "\n" for i in range(500)), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(["data: x\n\n"] * 300), media_type="text/event-stream")
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": 'W/"1"'})
+
+    return TestClient(app)
+
+
+class TestEncodingNegotiation:
+    """Tests for Accept-Encoding parsing"""
+
+    def test_parse_q_values(self):
+        """Test codings and q-values are parsed"""
+        assert accepted_encodings("gzip;q=0.5, br, identity;q=0") == {"gzip": 0.5, "br": 1.0, "identity": 0.0}
+
+    def test_gzip_without_brotli(self, monkeypatch):
+        """Test gzip is chosen when brotli is unavailable"""
+        monkeypatch.setattr(compression, "brotli", None)
+
+        assert choose_encoding("gzip, deflate, br") == "gzip"
+        assert choose_encoding("br") is None
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("*") == "gzip"
+        assert choose_encoding("") is None
+
+    def test_brotli_preferred_when_available(self, monkeypatch):
+        """Test br wins ties but respects client preference"""
+        monkeypatch.setattr(compression, "brotli", object())
+
+        assert choose_encoding("gzip, br") == "br"
+        assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+class TestCompressionMiddleware:
+    """Tests for CompressionMiddleware"""
+
+    def test_compresses_large_json(self, client):
+        """Test large JSON bodies are gzipped with a correct length"""
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(json.dumps(LARGE)) / 5
+        assert response.json() == LARGE
+
+    def test_skips_small_bodies(self, client):
+        """Test bodies under the threshold are sent as-is"""
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == {"status": "queued"}
+
+    def test_skips_unaccepted(self, client):
+        """Test clients that don't accept gzip get identity responses"""
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == LARGE
+
+    @pytest.mark.parametrize("path", ["/image", "/events", "/not-modified"])
+    def test_skips_other_content_types(self, client, path):
+        """Test images, event streams and empty responses are not compressed"""
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_keeps_existing_encoding(self, client):
+        """Test already-encoded responses are not compressed twice"""
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+
+        assert response.content == b"x" * 5000
+
+    def test_compresses_streams_incrementally(self, client):
+        """Test streamed NDJSON is compressed without a Content-Length"""
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        lines = response.text.splitlines()
+        assert len(lines) == 500
+        assert json.loads(lines[-1]) == {"row": 499}
+
+    def test_brotli(self, client):
+        """Test brotli is used when installed and accepted"""
+        brotli = pytest.importorskip("brotli")
+
+        with client.stream("GET", "/large", headers={"Accept-Encoding": "br, gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "br"
+        assert json.loads(brotli.decompress(raw)) == LARGE
@@ -0,0 +1,125 @@
+"""Tests for generation versions and conditional GET (ETag / If-None-Match)"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+
+from backend.main import app
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestGenerationVersions:
+    """Tests for version bumps on generation changes"""
+
+    @pytest.fixture
+    def gen_service(self, session_factory):
+        db = session_factory()
+        yield GenerationService(db)
+        db.close()
+
+    def test_version_bumps_on_every_change(self, gen_service):
+        """Test each transition and output update gives a new version"""
+        generation_id = gen_service.create_generation(prompt="test avatar").generation_id
+        assert gen_service.get_generation_version(generation_id) == 1
+
+        gen_service.update_generation_status(generation_id, "processing")
+        assert gen_service.get_generation_version(generation_id) == 2
+
+        # Same status, new outputs: still a visible change
+        gen_service.update_generation_status(generation_id, "processing", output_files=[{"filename": "a.png"}])
+        assert gen_service.get_generation_version(generation_id) == 3
+
+        gen_service.update_generation_status(generation_id, "completed")
+        assert gen_service.get_generation(generation_id).version == 4
+
+    @patch("avatarforge.services.generation_service.requests.post")
+    def test_version_bumps_when_prompt_accepted(self, mock_post, gen_service):
+        """Test storing the ComfyUI prompt ID changes the version"""
+        mock_post.return_value = Mock(json=Mock(return_value={"prompt_id": "comfy-1"}))
+        generation_id = gen_service.create_generation(prompt="test avatar").generation_id
+
+        with patch.object(GenerationService, "build_workflow_for_generation", return_value={"prompt": {}}):
+            gen_service.execute_generation(generation_id)
+
+        assert gen_service.get_generation_version(generation_id) == 3
+
+    def test_missing_generation_has_no_version(self, gen_service):
+        """Test version lookup misses for unknown generations"""
+        assert gen_service.get_generation_version("missing") is None
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match on GET /generations/{id}"""
+
+    @pytest.fixture
+    def session_factory(self, session_factory):
+        """Route controller reads to the temporary database"""
+        with patch("avatarforge.controllers.avatarforge_controller.open_read_session", lambda request: session_factory()), \
+                patch("avatarforge.controllers.avatarforge_controller.SessionLocal", session_factory):
+            yield session_factory
+
+    @pytest.fixture
+    def generation_id(self, session_factory):
+        db = session_factory()
+        generation_id = GenerationService(db).create_generation(prompt="test avatar").generation_id
+        db.close()
+        return generation_id
+
+    @pytest.fixture
+    def client(self):
+        return TestClient(app)
+
+    def url(self, generation_id):
+        return f"/avatarforge-controller/generations/{generation_id}"
+
+    def test_unchanged_generation_returns_304(self, client, generation_id):
+        """Test a matching If-None-Match gets an empty 304 from the version lookup"""
+        first = client.get(self.url(generation_id))
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert etag.startswith('W/"1-')
+
+        with patch("avatarforge.controllers.avatarforge_controller._read_generation") as mock_read:
+            response = client.get(self.url(generation_id), headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        mock_read.assert_not_called()
+
+    def test_changed_generation_returns_200(self, client, generation_id, session_factory):
+        """Test a stale ETag gets the new state and a new ETag"""
+        etag = client.get(self.url(generation_id)).headers["etag"]
+
+        db = session_factory()
+        GenerationService(db).update_generation_status(generation_id, "completed")
+        db.close()
+
+        response = client.get(self.url(generation_id), headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert response.headers["etag"] != etag
+
+    def test_etag_varies_by_representation(self, client, generation_id):
+        """Test sparse and full responses of the same version have different ETags"""
+        full = client.get(self.url(generation_id)).headers["etag"]
+        sparse = client.get(self.url(generation_id), params={"fields": "status"})
+
+        assert sparse.headers["etag"] != full
+        response = client.get(self.url(generation_id), params={"fields": "status"}, headers={"If-None-Match": full})
+        assert response.status_code == 200
+
+    def test_long_poll_returns_304_on_timeout(self, client, generation_id):
+        """Test a long poll with a current ETag times out with 304"""
+        etag = client.get(self.url(generation_id)).headers["etag"]
+
+        response = client.get(self.url(generation_id), params={"wait": 1}, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    def test_long_poll_returns_stale_copy_immediately(self, client, generation_id):
+        """Test a long poll with an outdated ETag returns the current state at once"""
+        response = client.get(self.url(generation_id), params={"wait": 30}, headers={"If-None-Match": 'W/"0-0"'})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
@@ -1,12 +1,21 @@
 """Integration tests for controller endpoints"""
 import pytest
+from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 from unittest.mock import Mock, patch, MagicMock
 import io
+import json
+import threading
+import time
+from datetime import datetime
 from PIL import Image
 
 from backend.main import app
+from avatarforge.core.config import settings
 from avatarforge.database.session import get_db
+from avatarforge.services.comfyui_relay import ProgressSubscription
+from avatarforge.services.event_bus import event_bus
 
 
 @pytest.fixture
@@ -132,6 +141,50 @@ class TestFileUploadEndpoints:
         assert data["exists"] == False
         assert data["file_id"] is None
 
+    def test_find_similar_files(self, client, override_get_db):
+        """Test GET /files/{file_id}/similar excludes the queried file"""
+        source = Mock()
+        source.file_id = "source-id"
+        match = Mock()
+        match.file_id = "match-id"
+        match.filename = "match.jpg"
+
+        with patch('avatarforge.services.file_service.FileService.get_file_by_id', return_value=source), \
+                patch('avatarforge.services.file_service.FileService.get_perceptual_hash', return_value=0xff), \
+                patch('avatarforge.services.file_service.FileService.find_similar_files',
+                      return_value=[(0, source), (3, match)]):
+            response = client.get("/avatarforge-controller/files/source-id/similar?max_distance=8")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["perceptual_hash"] == "00000000000000ff"
+        assert data["max_distance"] == 8
+        assert [m["file_id"] for m in data["matches"]] == ["match-id"]
+        assert data["matches"][0]["distance"] == 3
+
+    def test_find_similar_files_not_found(self, client, override_get_db):
+        """Test GET /files/{file_id}/similar with non-existent file"""
+        with patch('avatarforge.services.file_service.FileService.get_file_by_id', return_value=None):
+            response = client.get("/avatarforge-controller/files/invalid-id/similar")
+
+        assert response.status_code == 404
+
+    def test_get_user_storage(self, client, override_get_db):
+        """Test GET /users/{user_id}/storage"""
+        usage = Mock()
+        usage.bytes_used = 4096
+        usage.file_count = 3
+
+        with patch('avatarforge.services.file_service.FileService.get_user_usage', return_value=usage):
+            response = client.get("/avatarforge-controller/users/alice/storage")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user_id"] == "alice"
+        assert data["bytes_used"] == 4096
+        assert data["file_count"] == 3
+        assert data["quota_bytes"] is None
+
     def test_delete_file_success(self, client, override_get_db):
         """Test DELETE /files/{file_id} success"""
         with patch('avatarforge.services.file_service.FileService.delete_file', return_value=True):
@@ -231,6 +284,43 @@ class TestGenerationEndpoints:
         data = response.json()
         assert "front" in data["message"].lower()
 
+    @patch('avatarforge.services.file_service.FileService.ingest_base64_image')
+    @patch('avatarforge.services.generation_service.GenerationService.create_generation')
+    @patch('avatarforge.services.generation_service.GenerationService.execute_generation')
+    def test_generate_avatar_with_base64_image(self, mock_execute, mock_create, mock_ingest, client, override_get_db):
+        """Test POST /generate/avatar links legacy base64 images by file ID"""
+        mock_gen = Mock()
+        mock_gen.generation_id = "gen-legacy"
+        mock_gen.status = "queued"
+        mock_gen.created_at = "2025-01-01T00:00:00"
+        mock_gen.started_at = None
+        mock_gen.completed_at = None
+        mock_gen.error_message = None
+        mock_gen.comfyui_prompt_id = None
+        mock_create.return_value = mock_gen
+
+        stored = Mock()
+        stored.file_id = "file-from-base64"
+        mock_ingest.return_value = stored
+
+        response = client.post(
+            "/avatarforge-controller/generate/avatar",
+            json={
+                "prompt": "cyberpunk character",
+                "pose_image": "data:image/png;base64,iVBORw0KGgo=",
+                "reference_file_id": "file-456",
+                "user_id": "user-1"
+            }
+        )
+
+        assert response.status_code == 200
+        mock_ingest.assert_called_once_with(
+            "data:image/png;base64,iVBORw0KGgo=", file_type="pose_image", user_id="user-1"
+        )
+        kwargs = mock_create.call_args.kwargs
+        assert kwargs["pose_file_id"] == "file-from-base64"
+        assert kwargs["reference_file_id"] == "file-456"
+
     def test_generate_pose_invalid(self, client, override_get_db):
         """Test POST /generate_pose with invalid pose"""
         response = client.post(
@@ -291,6 +381,51 @@ class TestGenerationManagementEndpoints:
         assert data["generation_id"] == "gen-123"
         assert data["status"] == "completed"
 
+    @patch('avatarforge.services.generation_service.GenerationService.get_generation')
+    def test_get_generation_omits_workflow_by_default(self, mock_get, client, override_get_db):
+        """Test GET /generations/{id} only returns the workflow when asked"""
+        mock_gen = Mock()
+        mock_gen.generation_id = "gen-123"
+        mock_gen.status = "processing"
+        mock_gen.created_at = "2025-01-01T00:00:00"
+        mock_gen.started_at = None
+        mock_gen.completed_at = None
+        mock_gen.error_message = None
+        mock_gen.comfyui_prompt_id = None
+        mock_gen.workflow = {"1": {"class_type": "KSampler"}}
+        mock_gen.workflow_hash = None
+        mock_gen.output_files = None
+        mock_get.return_value = mock_gen
+
+        response = client.get("/avatarforge-controller/generations/gen-123")
+        assert response.json()["workflow"] is None
+        assert mock_get.call_args.kwargs["include_workflow"] is False
+
+        response = client.get("/avatarforge-controller/generations/gen-123?include_workflow=true")
+        assert response.json()["workflow"] == {"1": {"class_type": "KSampler"}}
+
+    @patch('avatarforge.services.generation_service.GenerationService.get_generation')
+    def test_get_generation_sparse_fields(self, mock_get, client, override_get_db):
+        """Test GET /generations/{id}?fields= returns only the requested fields"""
+        mock_gen = Mock()
+        mock_gen.generation_id = "gen-123"
+        mock_gen.status = "failed"
+        mock_gen.error_message = "boom"
+        mock_get.return_value = mock_gen
+
+        response = client.get("/avatarforge-controller/generations/gen-123?fields=status,error")
+
+        assert response.status_code == 200
+        assert response.json() == {"generation_id": "gen-123", "status": "failed", "error": "boom"}
+        assert mock_get.call_args.kwargs["columns"] == ["generation_id", "status", "error_message", "version"]
+
+    def test_get_generation_unknown_field(self, client, override_get_db):
+        """Test GET /generations/{id} rejects unknown fields"""
+        response = client.get("/avatarforge-controller/generations/gen-123?fields=status,prompt")
+
+        assert response.status_code == 400
+        assert "prompt" in response.json()["detail"]
+
     @patch('avatarforge.services.generation_service.GenerationService.get_generation')
     def test_get_generation_not_found(self, mock_get, client, override_get_db):
         """Test GET /generations/{id} not found"""
@@ -300,8 +435,90 @@ class TestGenerationManagementEndpoints:
 
         assert response.status_code == 404
 
+    @patch('avatarforge.controllers.avatarforge_controller._read_generation')
+    def test_get_generation_wait_finished(self, mock_read, client):
+        """Test long polls return immediately for finished generations"""
+        mock_read.return_value = ("completed", JSONResponse({"status": "completed"}))
+
+        response = client.get("/avatarforge-controller/generations/gen-123?wait=30")
+
+        assert response.json() == {"status": "completed"}
+        assert mock_read.call_count == 1
+
+    @patch('avatarforge.controllers.avatarforge_controller._read_generation')
+    def test_get_generation_wait_wakes_on_change(self, mock_read, client):
+        """Test long polls return the new state from the primary once the status changes"""
+        def read(request, generation_id, include_workflow, fields, primary=False):
+            if primary:
+                return "completed", JSONResponse({"status": "completed"})
+            # The change lands just after the first read; it must still wake the poll
+            event_bus.publish({"generation_id": generation_id, "user_id": None, "status": "processing"})
+            event_bus.publish({"generation_id": generation_id, "user_id": None, "status": "completed"})
+            return "processing", JSONResponse({"status": "processing"})
+
+        mock_read.side_effect = read
+
+        response = client.get("/avatarforge-controller/generations/gen-123?wait=30")
+
+        assert response.json() == {"status": "completed"}
+        assert mock_read.call_count == 2
+
+    @patch('avatarforge.controllers.avatarforge_controller._read_generation')
+    def test_get_generation_wait_timeout(self, mock_read, client):
+        """Test long polls return the current state when nothing changes"""
+        mock_read.return_value = ("processing", JSONResponse({"status": "processing"}))
+
+        response = client.get("/avatarforge-controller/generations/gen-123?wait=1")
+
+        assert response.json() == {"status": "processing"}
+        assert mock_read.call_count == 1
+
+    @patch('avatarforge.controllers.avatarforge_controller._read_generation')
+    def test_get_generation_wait_same_status_keeps_deadline(self, mock_read, client):
+        """Test same-status events don't extend a long poll past its wait"""
+        stop = threading.Event()
+
+        def keep_publishing(generation_id):
+            while not stop.wait(0.2):
+                event_bus.publish({"generation_id": generation_id, "user_id": None, "status": "processing"})
+
+        def read(request, generation_id, include_workflow, fields, primary=False):
+            threading.Thread(target=keep_publishing, args=(generation_id,), daemon=True).start()
+            return "processing", JSONResponse({"status": "processing"})
+
+        mock_read.side_effect = read
+
+        started = time.monotonic()
+        try:
+            response = client.get("/avatarforge-controller/generations/gen-123?wait=1")
+        finally:
+            stop.set()
+
+        assert response.json() == {"status": "processing"}
+        assert time.monotonic() - started < 2
+
+    @patch('avatarforge.controllers.avatarforge_controller._read_generation')
+    def test_get_generation_wait_deleted(self, mock_read, client):
+        """Test long polls return 404 when the generation is deleted while waiting"""
+        def read(request, generation_id, include_workflow, fields, primary=False):
+            event_bus.publish({"generation_id": generation_id, "user_id": None, "status": "deleted"})
+            return "queued", JSONResponse({"status": "queued"})
+
+        mock_read.side_effect = read
+
+        response = client.get("/avatarforge-controller/generations/gen-123?wait=30")
+
+        assert response.status_code == 404
+
+    def test_get_generation_wait_limit(self, client):
+        """Test wait is capped"""
+        response = client.get("/avatarforge-controller/generations/gen-123?wait=600")
+
+        assert response.status_code == 422
+
+    @patch('avatarforge.services.generation_service.GenerationService.count_generations')
     @patch('avatarforge.services.generation_service.GenerationService.list_generations')
-    def test_list_generations(self, mock_list, client, override_get_db, mock_db_session):
+    def test_list_generations(self, mock_list, mock_count, client, override_get_db, mock_db_session):
         """Test GET /generations"""
         mock_gens = [Mock(), Mock()]
         for i, gen in enumerate(mock_gens):
@@ -315,7 +532,7 @@ class TestGenerationManagementEndpoints:
             gen.output_files = None
 
         mock_list.return_value = mock_gens
-        mock_db_session.query.return_value.count.return_value = 2
+        mock_count.return_value = 2
 
         response = client.get("/avatarforge-controller/generations?limit=10&offset=0")
 
@@ -323,9 +540,275 @@ class TestGenerationManagementEndpoints:
         data = response.json()
         assert data["total"] == 2
         assert len(data["generations"]) == 2
+        assert data["next_cursor"] is None
+
+    @patch('avatarforge.services.generation_service.GenerationService.count_generations')
+    @patch('avatarforge.services.generation_service.GenerationService.list_generations')
+    def test_list_generations_cursor_without_total(self, mock_list, mock_count, client, override_get_db):
+        """Test GET /generations returns next_cursor for a full page and skips counting"""
+        gen = Mock()
+        gen.generation_id = "gen-9"
+        gen.status = "completed"
+        gen.created_at = datetime(2025, 1, 1)
+        gen.started_at = None
+        gen.completed_at = None
+        gen.error_message = None
+        gen.comfyui_prompt_id = None
+        gen.output_files = None
+        mock_list.return_value = [gen]
+
+        response = client.get("/avatarforge-controller/generations?limit=1&include_total=false")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["next_cursor"]
+        mock_count.assert_not_called()
+
+        client.get(f"/avatarforge-controller/generations?limit=1&cursor={data['next_cursor']}")
+        assert mock_list.call_args.kwargs["cursor"] == data["next_cursor"]
+
+    @patch('avatarforge.services.generation_service.GenerationService.count_generations')
+    @patch('avatarforge.services.generation_service.GenerationService.list_generations')
+    def test_list_generations_fast_json_matches_models(self, mock_list, mock_count, client, override_get_db, monkeypatch):
+        """Test FAST_JSON_RESPONSES returns the same JSON as the response models"""
+        gen = Mock()
+        gen.generation_id = "gen-1"
+        gen.status = "completed"
+        gen.created_at = datetime(2025, 1, 1, 12, 0, 0, 123000)
+        gen.started_at = datetime(2025, 1, 1, 12, 0, 1)
+        gen.completed_at = None
+        gen.error_message = None
+        gen.comfyui_prompt_id = "comfy-1"
+        gen.output_files = [{"filename": "front.png", "url": "/files/f1", "size": 10, "file_id": "f1"}]
+        mock_list.return_value = [gen]
+        mock_count.return_value = 1
+
+        model_response = client.get("/avatarforge-controller/generations")
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        fast_response = client.get("/avatarforge-controller/generations")
+
+        assert fast_response.status_code == 200
+        assert fast_response.json() == model_response.json()
+        assert fast_response.json()["generations"][0]["output_files"][0]["pose_type"] is None
+        assert "file_id" not in fast_response.json()["generations"][0]["output_files"][0]
+
+    @patch('avatarforge.services.generation_service.GenerationService.bulk_delete_generations')
+    def test_bulk_delete_generations(self,mock_bulk, client, override_get_db):
+        """Test POST /generations/bulk-delete"""
+        mock_bulk.return_value = 42
+
+        response = client.post(
+            "/avatarforge-controller/generations/bulk-delete",
+            json={"status": "failed", "user_id": "tester"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["deleted"] == 42
+        kwargs = mock_bulk.call_args.kwargs
+        assert kwargs["status"] == "failed"
+        assert kwargs["user_id"] == "tester"
+
+    def test_bulk_delete_requires_filter(self, client, override_get_db):
+        """Test POST /generations/bulk-delete without filters is rejected"""
+        response = client.post("/avatarforge-controller/generations/bulk-delete", json={})
+
+        assert response.status_code == 400
+
+    @patch('avatarforge.services.generation_service.GenerationService.get_generation_stats')
+    def test_get_generation_stats(self, mock_stats, client, override_get_db):
+        """Test GET /generations/stats"""
+        mock_stats.return_value = {"completed": 7, "failed": 2}
+
+        response = client.get("/avatarforge-controller/generations/stats?user_id=user-1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 9
+        assert data["by_status"] == {"completed": 7, "failed": 2}
+        mock_stats.assert_called_once_with("user-1")
+
+    @patch('avatarforge.services.generation_service.GenerationService.search_generations')
+    def test_search_generations(self, mock_search, client, override_get_db):
+        """Test GET /generations/search"""
+        gen = Mock()
+        gen.generation_id = "gen-1"
+        gen.prompt = "elf archer"
+        gen.clothing = "cloak"
+        gen.style = "anime"
+        gen.status = "completed"
+        gen.user_id = "user-1"
+        gen.created_at = None
+        mock_search.return_value = [(gen, 3.5)]
+
+        response = client.get(
+            "/avatarforge-controller/generations/search?q=archer&status=completed&user_id=user-1"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["query"] == "archer"
+        assert data["results"][0]["generation_id"] == "gen-1"
+        assert data["results"][0]["score"] == 3.5
+        assert mock_search.call_args.kwargs["status"] == "completed"
+        assert mock_search.call_args.kwargs["user_id"] == "user-1"
+
+    def test_search_generations_requires_query(self, client, override_get_db):
+        """Test GET /generations/search without q"""
+        response = client.get("/avatarforge-controller/generations/search")
+
+        assert response.status_code == 422
+
+    @patch('avatarforge.controllers.avatarforge_controller.GenerationExporter.stream')
+    def test_export_generations(self, mock_stream, client):
+        """Test GET /generations/export streams the exporter output"""
+        mock_stream.return_value = iter([b"a,b\n", b"1,2\n"])
+
+        response = client.get("/avatarforge-controller/generations/export?format=csv&status=completed")
+
+        assert response.status_code == 200
+        assert response.content == b"a,b\n1,2\n"
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="generations.csv"' in response.headers["content-disposition"]
+        assert mock_stream.call_args.kwargs["status"] == "completed"
+
+    def test_export_generations_invalid_format(self, client):
+        """Test GET /generations/export rejects unknown formats"""
+        response = client.get("/avatarforge-controller/generations/export?format=xml")
+
+        assert response.status_code == 422
+
+    @patch('avatarforge.controllers.avatarforge_controller.OutputArchiver.stream')
+    def test_download_generation_outputs(self, mock_stream, client):
+        """Test GET /generations/outputs.zip streams the archive"""
+        mock_stream.return_value = iter([b"PK", b"data"])
+
+        response = client.get(
+            "/avatarforge-controller/generations/outputs.zip?generation_id=a&generation_id=b&limit=5"
+        )
+
+        assert response.status_code == 200
+        assert response.content == b"PKdata"
+        assert response.headers["content-type"] == "application/zip"
+        assert mock_stream.call_args.kwargs["generation_ids"] == ["a", "b"]
+        assert mock_stream.call_args.kwargs["limit"] == 5
+
+    @patch('avatarforge.controllers.avatarforge_controller._generation_snapshots')
+    def test_stream_generation_status_until_completed(self, mock_snapshots, client):
+        """Test GET /generations/{id}/events sends the current state, then changes"""
+        def snapshot(generation_ids):
+            # A change that lands while the stream starts is still delivered
+            event_bus.publish({"generation_id": "gen-1", "user_id": None, "status": "completed"})
+            return [{"generation_id": "gen-1", "user_id": None, "status": "processing"}]
+
+        mock_snapshots.side_effect = snapshot
+
+        with client.stream("GET", "/avatarforge-controller/generations/gen-1/events") as response:
+            body = "".join(response.iter_text())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        statuses = [json.loads(line[6:])["status"] for line in body.splitlines() if line.startswith("data: ")]
+        assert statuses == ["processing", "completed"]
+
+    @patch('avatarforge.controllers.avatarforge_controller._generation_snapshots')
+    def test_stream_generation_status_already_finished(self, mock_snapshots, client):
+        """Test streams for finished generations close after the current state"""
+        mock_snapshots.return_value = [{"generation_id": "gen-1", "user_id": None, "status": "failed"}]
+
+        response = client.get("/avatarforge-controller/generations/events?generation_id=gen-1")
+
+        assert response.status_code == 200
+        assert response.text.startswith("event: status\ndata: ")
+
+    @patch('avatarforge.controllers.avatarforge_controller._generation_snapshots')
+    def test_stream_generation_status_not_found(self, mock_snapshots, client):
+        """Test streaming an unknown generation returns 404"""
+        mock_snapshots.return_value = []
+
+        response = client.get("/avatarforge-controller/generations/missing/events")
+
+        assert response.status_code == 404
+
+    def test_stream_generation_events_requires_filter(self, client):
+        """Test GET /generations/events needs generation_id or user_id"""
+        response = client.get("/avatarforge-controller/generations/events")
+
+        assert response.status_code == 400
+
+    @patch('avatarforge.controllers.avatarforge_controller.get_relay')
+    @patch('avatarforge.controllers.avatarforge_controller._generation_snapshots')
+    def test_generation_progress_websocket(self, mock_snapshots, mock_get_relay, client):
+        """Test the progress WebSocket relays ComfyUI progress until completion"""
+        mock_snapshots.return_value = [{
+            "generation_id": "gen-1", "user_id": None, "status": "processing", "comfyui_prompt_id": "prompt-1"
+        }]
+
+        def subscribe(prompt_id, previews=False):
+            subscription = ProgressSubscription(prompt_id, previews, queue_size=10)
+            subscription.deliver({"type": "progress", "value": 5, "max": 20, "percent": 25.0, "eta_seconds": 3.0})
+            return subscription
+
+        mock_get_relay.return_value.subscribe.side_effect = subscribe
+
+        with client.websocket_connect("/avatarforge-controller/generations/gen-1/progress") as websocket:
+            assert websocket.receive_json()["status"] == "processing"
+            progress = websocket.receive_json()
+            assert progress == {
+                "generation_id": "gen-1", "type": "progress", "value": 5, "max": 20,
+                "percent": 25.0, "eta_seconds": 3.0
+            }
+
+            event_bus.publish({"generation_id": "gen-1", "user_id": None, "status": "completed"})
+            assert websocket.receive_json()["status"] == "completed"
+
+        mock_get_relay.return_value.subscribe.assert_called_once_with("prompt-1", previews=False)
+        mock_get_relay.return_value.unsubscribe.assert_called_once()
+
+    @patch('avatarforge.controllers.avatarforge_controller._generation_snapshots')
+    def test_generation_progress_websocket_not_found(self, mock_snapshots, client):
+        """Test the progress WebSocket closes with 4404 for unknown generations"""
+        mock_snapshots.return_value = []
+
+        with client.websocket_connect("/avatarforge-controller/generations/missing/progress") as websocket:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                websocket.receive_json()
+
+        assert exc_info.value.code == 4404
+
+    @patch('avatarforge.services.webhook_service.WebhookService.list_deliveries')
+    def test_list_generation_webhooks(self, mock_list, client, override_get_db):
+        """Test GET /generations/{id}/webhooks"""
+        mock_list.return_value = [Mock(
+            delivery_id="delivery-1",
+            url="https://example.com/hook",
+            status="failed",
+            attempts=8,
+            next_attempt_at=None,
+            last_error="HTTP 503",
+            created_at=datetime(2025, 1, 1),
+            delivered_at=None
+        )]
+
+        response = client.get("/avatarforge-controller/generations/gen-123/webhooks")
+
+        assert response.status_code == 200
+        assert response.json()[0]["status"] == "failed"
+        assert response.json()[0]["last_error"] == "HTTP 503"
+
+    @patch('avatarforge.services.generation_service.GenerationService.get_generation')
+    @patch('avatarforge.services.webhook_service.WebhookService.list_deliveries')
+    def test_list_generation_webhooks_not_found(self, mock_list, mock_get, client, override_get_db):
+        """Test GET /generations/{id}/webhooks for an unknown generation"""
+        mock_list.return_value = []
+        mock_get.return_value = None
+
+        response = client.get("/avatarforge-controller/generations/missing/webhooks")
+
+        assert response.status_code == 404
 
     @patch('avatarforge.services.generation_service.GenerationService.delete_generation')
-    def test_delete_generation(self, mock_delete, client, override_get_db):
+    def test_delete_generation(self,mock_delete, client, override_get_db):
         """Test DELETE /generations/{id}"""
         mock_delete.return_value = True
 
@@ -373,3 +856,40 @@ class TestUtilityEndpoints:
         assert "back" in pose_names
         assert "side" in pose_names
         assert "quarter" in pose_names
+
+
+class TestMaintenanceEndpoints:
+    """Tests for maintenance endpoints"""
+
+    def test_enforce_storage_budget(self, client, override_get_db):
+        """Test POST /cleanup/storage-budget"""
+        with patch('avatarforge.services.file_service.FileService.enforce_storage_budget',
+                   return_value=(3, 3000)) as mock_enforce:
+            response = client.post("/avatarforge-controller/cleanup/storage-budget?budget_bytes=1000")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["files_evicted"] == 3
+        assert data["bytes_freed"] == 3000
+        mock_enforce.assert_called_once_with(1000)
+
+    def test_enforce_storage_budget_not_configured(self, client, override_get_db):
+        """Test POST /cleanup/storage-budget without a budget"""
+        response = client.post("/avatarforge-controller/cleanup/storage-budget")
+
+        assert response.status_code == 400
+
+
+def test_database_endpoints_run_in_threadpool():
+    """Endpoints using the sync session must not run on the event loop"""
+    import inspect
+    from fastapi.routing import APIRoute
+    from avatarforge.controllers.avatarforge_controller import router
+    from avatarforge.database.session import get_read_db
+
+    for route in router.routes:
+        if not isinstance(route, APIRoute) or route.path.startswith("/upload/"):
+            continue
+        uses_db = any(dep.call in (get_db, get_read_db) for dep in route.dependant.dependencies)
+        if uses_db:
+            assert not inspect.iscoroutinefunction(route.endpoint), route.path
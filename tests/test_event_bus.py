@@ -0,0 +1,94 @@
+"""Unit tests for the in-process generation event bus"""
+import asyncio
+import threading
+import pytest
+
+from avatarforge.services.event_bus import GenerationEventBus, event_bus
+from avatarforge.services.generation_service import GenerationService
+
+
+def event(generation_id, status="completed", user_id="alice"):
+    return {"generation_id": generation_id, "user_id": user_id, "status": status}
+
+
+class TestGenerationEventBus:
+    """Tests for GenerationEventBus"""
+
+    @pytest.mark.asyncio
+    async def test_filters_by_generation_and_user(self):
+        """Test subscribers only receive matching events"""
+        bus = GenerationEventBus()
+        by_id = bus.subscribe(generation_ids=["gen-1"])
+        by_user = bus.subscribe(user_id="bob")
+
+        bus.publish(event("gen-1"))
+        bus.publish(event("gen-2", user_id="bob"))
+        await asyncio.sleep(0)
+
+        assert (await by_id.get(timeout=1))["generation_id"] == "gen-1"
+        assert await by_id.get(timeout=0.01) is None
+        assert (await by_user.get(timeout=1))["generation_id"] == "gen-2"
+        assert await by_user.get(timeout=0.01) is None
+
+    @pytest.mark.asyncio
+    async def test_publish_from_another_thread(self):
+        """Test events published from worker threads reach the loop"""
+        bus = GenerationEventBus()
+        with bus.subscribe(generation_ids=["gen-1"]) as subscription:
+            thread = threading.Thread(target=bus.publish, args=(event("gen-1", "processing"),))
+            thread.start()
+            thread.join()
+
+            received = await subscription.get(timeout=1)
+
+        assert received["status"] == "processing"
+        assert received["sequence"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest(self):
+        """Test a slow subscriber keeps only the newest events"""
+        bus = GenerationEventBus(queue_size=2)
+        subscription = bus.subscribe()
+
+        for status in ("queued", "processing", "completed"):
+            bus.publish(event("gen-1", status))
+        await asyncio.sleep(0)
+
+        assert [(await subscription.get(timeout=1))["status"] for _ in range(2)] == ["processing", "completed"]
+        assert subscription.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_close_unsubscribes(self):
+        """Test closed subscriptions stop receiving events"""
+        bus = GenerationEventBus()
+        with bus.subscribe():
+            assert len(bus) == 1
+        assert len(bus) == 0
+
+        bus.publish(event("gen-1"))  # no subscribers: a no-op
+
+
+class TestGenerationServiceEvents:
+    """Tests that GenerationService publishes committed status changes"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService on a temporary database"""
+        return GenerationService(db_session)
+
+    @pytest.mark.asyncio
+    async def test_status_changes_published(self, gen_service):
+        """Test create, status update and delete each publish an event"""
+        with event_bus.subscribe(user_id="alice") as subscription:
+            gen = gen_service.create_generation(prompt="elf", user_id="alice")
+            gen_service.update_generation_status(
+                gen.generation_id, "completed", output_files=[{"filename": "a.png", "url": "/files/a"}]
+            )
+            gen_service.delete_generation(gen.generation_id)
+            await asyncio.sleep(0)
+
+            events = [await subscription.get(timeout=1) for _ in range(3)]
+
+        assert [e["status"] for e in events] == ["queued", "completed", "deleted"]
+        assert events[1]["output_files"][0]["url"] == "/files/a"
+        assert events[0]["sequence"] < events[1]["sequence"] < events[2]["sequence"]
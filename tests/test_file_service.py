@@ -1,5 +1,6 @@
 """Unit tests for FileService"""
 import pytest
+import base64
 import hashlib
 import io
 from pathlib import Path
@@ -10,6 +11,7 @@ from PIL import Image
 
 from avatarforge.services.file_service import FileService
 from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.image_hash import dhash, hash_to_hex, hex_to_hash, perceptual_index
 
 
 @pytest.fixture
@@ -36,6 +38,14 @@ def file_service(mock_db, tmp_path):
     return service
 
 
+@pytest.fixture(autouse=True)
+def empty_perceptual_index():
+    """Start each test with an empty perceptual hash index"""
+    perceptual_index.rebuild([])
+    yield
+    perceptual_index.rebuild([])
+
+
 @pytest.fixture
 def sample_image():
     """Create a sample image in memory"""
@@ -117,6 +127,105 @@ class TestFileService:
         # Verify last_accessed was updated
         mock_db.commit.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_upload_file_indexes_perceptual_hash(self, file_service, mock_db, mock_upload_file):
+        """Test that new uploads are added to the perceptual hash index"""
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+
+        result = await file_service.upload_file(mock_upload_file, file_type="pose_image")
+
+        assert len(result.perceptual_hash) == 16
+        assert (0, result.file_id) in perceptual_index.search(hex_to_hash(result.perceptual_hash), 0)
+
+    @pytest.mark.asyncio
+    async def test_upload_file_reuse_similar(self, file_service, mock_db, mock_upload_file, sample_image):
+        """Test that reuse_similar returns a near-duplicate instead of storing a copy"""
+        similar_file = UploadedFile(
+            file_id="similar-id",
+            filename="similar.jpg",
+            content_hash="other-hash",
+            perceptual_hash=hash_to_hex(dhash(Image.open(io.BytesIO(sample_image)))),
+            file_type="pose_image",
+            mime_type="image/jpeg",
+            size=1000,
+            reference_count=0,
+            is_deleted=False
+        )
+        perceptual_index.add(hex_to_hash(similar_file.perceptual_hash), "similar-id")
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.query.return_value.filter.return_value.all.return_value = [similar_file]
+
+        result = await file_service.upload_file(mock_upload_file, reuse_similar=True)
+
+        assert result.file_id == "similar-id"
+        mock_db.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_file_pixel_duplicate(self, file_service, mock_db, mock_upload_file):
+        """Test that a file with identical pixels but different bytes is deduplicated"""
+        pixel_duplicate = Mock(spec=UploadedFile)
+        pixel_duplicate.file_id = "pixel-duplicate-id"
+        # First lookup (content hash) misses, second (pixel hash) hits
+        mock_db.query.return_value.filter.return_value.first.side_effect = [None, pixel_duplicate]
+
+        with patch('avatarforge.services.file_service.settings.PIXEL_DEDUPE_ENABLED', True):
+            result = await file_service.upload_file(mock_upload_file, file_type="pose_image")
+
+        assert result.file_id == "pixel-duplicate-id"
+        mock_db.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_upload_file_strips_metadata(self, file_service, mock_db):
+        """Test that metadata is stripped from stored files when enabled"""
+        from PIL import PngImagePlugin
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Software", "exporter")
+        img_bytes = io.BytesIO()
+        Image.new('RGB', (128, 128), color='green').save(img_bytes, format='PNG', pnginfo=info)
+        content = img_bytes.getvalue()
+
+        upload = Mock(spec=UploadFile)
+        upload.filename = "annotated.png"
+        upload.content_type = "image/png"
+        upload.read = AsyncMock(return_value=content)
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+
+        with patch('avatarforge.services.file_service.settings.STRIP_IMAGE_METADATA', True):
+            result = await file_service.upload_file(upload, file_type="pose_image")
+
+        stored = (file_service.uploads_dir / result.storage_path).read_bytes()
+        assert b"tEXt" not in stored
+        assert result.size == len(stored)
+        assert result.content_hash == hashlib.sha256(stored).hexdigest()
+        assert result.content_hash != hashlib.sha256(content).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_upload_file_strips_before_dedupe(self, file_service, mock_db):
+        """Test that duplicate lookup uses the hash of the stripped content"""
+        from PIL import PngImagePlugin
+        from avatarforge.services.image_metadata import strip_metadata
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Software", "exporter")
+        img_bytes = io.BytesIO()
+        Image.new('RGB', (128, 128), color='green').save(img_bytes, format='PNG', pnginfo=info)
+        content = img_bytes.getvalue()
+        stored_hash = hashlib.sha256(strip_metadata(content, "image/png")).hexdigest()
+
+        upload = Mock(spec=UploadFile)
+        upload.filename = "annotated.png"
+        upload.content_type = "image/png"
+        upload.read = AsyncMock(return_value=content)
+        existing = UploadedFile(file_id="existing-id", content_hash=stored_hash, reference_count=0)
+        mock_db.query.return_value.filter.return_value.first.return_value = existing
+
+        with patch('avatarforge.services.file_service.settings.STRIP_IMAGE_METADATA', True):
+            result = await file_service.upload_file(upload, file_type="pose_image")
+
+        assert result is existing
+        lookup = mock_db.query.return_value.filter.call_args_list[0].args[0]
+        assert lookup.right.value == stored_hash
+        mock_db.add.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_upload_file_invalid_type(self, file_service, mock_db):
         """Test uploading invalid file type raises error"""
@@ -274,3 +383,78 @@ class TestFileService:
         result = file_service.calculate_file_hash(test_file)
 
         assert result == expected_hash
+
+
+class TestBase64Ingestion:
+    """Tests for legacy base64 image ingestion"""
+
+    def test_decode_data_url(self, file_service, sample_image):
+        """Test decoding a data URL"""
+        data = "data:image/png;base64," + base64.b64encode(sample_image).decode()
+
+        content, mime_type, content_hash = file_service.decode_base64_image(data)
+
+        assert content == sample_image
+        assert mime_type == "image/png"
+        assert content_hash == hashlib.sha256(sample_image).hexdigest()
+
+    def test_decode_bare_base64_across_chunks(self, file_service, sample_image):
+        """Test decoding line-wrapped base64 larger than one chunk"""
+        file_service.BASE64_CHUNK_SIZE = 64
+        data = base64.encodebytes(sample_image).decode()
+
+        content, mime_type, _ = file_service.decode_base64_image(data)
+
+        assert content == sample_image
+        assert mime_type == "image/png"
+
+    def test_decode_ignores_urls_and_paths(self, file_service):
+        """Test that URLs and file paths are not treated as inline data"""
+        assert file_service.decode_base64_image("https://example.com/pose.png") is None
+        assert file_service.decode_base64_image("/tmp/poses/front.png") is None
+        assert file_service.decode_base64_image("poses/front") is None
+
+    def test_decode_invalid_data_url(self, file_service):
+        """Test that malformed data URLs are rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            file_service.decode_base64_image("data:image/png;base64,iVBORw0KGgo$$$$")
+        assert exc_info.value.status_code == 400
+
+    def test_decode_unsupported_type(self, file_service):
+        """Test that unsupported data URL types are rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            file_service.decode_base64_image("data:image/gif;base64,R0lGODlh")
+        assert exc_info.value.status_code == 400
+        assert "Invalid file type" in exc_info.value.detail
+
+    def test_ingest_stores_file(self, file_service, mock_db, sample_image):
+        """Test that ingested images are stored like uploads"""
+        mock_db.query.return_value.filter.return_value.first.return_value = None
+        data = "data:image/png;base64," + base64.b64encode(sample_image).decode()
+
+        result = file_service.ingest_base64_image(data, file_type="reference_image")
+
+        content_hash = hashlib.sha256(sample_image).hexdigest()
+        assert result.content_hash == content_hash
+        assert result.file_type == "reference_image"
+        assert result.mime_type == "image/png"
+        assert (file_service.uploads_dir / result.storage_path).read_bytes() == sample_image
+
+    def test_ingest_deduplicates(self, file_service, mock_db, sample_image):
+        """Test that ingesting an already stored image reuses it"""
+        existing = UploadedFile(
+            file_id="existing-id",
+            filename="test.png",
+            content_hash=hashlib.sha256(sample_image).hexdigest(),
+            file_type="pose_image",
+            mime_type="image/png",
+            size=len(sample_image),
+            storage_path="test.png",
+            reference_count=0
+        )
+        mock_db.query.return_value.filter.return_value.first.return_value = existing
+
+        result = file_service.ingest_base64_image(base64.b64encode(sample_image).decode())
+
+        assert result is existing
+        mock_db.add.assert_not_called()
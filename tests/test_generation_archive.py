@@ -0,0 +1,74 @@
+"""Unit tests for archiving old generations"""
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from avatarforge.models.generation import Generation
+from avatarforge.models.archived_generation import ArchivedGeneration
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestGenerationArchive:
+    """Tests for archive_generations and archive read-back"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService with old and recent generations"""
+        service = GenerationService(db_session)
+        now = datetime.now(timezone.utc)
+        db_session.add(UploadedFile(
+            file_id="pose-1", filename="pose.png", content_hash="hash-1", file_type="pose_image",
+            mime_type="image/png", size=10, storage_path="pose.png", reference_count=1
+        ))
+        rows = [
+            ("old-done", "completed", now - timedelta(days=40)),
+            ("old-failed", "failed", now - timedelta(days=35)),
+            ("new-done", "completed", now - timedelta(days=1)),
+            ("old-queued", "queued", None),
+        ]
+        for generation_id, status, completed_at in rows:
+            db_session.add(Generation(
+                generation_id=generation_id,
+                prompt=f"prompt {generation_id}",
+                status=status,
+                user_id="user-1",
+                pose_file_id="pose-1" if generation_id == "old-done" else None,
+                workflow_hash=service.workflow_store.save({"id": generation_id}),
+                output_files=[{"filename": f"{generation_id}.png"}],
+                created_at=now - timedelta(days=45),
+                completed_at=completed_at
+            ))
+        db_session.commit()
+        service.rebuild_generation_counters()
+        return service
+
+    def test_archives_only_old_terminal_generations(self, gen_service, db_session):
+        """Test which generations are moved"""
+        assert gen_service.archive_generations(days=30, batch_size=1) == 2
+
+        remaining = {g.generation_id for g in db_session.query(Generation)}
+        assert remaining == {"new-done", "old-queued"}
+        assert db_session.query(ArchivedGeneration).count() == 2
+        assert gen_service.get_generation_stats() == {"completed": 1, "queued": 1}
+
+    def test_get_generation_falls_back_to_archive(self, gen_service):
+        """Test that archived generations are still readable"""
+        gen_service.archive_generations(days=30)
+
+        generation = gen_service.get_generation("old-done")
+
+        assert generation.status == "completed"
+        assert generation.prompt == "prompt old-done"
+        assert generation.output_files == [{"filename": "old-done.png"}]
+        assert generation.completed_at is not None
+        assert gen_service.get_workflow(generation) == {"id": "old-done"}
+        assert gen_service.get_generation("old-done", include_archived=False) is None
+
+    def test_delete_archived_generation(self, gen_service, db_session):
+        """Test that deleting an archived generation releases its file references"""
+        gen_service.archive_generations(days=30)
+
+        assert gen_service.delete_generation("old-done") is True
+
+        assert db_session.query(ArchivedGeneration).count() == 1
+        assert db_session.get(UploadedFile, "pose-1").reference_count == 0
@@ -0,0 +1,59 @@
+"""Unit tests for maintained generation counters"""
+import pytest
+
+from avatarforge.models.generation import Generation
+from avatarforge.models.generation_counter import GenerationCounter
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestGenerationCounters:
+    """Tests for counters maintained on insert, transition and delete"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService on the temporary database"""
+        return GenerationService(db_session)
+
+    def test_counts_follow_lifecycle(self, gen_service):
+        """Test counters across create, status changes and delete"""
+        first = gen_service.create_generation(prompt="first", user_id="user-1")
+        second = gen_service.create_generation(prompt="second", user_id="user-2")
+        gen_service.create_generation(prompt="anonymous")
+
+        assert gen_service.get_generation_stats() == {"queued": 3}
+
+        gen_service.update_generation_status(first.generation_id, "processing")
+        gen_service.update_generation_status(first.generation_id, "completed")
+        gen_service.update_generation_status(second.generation_id, "failed")
+
+        assert gen_service.get_generation_stats() == {"queued": 1, "completed": 1, "failed": 1}
+        assert gen_service.get_generation_stats("user-1") == {"completed": 1}
+        assert gen_service.count_generations() == 3
+        assert gen_service.count_generations("failed", user_id="user-2") == 1
+
+        gen_service.delete_generation(second.generation_id)
+
+        assert gen_service.count_generations() == 2
+        assert gen_service.get_generation_stats("user-2") == {}
+
+    def test_repeated_status_update_not_double_counted(self, gen_service):
+        """Test that setting the same status twice leaves counts unchanged"""
+        gen = gen_service.create_generation(prompt="test")
+        gen_service.update_generation_status(gen.generation_id, "completed")
+        gen_service.update_generation_status(gen.generation_id, "completed")
+
+        assert gen_service.get_generation_stats() == {"completed": 1}
+
+    def test_rebuild_backfills_existing_rows(self, gen_service, db_session):
+        """Test that counters can be rebuilt for pre-existing generations"""
+        for i, status in enumerate(["completed", "completed", "failed"]):
+            db_session.add(Generation(generation_id=f"gen-{i}", prompt="p", status=status, user_id="user-1"))
+        db_session.commit()
+
+        assert not gen_service.counters_initialized()
+        gen_service.rebuild_generation_counters()
+
+        assert gen_service.counters_initialized()
+        assert gen_service.get_generation_stats() == {"completed": 2, "failed": 1}
+        assert gen_service.count_generations(user_id="user-1") == 3
+        assert db_session.query(GenerationCounter).count() == 4
@@ -0,0 +1,119 @@
+"""Unit tests for streaming generation export"""
+import csv
+import gzip
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from avatarforge.models.generation import Generation
+from avatarforge.services.generation_service import GenerationService
+from avatarforge.services.generation_export import EXPORT_COLUMNS, GenerationExporter
+
+
+class TestGenerationExporter:
+    """Tests for GenerationExporter"""
+
+    @pytest.fixture
+    def session_factory(self, session_factory):
+        """Temporary database with five generations"""
+        db = session_factory()
+        service = GenerationService(db)
+        base = datetime(2025, 1, 1)
+        for i in range(5):
+            gen = service.create_generation(prompt=f"prompt, {i}", user_id="alice" if i < 3 else "bob")
+            gen.created_at = base + timedelta(days=i)
+            gen.output_files = [{"filename": f"out_{i}.png"}]
+        db.commit()
+        db.close()
+
+        return session_factory
+
+    def export(self, exporter, **filters):
+        return b"".join(exporter.stream(**filters))
+
+    def test_ndjson_in_batches(self, session_factory):
+        """Test NDJSON export yields one chunk per batch, oldest first"""
+        exporter = GenerationExporter(session_factory, batch_size=2)
+
+        chunks = list(exporter.stream())
+        rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+        assert len(chunks) == 3
+        assert [row["prompt"] for row in rows] == [f"prompt, {i}" for i in range(5)]
+        assert rows[0]["output_files"] == [{"filename": "out_0.png"}]
+        assert rows[0]["created_at"].startswith("2025-01-01")
+        assert "workflow" not in rows[0]
+
+    def test_csv_with_filters(self, session_factory):
+        """Test CSV export has a header and honours filters"""
+        exporter = GenerationExporter(session_factory, format="csv", batch_size=2)
+
+        content = self.export(exporter, user_id="alice", created_after=datetime(2025, 1, 2))
+        rows = list(csv.reader(io.StringIO(content.decode())))
+
+        assert rows[0] == EXPORT_COLUMNS
+        assert [row[EXPORT_COLUMNS.index("prompt")] for row in rows[1:]] == ["prompt, 1", "prompt, 2"]
+        assert json.loads(rows[1][EXPORT_COLUMNS.index("output_files")]) == [{"filename": "out_1.png"}]
+
+    def test_includes_archived_generations(self, session_factory):
+        """Test archived generations are exported first and honour filters"""
+        db = session_factory()
+        service = GenerationService(db)
+        for generation in db.query(Generation).filter(Generation.user_id == "alice").all():
+            generation.status = "completed"
+            generation.completed_at = generation.created_at
+        db.commit()
+        assert service.archive_generations(days=1) == 3
+        db.close()
+
+        rows = [json.loads(line) for line in self.export(GenerationExporter(session_factory, batch_size=2)).splitlines()]
+        filtered = self.export(GenerationExporter(session_factory), user_id="alice", created_after=datetime(2025, 1, 2))
+
+        assert [row["prompt"] for row in rows] == [f"prompt, {i}" for i in range(5)]
+        assert rows[0]["status"] == "completed"
+        assert rows[0]["output_files"] == [{"filename": "out_0.png"}]
+        assert rows[0]["created_at"].startswith("2025-01-01")
+        assert [json.loads(line)["prompt"] for line in filtered.splitlines()] == ["prompt, 1", "prompt, 2"]
+
+    def test_csv_header_only_when_empty(self, session_factory):
+        """Test an empty CSV export still has its header"""
+        exporter = GenerationExporter(session_factory, format="csv")
+
+        content = self.export(exporter, status="failed")
+
+        assert content.decode().strip() == ",".join(EXPORT_COLUMNS)
+
+    def test_gzip(self, session_factory):
+        """Test compressed exports decompress to the plain export"""
+        plain = self.export(GenerationExporter(session_factory, batch_size=2))
+        compressed = self.export(GenerationExporter(session_factory, compress=True, batch_size=2))
+
+        assert gzip.decompress(compressed) == plain
+
+    def test_session_closed_after_export(self, session_factory):
+        """Test the export closes the session it opened"""
+        sessions = []
+
+        def factory():
+            sessions.append(session_factory())
+            return sessions[-1]
+
+        stream = GenerationExporter(factory).stream()
+        assert sessions == []  # nothing is read until the stream is consumed
+
+        list(stream)
+        assert len(sessions) == 1
+        assert not sessions[0].in_transaction()
+
+    def test_unknown_format(self, session_factory):
+        """Test unsupported formats are rejected"""
+        with pytest.raises(ValueError):
+            GenerationExporter(session_factory, format="xml")
+
+    def test_metadata(self, session_factory):
+        """Test media type and filename follow format and compression"""
+        assert GenerationExporter(session_factory, format="csv").media_type == "text/csv"
+        exporter = GenerationExporter(session_factory, compress=True)
+        assert exporter.media_type == "application/gzip"
+        assert exporter.filename == "generations.ndjson.gz"
@@ -0,0 +1,89 @@
+"""Unit tests for keyset pagination and projections of generations"""
+import pytest
+from datetime import datetime, timedelta
+
+from avatarforge.models.generation import Generation
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestGenerationPagination:
+    """Tests for cursor-based list_generations"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService with seeded generations"""
+        base = datetime(2025, 1, 1)
+        for i in range(7):
+            db_session.add(Generation(
+                generation_id=f"gen-{i}",
+                prompt="test prompt",
+                # gen-2/gen-3 share a timestamp to exercise the tie-breaker
+                created_at=base + timedelta(minutes=min(i, 2) if i < 4 else i),
+                status="completed" if i % 2 == 0 else "failed"
+            ))
+        db_session.commit()
+        return GenerationService(db_session)
+
+    def walk(self, gen_service, limit, status=None):
+        """Collect all IDs by following cursors page by page"""
+        ids, cursor = [], None
+        while True:
+            page = gen_service.list_generations(limit=limit, status=status, cursor=cursor)
+            ids.extend(g.generation_id for g in page)
+            if len(page) < limit:
+                return ids
+            cursor = gen_service.encode_cursor(page[-1])
+
+    def test_cursor_walk_matches_full_listing(self, gen_service):
+        """Test that paging by cursor visits every row once in order"""
+        expected = [g.generation_id for g in gen_service.list_generations(limit=100)]
+
+        assert self.walk(gen_service, limit=2) == expected
+        assert len(expected) == 7
+        # Ties on created_at are ordered by generation_id
+        assert expected.index("gen-3") < expected.index("gen-2")
+
+    def test_cursor_walk_with_status(self, gen_service):
+        """Test cursor paging combined with a status filter"""
+        ids = self.walk(gen_service, limit=1, status="completed")
+
+        assert ids == ["gen-6", "gen-4", "gen-2", "gen-0"]
+
+
+class TestGenerationProjections:
+    """Tests for deferred and column-projected generation loading"""
+
+    @pytest.fixture
+    def db_session(self, db_session):
+        """Temporary database session holding one generation"""
+        db_session.add(Generation(
+            generation_id="gen-1",
+            prompt="test prompt",
+            status="completed",
+            workflow={"1": {"class_type": "KSampler"}},
+            output_files=[{"filename": "out.png"}]
+        ))
+        db_session.commit()
+        db_session.expunge_all()
+        return db_session
+
+    def test_workflow_deferred_by_default(self, db_session):
+        """Test that the workflow column is not loaded with the row"""
+        gen = GenerationService(db_session).get_generation("gen-1")
+
+        assert "workflow" not in gen.__dict__
+        assert gen.workflow == {"1": {"class_type": "KSampler"}}
+
+    def test_include_workflow_loads_eagerly(self, db_session):
+        """Test that include_workflow loads the workflow with the row"""
+        gen = GenerationService(db_session).get_generation("gen-1", include_workflow=True)
+
+        assert gen.__dict__["workflow"] == {"1": {"class_type": "KSampler"}}
+
+    def test_columns_projection(self, db_session):
+        """Test that only the requested columns are loaded"""
+        gens = GenerationService(db_session).list_generations(columns=["generation_id", "status"])
+
+        assert gens[0].__dict__["status"] == "completed"
+        assert "output_files" not in gens[0].__dict__
+        assert "prompt" not in gens[0].__dict__
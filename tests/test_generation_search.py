@@ -0,0 +1,89 @@
+"""Unit tests for full-text generation search"""
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+
+from avatarforge.database.fulltext import FTS_TABLE, install_fulltext_index, fts5_query
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestSearchGenerations:
+    """Tests for search_generations on SQLite FTS5"""
+
+    @pytest.fixture
+    def gen_service(self, db_session):
+        """Create GenerationService with a few searchable generations"""
+        service = GenerationService(db_session)
+        base = datetime(2025, 1, 1)
+        rows = [
+            ("elf archer in a moonlit forest", "green cloak", "anime", "alice"),
+            ("dwarf warrior", "leather armor for archers", "realistic", "bob"),
+            ("knight on horseback", "plate armor", "fantasy", "alice"),
+            ("elf mage", "blue robes", "watercolor", "bob"),
+        ]
+        for i, (prompt, clothing, style, user_id) in enumerate(rows):
+            gen = service.create_generation(prompt=prompt, clothing=clothing, style=style, user_id=user_id)
+            gen.created_at = base + timedelta(days=i)
+        db_session.commit()
+        return service
+
+    def prompts(self, results):
+        return [gen.prompt for gen, _ in results]
+
+    def test_ranks_prompt_matches_first(self, gen_service):
+        """Test prompt matches outrank clothing matches and stemming applies"""
+        results = gen_service.search_generations("archer")
+
+        assert self.prompts(results) == ["elf archer in a moonlit forest", "dwarf warrior"]
+        assert results[0][1] > results[1][1]
+
+    def test_all_words_must_match(self, gen_service):
+        """Test multi-word queries match every word"""
+        assert self.prompts(gen_service.search_generations("elf mage")) == ["elf mage"]
+
+    def test_filters(self, gen_service):
+        """Test status, user and date filters combine with the match"""
+        gen_service.update_generation_status(
+            gen_service.search_generations("knight")[0][0].generation_id, "completed"
+        )
+
+        assert self.prompts(gen_service.search_generations("armor", user_id="alice")) == ["knight on horseback"]
+        assert self.prompts(gen_service.search_generations("armor", status="completed")) == ["knight on horseback"]
+        assert self.prompts(gen_service.search_generations(
+            "elf", created_after=datetime(2025, 1, 2)
+        )) == ["elf mage"]
+        assert self.prompts(gen_service.search_generations(
+            "elf", created_before=datetime(2025, 1, 2)
+        )) == ["elf archer in a moonlit forest"]
+
+    def test_index_follows_updates_and_deletes(self, gen_service, db_session):
+        """Test triggers keep the index in sync"""
+        knight = gen_service.search_generations("knight")[0][0]
+        knight.prompt = "knight archer"
+        db_session.commit()
+        assert "knight archer" in self.prompts(gen_service.search_generations("archer"))
+        assert gen_service.search_generations("horseback") == []
+
+        gen_service.delete_generation(knight.generation_id)
+        assert "knight archer" not in self.prompts(gen_service.search_generations("archer"))
+
+    def test_query_syntax_is_escaped(self, gen_service):
+        """Test FTS5 operators and quotes in user input are treated as words"""
+        assert gen_service.search_generations('elf" OR (') == []
+        assert fts5_query('say "hi"') == '"say" """hi"""'
+
+    def test_empty_query_rejected(self, gen_service):
+        """Test a blank query raises 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            gen_service.search_generations("   ")
+        assert exc_info.value.status_code == 400
+
+    def test_install_indexes_existing_rows(self, gen_service, db_session):
+        """Test installing on an existing database indexes its rows"""
+        connection = db_session.connection()
+        connection.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+        install_fulltext_index(None, connection)
+        install_fulltext_index(None, connection)  # idempotent
+        db_session.commit()
+
+        assert self.prompts(gen_service.search_generations("mage")) == ["elf mage"]
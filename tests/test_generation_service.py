@@ -3,7 +3,10 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from fastapi import HTTPException
 import requests
+from datetime import datetime
 
+from avatarforge.core.config import settings
+from avatarforge.services.comfyui_relay import get_relay
 from avatarforge.services.generation_service import GenerationService
 from avatarforge.models.generation import Generation
 from avatarforge.models.uploaded_file import UploadedFile
@@ -156,6 +159,25 @@ class TestGenerationService:
         assert result.status == "processing"
         mock_post.assert_called_once()
 
+    @patch('avatarforge.services.generation_service.requests.post')
+    def test_execute_generation_uses_configured_relay(self, mock_post, mock_db):
+        """Test services built without a URL queue prompts on the WebSocket's relay"""
+        mock_gen = Mock(spec=Generation)
+        mock_gen.generation_id = "gen-123"
+        mock_gen.status = "queued"
+        mock_db.query.return_value.filter.return_value.first.return_value = mock_gen
+        mock_post.return_value = Mock(json=Mock(return_value={"prompt_id": "comfy-123"}))
+
+        with patch.object(settings, "COMFYUI_URL", "http://comfyui.internal:8188"):
+            service = GenerationService(mock_db)
+            with patch.object(GenerationService, "build_workflow_for_generation", return_value={"prompt": {}}):
+                service.execute_generation("gen-123")
+
+            relay = get_relay(settings.COMFYUI_URL)
+
+        assert mock_post.call_args.args[0] == "http://comfyui.internal:8188/prompt"
+        assert mock_post.call_args.kwargs["json"]["client_id"] == relay.client_id
+
     @patch('avatarforge.services.generation_service.requests.post')
     def test_execute_generation_comfyui_error(self, mock_post, generation_service, mock_db):
         """Test generation execution with ComfyUI error"""
@@ -220,6 +242,20 @@ class TestGenerationService:
 
         assert len(result) == 3
 
+    def test_cursor_round_trip(self, generation_service):
+        """Test encoding and decoding a pagination cursor"""
+        gen = Generation(generation_id="gen-123", created_at=datetime(2025, 1, 1, 12, 30, 0, 123456))
+
+        cursor = generation_service.encode_cursor(gen)
+
+        assert generation_service.decode_cursor(cursor) == (gen.created_at, "gen-123")
+
+    def test_decode_invalid_cursor(self, generation_service):
+        """Test that malformed cursors are rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            generation_service.decode_cursor("not-a-cursor")
+        assert exc_info.value.status_code == 400
+
     def test_list_generations_with_status_filter(self, generation_service, mock_db):
         """Test listing generations with status filter"""
         mock_gens = [Mock()]
@@ -243,6 +279,7 @@ class TestGenerationService:
         """Test updating generation status"""
         mock_gen = Mock(spec=Generation)
         mock_gen.status = "processing"
+        mock_gen.output_files = None
 
         mock_db.query.return_value.filter.return_value.first.return_value = mock_gen
 
@@ -261,14 +298,16 @@ class TestGenerationService:
         mock_gen = Mock(spec=Generation)
         mock_gen.pose_file_id = "pose-123"
         mock_gen.reference_file_id = "ref-456"
+        mock_gen.output_files = [{"filename": "out.png", "file_id": "out-789"}]
 
         mock_db.query.return_value.filter.return_value.first.return_value = mock_gen
 
-        with patch.object(generation_service.file_service, 'decrement_reference'):
+        with patch.object(generation_service.file_service, 'release_references') as mock_release:
             result = generation_service.delete_generation("gen-123")
 
         assert result == True
         mock_db.delete.assert_called_once()
+        mock_release.assert_called_once_with({"pose-123": 1, "ref-456": 1, "out-789": 1})
 
     def test_delete_generation_not_found(self, generation_service, mock_db):
         """Test deleting non-existent generation"""
@@ -0,0 +1,221 @@
+"""Unit tests for perceptual hashing and the near-duplicate index"""
+import io
+from datetime import datetime, timezone, timedelta
+from PIL import Image, ImageDraw, PngImagePlugin
+
+from avatarforge.services.image_hash import (
+    dhash,
+    pixel_hash,
+    hamming_distance,
+    hash_to_hex,
+    hex_to_hash,
+    PerceptualHashIndex,
+    perceptual_index
+)
+from avatarforge.models.uploaded_file import UploadedFile
+
+
+def make_image(size=(256, 256), fmt="PNG", quality=None):
+    """Create a test image with some structure and round-trip it through an encoder"""
+    img = Image.new("RGB", size, color="white")
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    draw.rectangle([w // 8, h // 8, w // 2, h // 2], fill="black")
+    draw.ellipse([w // 2, h // 3, w - w // 8, h - h // 8], fill="blue")
+    buf = io.BytesIO()
+    if quality:
+        img.save(buf, format=fmt, quality=quality)
+    else:
+        img.save(buf, format=fmt)
+    buf.seek(0)
+    return Image.open(buf)
+
+
+class TestDHash:
+    """Tests for the dHash function"""
+
+    def test_hash_is_64_bits(self):
+        """Test that the hash fits in 64 bits"""
+        value = dhash(make_image())
+        assert 0 <= value < 2 ** 64
+        assert len(hash_to_hex(value)) == 16
+
+    def test_hex_round_trip(self):
+        """Test hex formatting round trip"""
+        value = dhash(make_image())
+        assert hex_to_hash(hash_to_hex(value)) == value
+
+    def test_reencoded_and_resized_images_are_close(self):
+        """Test that JPEG re-encoding and resizing barely change the hash"""
+        original = dhash(make_image())
+        jpeg = dhash(make_image(fmt="JPEG", quality=60))
+        resized = dhash(make_image(size=(640, 640)))
+
+        assert hamming_distance(original, jpeg) <= 6
+        assert hamming_distance(original, resized) <= 6
+
+    def test_different_images_are_far(self):
+        """Test that unrelated images have distant hashes"""
+        img = Image.new("RGB", (256, 256), color="white")
+        draw = ImageDraw.Draw(img)
+        for x in range(0, 256, 32):
+            draw.rectangle([x, 0, x + 15, 255], fill="black")
+
+        assert hamming_distance(dhash(make_image()), dhash(img)) > 10
+
+
+class TestPixelHash:
+    """Tests for the canonical pixel hash"""
+
+    def test_metadata_and_compression_ignored(self):
+        """Test that PNGs with identical pixels hash identically"""
+        img = make_image()
+        info = PngImagePlugin.PngInfo()
+        info.add_text("Software", "exporter")
+
+        plain, annotated = io.BytesIO(), io.BytesIO()
+        img.save(plain, format="PNG", compress_level=1)
+        img.save(annotated, format="PNG", compress_level=9, pnginfo=info)
+
+        assert plain.getvalue() != annotated.getvalue()
+        assert pixel_hash(Image.open(plain)) == pixel_hash(Image.open(annotated))
+
+    def test_palette_and_rgb_encodings_match(self):
+        """Test that a palette PNG and its RGB equivalent hash identically"""
+        rgb = make_image().convert("RGB")
+        palette = rgb.convert("P", palette=Image.Palette.ADAPTIVE)
+
+        assert pixel_hash(palette) == pixel_hash(palette.convert("RGB"))
+
+    def test_different_pixels_differ(self):
+        """Test that a one-pixel change changes the hash"""
+        img = make_image().convert("RGB")
+        changed = img.copy()
+        changed.putpixel((0, 0), (1, 2, 3))
+
+        assert pixel_hash(img) != pixel_hash(changed)
+
+
+class TestPerceptualHashIndex:
+    """Tests for the BK-tree index"""
+
+    def test_search_finds_within_distance(self):
+        """Test that search returns only hashes within max distance, closest first"""
+        index = PerceptualHashIndex()
+        index.add(0b0000, "exact")
+        index.add(0b0001, "one-bit")
+        index.add(0b0111, "three-bits")
+        index.add(0b1111_1111, "eight-bits")
+
+        results = index.search(0b0000, max_distance=3)
+
+        assert results == [(0, "exact"), (1, "one-bit"), (3, "three-bits")]
+
+    def test_search_matches_brute_force(self):
+        """Test that BK-tree pruning never misses a match"""
+        import random
+        rng = random.Random(42)
+        index = PerceptualHashIndex()
+        values = {f"file-{i}": rng.getrandbits(64) for i in range(500)}
+        for file_id, value in values.items():
+            index.add(value, file_id)
+
+        query = rng.getrandbits(64)
+        expected = sorted(
+            (hamming_distance(query, value), file_id)
+            for file_id, value in values.items()
+            if hamming_distance(query, value) <= 24
+        )
+
+        assert index.search(query, max_distance=24) == expected
+
+    def test_discard_removes_file(self):
+        """Test that discarded files are no longer returned"""
+        index = PerceptualHashIndex()
+        index.add(42, "a")
+        index.add(42, "b")
+
+        index.discard("a")
+        index.discard("missing")
+
+        assert index.search(42, max_distance=0) == [(0, "b")]
+        assert len(index) == 1
+
+    def test_rebuild_replaces_contents(self):
+        """Test that rebuild drops previous entries"""
+        index = PerceptualHashIndex()
+        index.add(1, "old")
+
+        index.rebuild([(2, "new")])
+
+        assert index.search(1, max_distance=0) == []
+        assert index.search(2, max_distance=0) == [(0, "new")]
+        assert len(index) == 1
+
+
+def create_legacy_file(file_service, file_id="legacy", days_old=0):
+    """Store an image uploaded before perceptual hashing existed (no hash)"""
+    storage_subpath = f"pose_image/{file_id}.png"
+    file_path = file_service.uploads_dir / storage_subpath
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    make_image().save(file_path, format="PNG")
+
+    file_record = UploadedFile(
+        file_id=file_id,
+        filename=f"{file_id}.png",
+        content_hash=f"hash_{file_id}",
+        file_type="pose_image",
+        mime_type="image/png",
+        size=file_path.stat().st_size,
+        storage_path=storage_subpath,
+        perceptual_hash=None,
+        last_accessed=datetime.now(timezone.utc) - timedelta(days=days_old)
+    )
+    file_service.db.add(file_record)
+    file_service.db.commit()
+    return file_record
+
+
+class TestStoredPerceptualHashes:
+    """Tests for perceptual hashes of files uploaded before hashing existed"""
+
+    def test_get_perceptual_hash_does_not_write(self, file_service):
+        """Test that a missing hash is computed without touching the database"""
+        legacy = create_legacy_file(file_service)
+
+        value = file_service.get_perceptual_hash(legacy)
+
+        assert value == dhash(make_image())
+        assert legacy.perceptual_hash is None
+        assert not file_service.db.dirty
+
+    def test_rebuild_backfills_missing_hashes(self, file_service):
+        """Test that the index rebuild stores missing hashes and indexes them"""
+        legacy = create_legacy_file(file_service)
+
+        assert file_service.rebuild_perceptual_index() == 1
+
+        file_service.db.refresh(legacy)
+        assert legacy.perceptual_hash == hash_to_hex(dhash(make_image()))
+        assert perceptual_index.search(dhash(make_image()), max_distance=0) == [(0, "legacy")]
+
+    def test_rebuild_skips_unreadable_files(self, file_service):
+        """Test that a missing file is left unhashed instead of failing the rebuild"""
+        legacy = create_legacy_file(file_service)
+        file_service.get_file_path(legacy).unlink()
+
+        assert file_service.rebuild_perceptual_index() == 0
+        assert legacy.perceptual_hash is None
+
+    def test_cold_legacy_file(self, file_service):
+        """Test that a cold file without a hash is hashed from its pack"""
+        legacy = create_legacy_file(file_service, days_old=100)
+        assert file_service.tier_cold_files(days=90) == 1
+
+        assert file_service.get_perceptual_hash(legacy) == dhash(make_image())
+        assert legacy.storage_tier == "cold"
+
+        assert file_service.rebuild_perceptual_index() == 1
+        file_service.db.refresh(legacy)
+        assert legacy.perceptual_hash == hash_to_hex(dhash(make_image()))
+        assert legacy.storage_tier == "cold"
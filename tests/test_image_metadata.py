@@ -0,0 +1,74 @@
+"""Unit tests for lossless image metadata stripping"""
+import io
+from PIL import Image, PngImagePlugin
+
+from avatarforge.services.image_metadata import strip_metadata
+
+
+def make_png(text=None, compress_level=6):
+    """Create a PNG, optionally with a tEXt chunk"""
+    img = Image.new("RGB", (64, 64), color="green")
+    info = PngImagePlugin.PngInfo()
+    if text:
+        info.add_text("Comment", text)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", pnginfo=info, compress_level=compress_level)
+    return buf.getvalue()
+
+
+def make_jpeg(exif=False):
+    """Create a JPEG, optionally with EXIF data"""
+    img = Image.new("RGB", (64, 64), color="red")
+    buf = io.BytesIO()
+    if exif:
+        exif_data = Image.Exif()
+        exif_data[0x010E] = "exporter description"  # ImageDescription
+        img.save(buf, format="JPEG", exif=exif_data.tobytes(), comment=b"exported")
+    else:
+        img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+class TestStripMetadata:
+    """Tests for strip_metadata"""
+
+    def test_png_text_chunks_removed(self):
+        """Test that tEXt chunks are removed from PNG files"""
+        content = make_png(text="made with exporter v1")
+
+        stripped = strip_metadata(content, "image/png")
+
+        assert b"tEXt" in content
+        assert b"tEXt" not in stripped
+        assert stripped == make_png()
+
+    def test_png_pixels_unchanged(self):
+        """Test that stripping keeps PNG pixel data intact"""
+        content = make_png(text="metadata")
+
+        stripped = strip_metadata(content, "image/png")
+
+        assert Image.open(io.BytesIO(stripped)).tobytes() == Image.open(io.BytesIO(content)).tobytes()
+
+    def test_jpeg_exif_and_comment_removed(self):
+        """Test that EXIF (APP1) and COM segments are removed from JPEG files"""
+        content = make_jpeg(exif=True)
+
+        stripped = strip_metadata(content, "image/jpeg")
+
+        assert b"Exif" in content
+        assert b"Exif" not in stripped
+        assert b"exported" not in stripped
+        assert Image.open(io.BytesIO(stripped)).tobytes() == Image.open(io.BytesIO(content)).tobytes()
+
+    def test_unsupported_format_unchanged(self):
+        """Test that unsupported formats are returned as-is"""
+        content = b"RIFF....WEBPVP8 "
+
+        assert strip_metadata(content, "image/webp") is content
+
+    def test_corrupt_file_unchanged(self):
+        """Test that unparseable files are returned as-is"""
+        content = b"\x89PNG\r\n\x1a\n\x00\x00\xff\xffIHDR"
+
+        assert strip_metadata(content, "image/png") is content
@@ -0,0 +1,97 @@
+"""Tests for upgrading databases created by older releases"""
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from avatarforge.database.base import Base
+from avatarforge.database.migrations import ADDED_COLUMNS, upgrade_schema
+from avatarforge.models.generation import Generation
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.generation_service import GenerationService
+
+
+def create_baseline_table(engine, table_name):
+    """Create a table as it was before ADDED_COLUMNS existed (no new columns or indexes)"""
+    current = Base.metadata.tables[table_name]
+    added = ADDED_COLUMNS[table_name]
+    Table(
+        table_name,
+        MetaData(),
+        *[column._copy() for column in current.columns if column.name not in added]
+    ).create(engine)
+
+
+class TestUpgradeSchema:
+    """Tests for upgrade_schema"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        """Create a temporary database with a baseline generations table"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", echo=False)
+        create_baseline_table(engine, "generations")
+        engine.dispose()
+        yield engine
+        engine.dispose()
+
+    def test_adds_missing_columns_and_indexes(self, engine):
+        """Test new columns and indexes are added to an existing table"""
+        added = upgrade_schema(engine)
+
+        inspector = inspect(engine)
+        columns = {column["name"] for column in inspector.get_columns("generations")}
+        indexes = {index["name"] for index in inspector.get_indexes("generations")}
+        assert {"workflow_hash", "version"} <= columns
+        assert {"ix_generations_workflow_hash", "ix_generations_created_id"} <= indexes
+        assert "generations.workflow_hash" in added
+        assert "generations.version" in added
+
+    def test_is_idempotent(self, engine):
+        """Test a second run changes nothing"""
+        upgrade_schema(engine)
+
+        assert upgrade_schema(engine) == []
+
+    def test_existing_rows_usable_after_upgrade(self, engine):
+        """Test rows written before the upgrade load with the new columns"""
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO generations (generation_id, prompt, status) VALUES ('old', 'old avatar', 'completed')"
+            )
+
+        upgrade_schema(engine)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        generation = db.query(Generation).filter_by(generation_id="old").one()
+        assert generation.version == 1
+        assert generation.workflow_hash is None
+        assert GenerationService(db).migrate_inline_workflows() == 0
+        db.close()
+
+    def test_upgrades_uploaded_files(self, tmp_path):
+        """Test existing uploaded files become hot files with the new columns"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'files.db'}", echo=False)
+        create_baseline_table(engine, "uploaded_files")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO uploaded_files (file_id, filename, content_hash, file_type, mime_type, size, storage_path) "
+                "VALUES ('old', 'pose.png', 'abc', 'pose_image', 'image/png', 10, 'uploads/ab/abc.png')"
+            )
+
+        added = upgrade_schema(engine)
+
+        assert "uploaded_files.storage_tier" in added
+        assert "ix_uploaded_files_lru" in added
+        db = sessionmaker(bind=engine)()
+        uploaded = db.query(UploadedFile).filter_by(file_id="old").one()
+        assert uploaded.storage_tier == "hot"
+        assert uploaded.pack_name is None
+        db.close()
+        engine.dispose()
+
+    def test_skips_missing_tables(self, tmp_path):
+        """Test tables that don't exist yet are left to create_all"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}", echo=False)
+
+        assert upgrade_schema(engine) == []
+        assert not inspect(engine).has_table("generations")
+        engine.dispose()
@@ -0,0 +1,135 @@
+"""Unit tests for streamed ZIP archives of generation outputs"""
+import io
+import json
+import zipfile
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from avatarforge.models.generation import Generation
+from avatarforge.services.file_service import FileService
+from avatarforge.services.generation_service import GenerationService
+from avatarforge.services.output_archive import OutputArchiver, output_file_id
+
+
+class TestOutputArchiver:
+    """Tests for OutputArchiver"""
+
+    @pytest.fixture
+    def session_factory(self, session_factory, tmp_path, monkeypatch):
+        """Temporary database and storage with three generations"""
+        monkeypatch.setattr("avatarforge.services.file_service.settings.STORAGE_PATH", str(tmp_path / "storage"))
+        monkeypatch.setattr("avatarforge.services.file_service.settings.COLD_STORAGE_PATH", str(tmp_path / "cold"))
+
+        db = session_factory()
+        file_service = FileService(db)
+        service = GenerationService(db)
+        base = datetime(2025, 1, 1)
+        for i in range(3):
+            outputs = []
+            for pose in ("front", "back"):
+                stored = file_service.save_output_file(
+                    f"png {i} {pose}".encode() * 1000, "avatar.png", "image/png", user_id="alice"
+                )
+                outputs.append({
+                    "filename": "avatar.png",
+                    "url": f"/files/{stored.file_id}",
+                    "pose_type": pose,
+                    "size": stored.size,
+                })
+            outputs.append({"filename": "lost.png", "url": "/outputs/gone.png", "size": 1})
+            gen = service.create_generation(prompt=f"prompt {i}", user_id="alice" if i < 2 else "bob")
+            gen.created_at = base + timedelta(days=i)
+            service.update_generation_status(gen.generation_id, "completed", output_files=outputs)
+        db.close()
+
+        return session_factory
+
+    def open_zip(self, chunks):
+        return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def test_archive_by_filter(self, session_factory):
+        """Test a filtered archive holds each generation's outputs and a manifest"""
+        archive = self.open_zip(OutputArchiver(session_factory).stream(user_id="alice", status="completed"))
+
+        manifest = json.loads(archive.read("manifest.json"))
+        assert [record["prompt"] for record in manifest] == ["prompt 1", "prompt 0"]
+
+        record = manifest[0]
+        assert [entry["pose_type"] for entry in record["files"]] == ["front", "back"]
+        assert record["missing"] == ["lost.png"]
+
+        # Duplicate filenames are made unique within a generation folder
+        front, back = (entry["path"] for entry in record["files"])
+        assert front.endswith("/avatar.png") and back.endswith("/avatar_2.png")
+        assert archive.read(back) == b"png 1 back" * 1000
+        assert archive.getinfo(front).compress_type == zipfile.ZIP_STORED
+        assert archive.testzip() is None
+
+    def test_archive_by_ids_and_limit(self, session_factory):
+        """Test selecting generations by ID and limiting the count"""
+        db = session_factory()
+        ids = [gen.generation_id for gen in GenerationService(db).list_generations()]
+        db.close()
+
+        archive = self.open_zip(OutputArchiver(session_factory).stream(generation_ids=ids[:2], limit=1))
+
+        manifest = json.loads(archive.read("manifest.json"))
+        assert [record["generation_id"] for record in manifest] == [ids[0]]
+
+    def test_includes_archived_generations(self, session_factory):
+        """Test archived generations are filtered and ordered with current ones"""
+        db = session_factory()
+        oldest = db.query(Generation).filter(Generation.prompt == "prompt 0").one()
+        oldest.completed_at = datetime(2025, 1, 1)
+        db.commit()
+        assert GenerationService(db).archive_generations(days=30) == 1
+        db.close()
+
+        archive = self.open_zip(OutputArchiver(session_factory).stream(user_id="alice", status="completed"))
+        manifest = json.loads(archive.read("manifest.json"))
+        assert [record["prompt"] for record in manifest] == ["prompt 1", "prompt 0"]
+        assert archive.read(manifest[1]["files"][0]["path"]) == b"png 0 front" * 1000
+
+        archive = self.open_zip(OutputArchiver(session_factory).stream(limit=2))
+        assert [record["prompt"] for record in json.loads(archive.read("manifest.json"))] == ["prompt 2", "prompt 1"]
+
+    def test_streams_in_chunks(self, session_factory, monkeypatch):
+        """Test file content is emitted in several chunks rather than at the end"""
+        monkeypatch.setattr(OutputArchiver, "CHUNK_SIZE", 1024)
+
+        chunks = list(OutputArchiver(session_factory).stream(limit=1))
+
+        assert len(chunks) > 10
+        assert max(len(chunk) for chunk in chunks) < 4096
+        assert self.open_zip(chunks).testzip() is None
+
+    def test_cold_files_read_without_promotion(self, session_factory):
+        """Test cold outputs are read from their pack and stay cold"""
+        db = session_factory()
+        file_service = FileService(db)
+        assert file_service.tier_cold_files(days=-1) == 6
+        db.close()
+
+        # Cold content must stream from the pack, never be read whole
+        with patch("avatarforge.services.pack_store.PackStore.read", side_effect=AssertionError("whole-blob read")):
+            archive = self.open_zip(OutputArchiver(session_factory).stream(limit=1))
+        manifest = json.loads(archive.read("manifest.json"))
+        assert archive.read(manifest[0]["files"][0]["path"]) == b"png 2 front" * 1000
+
+        db = session_factory()
+        file_service = FileService(db)
+        assert file_service.get_file_by_id(manifest[0]["files"][0]["file_id"]).storage_tier == "cold"
+        db.close()
+
+    def test_empty_archive(self, session_factory):
+        """Test an archive with no matches is a valid ZIP with an empty manifest"""
+        archive = self.open_zip(OutputArchiver(session_factory).stream(status="failed"))
+
+        assert json.loads(archive.read("manifest.json")) == []
+
+    def test_output_file_id(self):
+        """Test file IDs are taken from file_id or /files/{id} URLs"""
+        assert output_file_id({"file_id": "abc"}) == "abc"
+        assert output_file_id({"url": "/avatarforge-controller/files/abc?x=1"}) == "abc"
+        assert output_file_id({"url": "/outputs/gen/output.png"}) is None
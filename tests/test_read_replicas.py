@@ -0,0 +1,101 @@
+"""Unit tests for read replica routing"""
+import time
+from unittest.mock import Mock, patch
+from starlette.requests import Request
+
+from avatarforge.database import session as session_module
+from avatarforge.database.replicas import ReplicaSet
+from avatarforge.database.session import (
+    get_read_db,
+    is_replica_session,
+    READ_YOUR_WRITES_COOKIE,
+)
+
+
+def make_request(method="GET", cookie=None):
+    """Build a bare request with an optional read-your-writes cookie"""
+    headers = []
+    if cookie is not None:
+        headers.append((b"cookie", f"{READ_YOUR_WRITES_COOKIE}={cookie}".encode()))
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+class TestReplicaSet:
+    """Tests for ReplicaSet"""
+
+    def test_round_robin(self, tmp_path):
+        """Test that replicas are used in rotation"""
+        replica_set = ReplicaSet(
+            [f"sqlite:///{tmp_path / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"], "auto"
+        )
+        urls = []
+        for _ in range(4):
+            db = replica_set.open_session()
+            assert is_replica_session(db)
+            urls.append(db.get_bind().url.database)
+            db.close()
+
+        assert urls[0] != urls[1]
+        assert urls[0] == urls[2]
+
+    def test_unavailable_replica_skipped(self, tmp_path):
+        """Test that a failing replica is skipped and put on cooldown"""
+        replica_set = ReplicaSet(
+            [f"sqlite:///{tmp_path / 'missing' / 'a.db'}", f"sqlite:///{tmp_path / 'b.db'}"], "auto"
+        )
+
+        for _ in range(3):
+            db = replica_set.open_session()
+            assert db.get_bind().url.database.endswith("b.db")
+            db.close()
+
+        assert [available for _, available in replica_set.status()] == [False, True]
+
+    def test_all_replicas_down(self, tmp_path):
+        """Test that None is returned when no replica is reachable"""
+        replica_set = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'a.db'}"], "auto")
+
+        assert replica_set.open_session() is None
+
+
+class TestGetReadDb:
+    """Tests for the get_read_db dependency"""
+
+    def test_primary_without_replicas(self):
+        """Test that the primary session is used when no replicas exist"""
+        primary = Mock()
+        with patch.object(session_module, "replicas", ReplicaSet([], "auto")):
+            assert next(get_read_db(make_request(), primary)) is primary
+
+    def test_replica_used_for_reads(self, tmp_path):
+        """Test that reads go to a replica when one is configured"""
+        primary = Mock()
+        with patch.object(session_module, "replicas", ReplicaSet([f"sqlite:///{tmp_path / 'a.db'}"], "auto")):
+            db = next(get_read_db(make_request(), primary))
+
+        assert db is not primary
+        assert is_replica_session(db)
+        assert not is_replica_session(primary)
+        db.close()
+
+    def test_recent_write_sticks_to_primary(self, tmp_path):
+        """Test read-your-writes stickiness after a write"""
+        primary = Mock()
+        cookie = int(time.time()) + 5
+        with patch.object(session_module, "replicas", ReplicaSet([f"sqlite:///{tmp_path / 'a.db'}"], "auto")):
+            assert next(get_read_db(make_request(cookie=cookie), primary)) is primary
+
+            # Expired stickiness goes back to the replica
+            db = next(get_read_db(make_request(cookie=int(time.time()) - 1), primary))
+            assert db is not primary
+            db.close()
+
+    def test_write_sets_cookie(self, tmp_path):
+        """Test that write requests mark the client for stickiness"""
+        response = Mock()
+        with patch.object(session_module, "replicas", ReplicaSet([f"sqlite:///{tmp_path / 'a.db'}"], "auto")):
+            db = next(session_module.get_db(make_request(method="POST"), response))
+            db.close()
+
+        response.set_cookie.assert_called_once()
+        assert response.set_cookie.call_args.args[0] == READ_YOUR_WRITES_COOKIE
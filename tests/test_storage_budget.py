@@ -0,0 +1,140 @@
+"""Unit tests for size-budget LRU eviction"""
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.services.generation_service import GenerationService
+
+
+class TestStorageBudget:
+    """Tests for enforce_storage_budget"""
+
+    def create_test_file(self, file_service, file_id, hours_ago, size=100, reference_count=0, file_type="pose_image"):
+        """Helper to create a stored file last accessed hours_ago hours ago"""
+        storage_subpath = f"{file_id}.png"
+        base_dir = file_service.outputs_dir if file_type == "output" else file_service.uploads_dir
+        file_path = base_dir / storage_subpath
+        file_path.write_bytes(b"x" * size)
+
+        last_accessed = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+        file_service.db.add(UploadedFile(
+            file_id=file_id,
+            filename=f"{file_id}.png",
+            content_hash=f"hash_{file_id}",
+            file_type=file_type,
+            mime_type="image/png",
+            size=size,
+            storage_path=storage_subpath,
+            reference_count=reference_count,
+            is_deleted=False,
+            created_at=last_accessed,
+            last_accessed=last_accessed
+        ))
+        file_service.db.commit()
+        return file_path
+
+    def test_under_budget_evicts_nothing(self, file_service):
+        """Test that nothing is evicted when storage fits the budget"""
+        self.create_test_file(file_service, "a", hours_ago=10)
+
+        assert file_service.enforce_storage_budget(1000) == (0, 0)
+
+    def test_evicts_least_recently_accessed_first(self, file_service):
+        """Test that the oldest unreferenced files are evicted until under budget"""
+        oldest = self.create_test_file(file_service, "oldest", hours_ago=30)
+        older = self.create_test_file(file_service, "older", hours_ago=20)
+        newest = self.create_test_file(file_service, "newest", hours_ago=1)
+
+        files_evicted, bytes_freed = file_service.enforce_storage_budget(150)
+
+        assert (files_evicted, bytes_freed) == (2, 200)
+        assert not oldest.exists()
+        assert not older.exists()
+        assert newest.exists()
+        assert file_service.get_hot_storage_bytes() == 100
+
+    def test_referenced_files_never_evicted(self, file_service):
+        """Test that files used by generations survive even when over budget"""
+        used = self.create_test_file(file_service, "used", hours_ago=100, reference_count=1)
+        unused = self.create_test_file(file_service, "unused", hours_ago=1)
+
+        file_service.enforce_storage_budget(0)
+
+        assert used.exists()
+        assert not unused.exists()
+
+    def test_failed_commit_keeps_files(self, file_service):
+        """Test files stay on disk when the eviction transaction fails"""
+        path = self.create_test_file(file_service, "a", hours_ago=10)
+
+        with patch.object(file_service.db, "commit", side_effect=RuntimeError("database is locked")):
+            with pytest.raises(RuntimeError):
+                file_service.enforce_storage_budget(0)
+
+        assert path.exists()
+
+    def test_outputs_included(self, file_service):
+        """Test that outputs are evicted alongside uploads"""
+        output = self.create_test_file(file_service, "output", hours_ago=50, file_type="output")
+        upload = self.create_test_file(file_service, "upload", hours_ago=10)
+
+        file_service.enforce_storage_budget(100)
+
+        assert not output.exists()
+        assert upload.exists()
+
+    def test_save_output_file_tracked(self, file_service):
+        """Test that saved outputs are stored under outputs/ and deduplicated"""
+        first = file_service.save_output_file(b"png bytes", "avatar_00001_.png", "image/png")
+        second = file_service.save_output_file(b"png bytes", "avatar_00002_.png", "image/png")
+
+        assert first.file_id == second.file_id
+        assert first.file_type == "output"
+        path = file_service.get_file_path(first)
+        assert path.is_relative_to(file_service.outputs_dir)
+        assert path.read_bytes() == b"png bytes"
+
+    @pytest.fixture
+    def gen_service(self, db_session, file_service):
+        """Create GenerationService sharing the temporary storage"""
+        service = GenerationService(db_session)
+        service.file_service = file_service
+        return service
+
+    def test_completed_outputs_are_referenced(self, gen_service, file_service):
+        """Test outputs stored for a generation are not evicted while it exists"""
+        generation_id = gen_service.create_generation(prompt="test avatar").generation_id
+
+        generation = gen_service.complete_generation(generation_id, [("front.png", b"\x89PNG\r\n\x1a\n front", "front")])
+
+        output = generation.output_files[0]
+        stored = file_service.get_file_by_id(output["file_id"])
+        assert output["url"] == f"/files/{stored.file_id}"
+        assert stored.mime_type == "image/png"
+        assert stored.reference_count == 1
+        assert file_service.enforce_storage_budget(0) == (0, 0)
+
+        gen_service.delete_generation(generation_id)
+        file_service.db.refresh(stored)
+        assert stored.reference_count == 0
+        assert file_service.enforce_storage_budget(0) == (1, stored.size)
+
+    def test_replaced_outputs_are_released(self, gen_service, file_service):
+        """Test updating output_files moves references to the new outputs"""
+        generation_id = gen_service.create_generation(prompt="test avatar").generation_id
+        first = gen_service.complete_generation(generation_id, [("a.png", b"first", None)]).output_files
+        second = gen_service.complete_generation(generation_id, [("b.png", b"second", None)]).output_files
+
+        assert file_service.get_file_by_id(first[0]["file_id"]).reference_count == 0
+        assert file_service.get_file_by_id(second[0]["file_id"]).reference_count == 1
+
+    def test_bulk_delete_releases_archived_outputs(self, gen_service, file_service):
+        """Test bulk deleting archived generations releases their outputs"""
+        generation_id = gen_service.create_generation(prompt="test avatar").generation_id
+        output = gen_service.complete_generation(generation_id, [("a.png", b"output", None)]).output_files[0]
+        assert gen_service.archive_generations(days=-1) == 1
+
+        assert gen_service.bulk_delete_generations(generation_ids=[generation_id]) == 1
+
+        assert file_service.get_file_by_id(output["file_id"]).reference_count == 0
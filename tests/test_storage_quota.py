@@ -0,0 +1,138 @@
+"""Unit tests for per-user storage accounting and quotas"""
+import io
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from fastapi import UploadFile, HTTPException
+from PIL import Image
+
+from avatarforge.models.uploaded_file import UploadedFile
+from avatarforge.models.storage_usage import FileOwner, UserStorageUsage
+from avatarforge.services.file_service import FileService
+
+
+def make_upload(color="red", size=(128, 128)):
+    """Create a mock UploadFile containing a PNG"""
+    img_bytes = io.BytesIO()
+    Image.new('RGB', size, color=color).save(img_bytes, format='PNG')
+    upload = Mock(spec=UploadFile)
+    upload.filename = f"{color}.png"
+    upload.content_type = "image/png"
+    upload.read = AsyncMock(return_value=img_bytes.getvalue())
+    return upload
+
+
+class TestStorageUsage:
+    """Tests for the incrementally maintained usage ledger"""
+
+    @pytest.mark.asyncio
+    async def test_upload_charges_user(self, file_service):
+        """Test that a new upload is added to the uploader's usage"""
+        uploaded = await file_service.upload_file(make_upload(), user_id="alice")
+
+        usage = file_service.get_user_usage("alice")
+        assert usage.bytes_used == uploaded.size
+        assert usage.file_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reupload_by_same_user_not_double_charged(self, file_service):
+        """Test that uploading the same file twice charges the user once"""
+        uploaded = await file_service.upload_file(make_upload(), user_id="alice")
+        await file_service.upload_file(make_upload(), user_id="alice")
+
+        usage = file_service.get_user_usage("alice")
+        assert usage.bytes_used == uploaded.size
+        assert usage.file_count == 1
+
+    @pytest.mark.asyncio
+    async def test_dedupe_hit_charges_second_user(self, file_service):
+        """Test that a deduplicated upload is charged to the new holder"""
+        uploaded = await file_service.upload_file(make_upload(), user_id="alice")
+        await file_service.upload_file(make_upload(), user_id="bob")
+
+        assert file_service.get_user_usage("bob").bytes_used == uploaded.size
+        assert file_service.db.query(UploadedFile).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_credits_all_holders(self, file_service):
+        """Test that deleting a file releases it from every holder's usage"""
+        uploaded = await file_service.upload_file(make_upload(), user_id="alice")
+        await file_service.upload_file(make_upload(), user_id="bob")
+
+        file_service.delete_file(uploaded.file_id, force=True)
+
+        for user_id in ("alice", "bob"):
+            usage = file_service.get_user_usage(user_id)
+            assert usage.bytes_used == 0
+            assert usage.file_count == 0
+        assert file_service.db.query(FileOwner).count() == 0
+
+    def test_unknown_user_has_zero_usage(self, file_service):
+        """Test usage lookup for a user with no files"""
+        usage = file_service.get_user_usage("nobody")
+        assert usage.bytes_used == 0
+        assert usage.file_count == 0
+
+    @pytest.mark.asyncio
+    async def test_anonymous_upload_not_tracked(self, file_service):
+        """Test that uploads without a user ID don't create ledger rows"""
+        await file_service.upload_file(make_upload())
+
+        assert file_service.db.query(FileOwner).count() == 0
+
+
+class TestStorageQuota:
+    """Tests for quota enforcement at upload time"""
+
+    @pytest.mark.asyncio
+    async def test_byte_quota_rejects_upload(self, file_service):
+        """Test that an upload over the byte quota is rejected before storing"""
+        with patch('avatarforge.services.file_service.settings.USER_STORAGE_QUOTA_BYTES', 10):
+            with pytest.raises(HTTPException) as exc_info:
+                await file_service.upload_file(make_upload(), user_id="alice")
+
+        assert exc_info.value.status_code == 413
+        assert "quota exceeded" in exc_info.value.detail
+        assert not any(p.is_file() for p in file_service.uploads_dir.rglob("*"))
+
+    @pytest.mark.asyncio
+    async def test_file_quota_rejects_upload(self, file_service):
+        """Test that the file count quota is enforced"""
+        with patch('avatarforge.services.file_service.settings.USER_STORAGE_QUOTA_FILES', 1):
+            await file_service.upload_file(make_upload("red"), user_id="alice")
+            with pytest.raises(HTTPException) as exc_info:
+                await file_service.upload_file(make_upload("blue"), user_id="alice")
+
+        assert exc_info.value.status_code == 413
+        assert file_service.get_user_usage("alice").file_count == 1
+
+    @pytest.mark.asyncio
+    async def test_dedupe_hit_subject_to_quota(self, file_service):
+        """Test that a dedupe hit still counts against the new holder's quota"""
+        await file_service.upload_file(make_upload(), user_id="alice")
+
+        with patch('avatarforge.services.file_service.settings.USER_STORAGE_QUOTA_FILES', 1):
+            await file_service.upload_file(make_upload("blue"), user_id="bob")
+            with pytest.raises(HTTPException) as exc_info:
+                await file_service.upload_file(make_upload(), user_id="bob")
+
+        assert exc_info.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_quota_checked_against_committed_usage(self, file_service, session_factory):
+        """Test that an upload is checked against usage committed by a concurrent upload"""
+        other = FileService(session_factory())
+        other.uploads_dir = file_service.uploads_dir
+        await file_service.upload_file(make_upload("red"), user_id="alice")
+        # The other request read alice's usage before the concurrent upload below
+        stale_usage = other.db.get(UserStorageUsage, "alice")
+        assert stale_usage.file_count == 1
+
+        with patch('avatarforge.services.file_service.settings.USER_STORAGE_QUOTA_FILES', 2):
+            await file_service.upload_file(make_upload("blue"), user_id="alice")
+            with pytest.raises(HTTPException) as exc_info:
+                await other.upload_file(make_upload("green"), user_id="alice")
+
+        assert exc_info.value.status_code == 413
+        other.db.close()
+        file_service.db.expire_all()
+        assert file_service.get_user_usage("alice").file_count == 2
@@ -0,0 +1,363 @@
+"""Unit tests for completion webhooks"""
+import hashlib
+import hmac
+import json
+import httpx
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from avatarforge.core.config import settings
+from avatarforge.models.webhook_delivery import WebhookDelivery
+from avatarforge.services.generation_service import GenerationService
+from avatarforge.services import webhook_service
+from avatarforge.services.webhook_service import (
+    WebhookService, check_callback_url, is_public_address, pin_callback_url, sign_payload, signing_secret
+)
+from avatarforge.services.webhook_dispatcher import WebhookDispatcher
+
+
+# Test host names and what they resolve to
+ADDRESSES = {
+    "example.com": ["93.184.215.14"],
+    "other.example.com": ["93.184.215.15"],
+    "internal.example.com": ["10.0.0.5"],
+    "mixed.example.com": ["93.184.215.14", "127.0.0.1"],
+}
+
+
+@pytest.fixture(autouse=True)
+def webhook_settings(monkeypatch):
+    """Configure a webhook secret and resolve test hosts without DNS"""
+    monkeypatch.setattr(settings, "WEBHOOK_SECRET", "test-webhook-secret")
+
+    def resolve_host(host, port):
+        if host in ADDRESSES:
+            return ADDRESSES[host]
+        if host.replace(".", "").isdigit() or ":" in host:
+            return [host]
+        raise OSError("Name or service not known")
+
+    monkeypatch.setattr(webhook_service, "resolve_host", resolve_host)
+
+
+def deliveries(factory, generation_id):
+    db = factory()
+    try:
+        return WebhookService(db).list_deliveries(generation_id)
+    finally:
+        db.close()
+
+
+def finish(factory, callback_url="https://example.com/hook", status="completed"):
+    """Create a generation with a callback and move it to a final status"""
+    db = factory()
+    service = GenerationService(db)
+    generation = service.create_generation(prompt="test avatar", user_id="alice", callback_url=callback_url)
+    generation_id = generation.generation_id
+    service.update_generation_status(generation_id, status, output_files=[{"filename": "out.png"}])
+    db.close()
+    return generation_id
+
+
+class TestWebhookOutbox:
+    """Tests for registering, scheduling and claiming deliveries"""
+
+    def test_callback_waits_for_final_status(self, session_factory):
+        """Test a callback is registered as waiting and becomes due on completion"""
+        db = session_factory()
+        service = GenerationService(db)
+        generation = service.create_generation(prompt="test avatar", callback_url="https://example.com/hook")
+        generation_id = generation.generation_id
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "waiting"
+        assert delivery.payload is None
+
+        service.update_generation_status(generation_id, "processing")
+        assert deliveries(session_factory, generation_id)[0].status == "waiting"
+
+        service.update_generation_status(generation_id, "completed", output_files=[{"filename": "out.png"}])
+        db.close()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "pending"
+        assert delivery.payload["event"] == "generation.completed"
+        assert delivery.payload["data"]["output_files"] == [{"filename": "out.png"}]
+
+    def test_no_callback_no_delivery(self, session_factory):
+        """Test generations without a callback URL create no deliveries"""
+        generation_id = finish(session_factory, callback_url=None)
+
+        assert deliveries(session_factory, generation_id) == []
+
+    def test_delete_discards_waiting_callbacks(self, session_factory):
+        """Test deleting an unfinished generation drops its callback"""
+        db = session_factory()
+        service = GenerationService(db)
+        generation_id = service.create_generation(prompt="test avatar", callback_url="https://example.com/hook").generation_id
+        service.delete_generation(generation_id)
+        db.close()
+
+        assert deliveries(session_factory, generation_id) == []
+
+    def test_claim_leases_each_delivery_once(self, session_factory):
+        """Test a claimed delivery is not claimed again until its lease expires"""
+        finish(session_factory)
+
+        db = session_factory()
+        [claimed] = WebhookService(db).claim_due(10)
+        assert claimed.status == "sending"
+        assert claimed.attempts == 1
+        assert WebhookService(db).claim_due(10) == []
+
+        # An expired lease (crashed worker) makes the delivery claimable again
+        db.query(WebhookDelivery).update({WebhookDelivery.next_attempt_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db.commit()
+        [reclaimed] = WebhookService(db).claim_due(10)
+        assert reclaimed.attempts == 2
+        db.close()
+
+    def test_failures_back_off_then_give_up(self, session_factory, monkeypatch):
+        """Test retryable failures are rescheduled until the attempt limit"""
+        monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 2)
+        generation_id = finish(session_factory)
+
+        db = session_factory()
+        service = WebhookService(db)
+        [delivery] = service.claim_due(10)
+        service.record_results({delivery.delivery_id: {"error": "HTTP 503", "status_code": 503}})
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "pending"
+        assert delivery.last_error == "HTTP 503"
+        assert service.claim_due(10) == []
+
+        db.query(WebhookDelivery).update({WebhookDelivery.next_attempt_at: datetime.now(timezone.utc)})
+        db.commit()
+        [delivery] = service.claim_due(10)
+        service.record_results({delivery.delivery_id: {"error": "timeout", "status_code": None}})
+        db.close()
+
+        assert deliveries(session_factory, generation_id)[0].status == "failed"
+
+    def test_client_error_fails_permanently(self, session_factory):
+        """Test a 4xx rejection is not retried"""
+        generation_id = finish(session_factory)
+
+        db = session_factory()
+        service = WebhookService(db)
+        [delivery] = service.claim_due(10)
+        service.record_results({delivery.delivery_id: {"error": "HTTP 410", "status_code": 410}})
+        db.close()
+
+        assert deliveries(session_factory, generation_id)[0].status == "failed"
+
+    def test_backoff_grows_and_is_capped(self, monkeypatch):
+        """Test backoff doubles per attempt, with jitter, up to the maximum"""
+        monkeypatch.setattr(settings, "WEBHOOK_BACKOFF_SECONDS", 10)
+        monkeypatch.setattr(settings, "WEBHOOK_MAX_BACKOFF_SECONDS", 60)
+
+        assert 5 <= WebhookService.backoff_seconds(1) <= 10
+        assert 20 <= WebhookService.backoff_seconds(3) <= 40
+        assert 30 <= WebhookService.backoff_seconds(10) <= 60
+
+    def test_purge_keeps_recent_and_unfinished(self, session_factory):
+        """Test purging removes only old delivered/failed records"""
+        finish(session_factory)
+        db = session_factory()
+        GenerationService(db).create_generation(prompt="unfinished", callback_url="https://example.com/hook")
+        db.query(WebhookDelivery).update({WebhookDelivery.created_at: datetime(2020, 1, 1)})
+        db.query(WebhookDelivery).filter(WebhookDelivery.status == "pending").update({WebhookDelivery.status: "delivered"})
+        db.commit()
+
+        assert WebhookService(db).purge_deliveries(days=7) == 1
+        assert [d.status for d in db.query(WebhookDelivery).all()] == ["waiting"]
+        db.close()
+
+
+class TestWebhookDispatcher:
+    """Tests for WebhookDispatcher"""
+
+    def dispatcher(self, session_factory, handler):
+        return WebhookDispatcher(session_factory, client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    @pytest.mark.asyncio
+    async def test_sends_signed_delivery(self, session_factory):
+        """Test a due delivery is POSTed with a verifiable signature"""
+        generation_id = finish(session_factory)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(204)
+
+        dispatcher = self.dispatcher(session_factory, handler)
+        assert await dispatcher.dispatch_due() == 1
+        await dispatcher.client.aclose()
+
+        [request] = requests
+        [delivery] = deliveries(session_factory, generation_id)
+        body = json.loads(request.content)
+        # Connects to the checked address, not a fresh lookup of the name
+        assert str(request.url) == "https://93.184.215.14/hook"
+        assert request.headers["Host"] == "example.com"
+        assert request.extensions["sni_hostname"] == "example.com"
+        assert body["event"] == "generation.completed"
+        assert body["delivery_id"] == delivery.delivery_id
+        assert body["data"]["generation_id"] == generation_id
+        assert request.headers["X-AvatarForge-Delivery"] == delivery.delivery_id
+
+        timestamp = request.headers["X-AvatarForge-Timestamp"]
+        expected = hmac.new(signing_secret().encode(), f"{timestamp}.".encode() + request.content, hashlib.sha256).hexdigest()
+        assert request.headers["X-AvatarForge-Signature"] == f"sha256={expected}"
+        assert request.headers["X-AvatarForge-Signature"] == sign_payload(request.content, int(timestamp), signing_secret())
+
+        assert delivery.status == "delivered"
+        assert delivery.delivered_at is not None
+
+    @pytest.mark.asyncio
+    async def test_batches_by_url(self, session_factory, monkeypatch):
+        """Test completions for the same URL share one POST when batching is on"""
+        monkeypatch.setattr(settings, "WEBHOOK_BATCH_SIZE", 10)
+        finish(session_factory)
+        finish(session_factory, status="failed")
+        finish(session_factory, callback_url="https://other.example.com/hook")
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        dispatcher = self.dispatcher(session_factory, handler)
+        assert await dispatcher.dispatch_due() == 3
+        await dispatcher.client.aclose()
+
+        by_host = {request.headers["Host"]: json.loads(request.content) for request in requests}
+        assert sorted(e["event"] for e in by_host["example.com"]["events"]) == ["generation.completed", "generation.failed"]
+        assert by_host["other.example.com"]["event"] == "generation.completed"
+
+    @pytest.mark.asyncio
+    async def test_network_error_is_retried(self, session_factory):
+        """Test a connection failure leaves the delivery pending with backoff"""
+        generation_id = finish(session_factory)
+
+        def handler(request):
+            raise httpx.ConnectError("connection refused")
+
+        dispatcher = self.dispatcher(session_factory, handler)
+        await dispatcher.dispatch_due()
+        await dispatcher.client.aclose()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "pending"
+        assert delivery.last_error == webhook_service.ERROR_CONNECTION
+        assert delivery.next_attempt_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+    @pytest.mark.asyncio
+    async def test_error_response_not_revealed(self, session_factory):
+        """Test last_error doesn't expose the receiver's response"""
+        generation_id = finish(session_factory)
+
+        dispatcher = self.dispatcher(session_factory, lambda request: httpx.Response(503, text="internal details"))
+        await dispatcher.dispatch_due()
+        await dispatcher.client.aclose()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "pending"
+        assert delivery.last_error == webhook_service.ERROR_RESPONSE
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("callback_url", [
+        "http://127.0.0.1:8000/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "https://internal.example.com/hook",
+        "https://mixed.example.com/hook",
+    ])
+    async def test_non_public_hosts_blocked(self, session_factory, callback_url):
+        """Test callbacks resolving to loopback, private or link-local addresses fail without a request"""
+        generation_id = finish(session_factory, callback_url=callback_url)
+        requests = []
+
+        dispatcher = self.dispatcher(session_factory, lambda request: requests.append(request) or httpx.Response(200))
+        await dispatcher.dispatch_due()
+        await dispatcher.client.aclose()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert requests == []
+        assert delivery.status == "failed"
+        assert delivery.last_error == webhook_service.ERROR_BLOCKED_ADDRESS
+
+    @pytest.mark.asyncio
+    async def test_unresolvable_host_is_retried(self, session_factory):
+        """Test DNS failures are retried like network errors"""
+        generation_id = finish(session_factory, callback_url="https://unknown.invalid/hook")
+
+        dispatcher = self.dispatcher(session_factory, lambda request: httpx.Response(200))
+        await dispatcher.dispatch_due()
+        await dispatcher.client.aclose()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert delivery.status == "pending"
+        assert delivery.last_error == webhook_service.ERROR_UNRESOLVABLE
+
+    @pytest.mark.asyncio
+    async def test_no_secret_sends_nothing(self, session_factory, monkeypatch):
+        """Test deliveries stay queued until a dedicated WEBHOOK_SECRET is set"""
+        monkeypatch.setattr(settings, "WEBHOOK_SECRET", "")
+        generation_id = finish(session_factory)
+        requests = []
+
+        dispatcher = self.dispatcher(session_factory, lambda request: requests.append(request) or httpx.Response(200))
+        assert await dispatcher.dispatch_due() == 0
+        await dispatcher.client.aclose()
+
+        [delivery] = deliveries(session_factory, generation_id)
+        assert signing_secret() is None
+        assert requests == []
+        assert delivery.status == "pending"
+        assert delivery.attempts == 0
+
+
+class TestCallbackAddresses:
+    """Tests for callback host checks"""
+
+    @pytest.mark.parametrize("address, public", [
+        ("93.184.215.14", True),
+        ("2606:2800:220:1::1", True),
+        ("127.0.0.1", False),
+        ("10.1.2.3", False),
+        ("172.16.0.1", False),
+        ("192.168.1.1", False),
+        ("169.254.169.254", False),
+        ("100.64.0.1", False),
+        ("0.0.0.0", False),
+        ("224.0.1.1", False),
+        ("240.0.0.1", False),
+        ("::1", False),
+        ("fe80::1", False),
+        ("fd00::1", False),
+        ("::ffff:127.0.0.1", False),
+    ])
+    def test_is_public_address(self, address, public):
+        assert is_public_address(address) is public
+
+    def test_private_addresses_allowed_when_configured(self, monkeypatch):
+        """Test the development override skips the check"""
+        monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_ADDRESSES", True)
+
+        assert check_callback_url("http://127.0.0.1:9000/hook") == (None, None)
+
+    def test_check_returns_checked_address(self):
+        """Test a public host's checked address is returned for the request to use"""
+        assert check_callback_url("https://example.com/hook") == ("93.184.215.14", None)
+
+    @pytest.mark.parametrize("url, address, expected_url, host, extensions", [
+        ("https://example.com/hook?a=1", "93.184.215.14", "https://93.184.215.14/hook?a=1", "example.com",
+         {"sni_hostname": "example.com"}),
+        ("http://example.com:8080/hook", "93.184.215.14", "http://93.184.215.14:8080/hook", "example.com:8080", {}),
+        ("https://user:pw@example.com/hook", "2606:2800:220:1::1", "https://user:pw@[2606:2800:220:1::1]/hook",
+         "example.com", {"sni_hostname": "example.com"}),
+    ])
+    def test_pin_callback_url(self, url, address, expected_url, host, extensions):
+        """Test requests are pointed at the checked address with the original Host and SNI"""
+        assert pin_callback_url(url, address) == (expected_url, {"Host": host}, extensions)
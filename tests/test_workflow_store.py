@@ -0,0 +1,62 @@
+"""Unit tests for deduplicated workflow storage"""
+from avatarforge.models.generation import Generation
+from avatarforge.models.workflow_blob import WorkflowBlob
+from avatarforge.services.generation_service import GenerationService
+from avatarforge.services.workflow_store import WorkflowStore, canonical_workflow
+
+
+WORKFLOW = {"3": {"class_type": "KSampler", "inputs": {"seed": 42, "steps": 20}}}
+
+
+class TestWorkflowStore:
+    """Tests for WorkflowStore and generation read-back"""
+
+    def test_canonical_hash_ignores_key_order(self):
+        """Test that equal workflows hash the same regardless of key order"""
+        reordered = {"3": {"inputs": {"steps": 20, "seed": 42}, "class_type": "KSampler"}}
+
+        assert canonical_workflow(WORKFLOW)[0] == canonical_workflow(reordered)[0]
+
+    def test_save_deduplicates_and_compresses(self, db_session):
+        """Test that identical workflows are stored once, compressed"""
+        store = WorkflowStore(db_session)
+        big = {str(i): {"class_type": "CLIPTextEncode", "inputs": {"text": "warrior"}} for i in range(50)}
+
+        first = store.save(big)
+        second = store.save(dict(big))
+        db_session.commit()
+
+        assert first == second
+        blob = db_session.query(WorkflowBlob).one()
+        assert len(blob.data) < blob.size
+        assert store.load(first) == big
+
+    def test_generation_read_back(self, db_session):
+        """Test get_workflow for deduplicated and legacy inline workflows"""
+        gen_service = GenerationService(db_session)
+        db_session.add(Generation(
+            generation_id="new",
+            prompt="p",
+            workflow_hash=gen_service.workflow_store.save(WORKFLOW)
+        ))
+        db_session.add(Generation(generation_id="legacy", prompt="p", workflow=WORKFLOW))
+        db_session.commit()
+
+        assert gen_service.get_workflow(gen_service.get_generation("new")) == WORKFLOW
+        assert gen_service.get_workflow(gen_service.get_generation("legacy", include_workflow=True)) == WORKFLOW
+
+    def test_migrate_inline_workflows(self, db_session):
+        """Test moving inline workflows into the store"""
+        for i in range(3):
+            db_session.add(Generation(generation_id=f"gen-{i}", prompt="p", workflow=WORKFLOW))
+        db_session.add(Generation(generation_id="none", prompt="p"))
+        db_session.commit()
+
+        gen_service = GenerationService(db_session)
+        assert gen_service.migrate_inline_workflows(batch_size=2) == 3
+
+        db_session.expire_all()
+        assert db_session.query(WorkflowBlob).count() == 1
+        gen = gen_service.get_generation("gen-0")
+        assert gen.workflow is None
+        assert gen_service.get_workflow(gen) == WORKFLOW